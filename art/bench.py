@@ -0,0 +1,66 @@
+"""
+Speed of the vectorized ascii conversion against the per-pixel loop the tests used, on synthetic images.
+
+Both convert every pixel (the width of the art is the width of the image and the aspect 1) so the figures compare
+the mapping itself, then the default 80 columns conversion is timed alone, which also shrinks the image.
+
+Usage: python -m art.bench [size ...]
+"""
+import sys
+import time
+from typing import List
+
+import numpy
+
+from art import convert
+from art.packing import PALETTE
+
+DEFAULT_SIZES = (512, 4096)
+
+
+def legacy_to_ascii(gray: numpy.ndarray) -> bytes:
+    """
+    The conversion of NEP11Test.get_ascii_image, on an image already at its final size.
+    """
+    width = gray.shape[1]
+    # Image.getdata
+    pixels = gray.ravel().tolist()
+    chars = list(PALETTE)
+    new_pixels = ''.join([chars[pixel // 25] for pixel in pixels])
+    ascii_image = [new_pixels[index:index + width] for index in range(0, len(new_pixels), width)]
+    return '\n'.join(ascii_image).encode()
+
+
+def synthetic_image(size: int, seed: int = 0) -> numpy.ndarray:
+    """
+    A square gradient with noise, every gray level shows up.
+    """
+    rng = numpy.random.default_rng(seed)
+    gradient = numpy.add.outer(numpy.arange(size), numpy.arange(size)) * 255 // (2 * size - 2)
+    return numpy.clip(gradient + rng.integers(-16, 17, (size, size)), 0, 255).astype(numpy.uint8)
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(args: List[str]) -> int:
+    sizes = [int(arg) for arg in args] or DEFAULT_SIZES
+    print('{0:>12}{1:>14}{2:>14}{3:>10}{4:>16}'.format('image', 'loop s', 'numpy s', 'speedup', '80 columns s'))
+    for size in sizes:
+        gray = synthetic_image(size)
+        legacy, legacy_seconds = timed(legacy_to_ascii, gray)
+        art, seconds = timed(convert.to_ascii, gray, width=size, aspect=1.0)
+        if art != legacy:
+            print('{0}x{0}: the conversions differ'.format(size), file=sys.stderr)
+            return 1
+        _, small_seconds = timed(convert.to_ascii, gray)
+        print('{0:>12}{1:>14.4f}{2:>14.4f}{3:>9.0f}x{4:>16.4f}'.format(
+            '{0}x{0}'.format(size), legacy_seconds, seconds, legacy_seconds / seconds, small_seconds))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
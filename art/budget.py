@@ -0,0 +1,254 @@
+"""
+Conversion of an image to the ascii art of best quality that fits a storage budget per token.
+
+The storage fee of a token's image grows with the size of the art, which with a fixed width only depends on the
+proportions of the image. Here the width, the number of rows (through the aspect) and the number of palette
+characters are picked among candidates: every candidate is converted, stored raw or packed whichever is smaller,
+and scored by the similarity of the art to the image. The best scored candidate within the budget wins.
+
+The score is the mean SSIM, over every 8x8 window, of the image and of the art drawn back as gray levels (every
+character the mean of the levels it stands for) on a grid of up to REFERENCE_WIDTH columns, 1 for an exact copy.
+Fewer palette characters make longer runs, so smaller packed images, at the price of fewer levels of gray.
+
+Usage: python -m art.budget <image> (--bytes N | --gas GAS) [--storage-price DATOSHI] [--out FILE]
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy
+
+from art import convert, packing
+
+# Policy contract default, in datoshi per byte, as in tools/storage_footprint.py
+DEFAULT_STORAGE_PRICE = 100000
+GAS_DECIMALS = 8
+# the storage of an image besides the art, see add_ascii_image in contracts/ascii-nft.py: the image key
+# (prefix + sha256), its reference count (prefix + sha256, a byte) and the image hash under the token (prefix +
+# token id, sha256)
+IMAGE_STORAGE_OVERHEAD = (1 + 32) + (1 + 32 + 1) + (1 + 4 + 32)
+# images over a chunk also store their size and every other chunk under a key of its own (prefix + sha256 + index)
+IMAGE_CHUNK_SIZE = 4096
+
+DEFAULT_WIDTHS = (16, 24, 32, 40, 48, 64, 80, 96, 120, 160)
+DEFAULT_PALETTE_SIZES = tuple(range(2, len(packing.PALETTE) + 1))
+DEFAULT_ASPECTS = (convert.DEFAULT_ASPECT,)
+REFERENCE_WIDTH = 256
+WINDOW = 8
+# SSIM constants for 8 bit levels
+C1 = (0.01 * 255) ** 2
+C2 = (0.03 * 255) ** 2
+
+
+class Candidate(NamedTuple):
+    width: int
+    rows: int
+    palette: str
+    packed: bool
+    # the bytes stored for the image, see storage_size
+    image: bytes
+    quality: float
+
+    @property
+    def size(self) -> int:
+        return storage_size(self.image)
+
+    def fee(self, storage_price: int = DEFAULT_STORAGE_PRICE) -> int:
+        return self.size * storage_price
+
+
+def storage_size(image: bytes) -> int:
+    """
+    :return: the bytes written to the storage when minting a token with this image
+    """
+    size = len(image) + IMAGE_STORAGE_OVERHEAD
+    if len(image) > IMAGE_CHUNK_SIZE:
+        size += 1 + 32 + integer_size(len(image))
+        size += sum(1 + 32 + integer_size(index) for index in range(1, -(-len(image) // IMAGE_CHUNK_SIZE)))
+    return size
+
+
+def integer_size(value: int) -> int:
+    """
+    :return: the bytes of a positive integer in the storage, little-endian with a sign bit
+    """
+    return value.bit_length() // 8 + 1
+
+
+def gas_to_bytes(gas: float, storage_price: int = DEFAULT_STORAGE_PRICE) -> int:
+    """
+    :return: the storage bytes a fee of `gas` pays for
+    """
+    return int(round(gas * 10 ** GAS_DECIMALS)) // storage_price
+
+
+def sub_palette(size: int, palette: str = packing.PALETTE) -> str:
+    """
+    :return: `size` characters of the palette evenly spread from its darkest to its brightest
+    """
+    if not 0 < size <= len(palette):
+        raise ValueError('invalid palette size {0}'.format(size))
+    if size == 1:
+        return palette[0]
+    return ''.join(palette[index * (len(palette) - 1) // (size - 1)] for index in range(size))
+
+
+def character_levels(palette: str, levels: Optional[int] = None) -> numpy.ndarray:
+    """
+    :return: the gray level every byte stands for in art of this palette, the mean of the levels mapped to it
+    """
+    table = convert.lookup_table(palette, levels)
+    sums = numpy.bincount(table, weights=numpy.arange(256), minlength=256)
+    counts = numpy.bincount(table, minlength=256)
+    return numpy.divide(sums, counts, out=numpy.zeros(256), where=counts > 0)
+
+
+def reference_image(gray: numpy.ndarray) -> numpy.ndarray:
+    """
+    The image the art is scored against, shrunk to at most REFERENCE_WIDTH columns.
+    """
+    rows, columns = gray.shape
+    width = min(columns, REFERENCE_WIDTH)
+    height = max(1, rows * width // columns)
+    return convert.resize(gray, width, height).astype(numpy.float64)
+
+
+def draw(art: bytes, palette: str, shape: Sequence[int], levels: Optional[int] = None) -> numpy.ndarray:
+    """
+    Draw ascii art back as an image of the given shape, each character a rectangle of its gray level.
+    """
+    rows = art.split(b'\n')
+    cells = numpy.frombuffer(b''.join(rows), dtype=numpy.uint8).reshape(len(rows), len(rows[0]))
+    gray = character_levels(palette, levels)[cells]
+    height, width = shape
+    return gray[numpy.arange(height) * len(rows) // height][:, numpy.arange(width) * len(rows[0]) // width]
+
+
+def window_means(values: numpy.ndarray, window: int) -> numpy.ndarray:
+    """
+    :return: the mean of every `window` x `window` square of the image, from its summed area table
+    """
+    sums = numpy.pad(values.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+    return (sums[window:, window:] - sums[:-window, window:] - sums[window:, :-window]
+            + sums[:-window, :-window]) / (window * window)
+
+
+def similarity(reference: numpy.ndarray, image: numpy.ndarray) -> float:
+    """
+    :return: the mean SSIM of two images of the same shape over every window, 1 if they are identical
+    """
+    window = min(WINDOW, *reference.shape)
+    # the windows slide by a pixel, so the edges of the cells of the art do not line up with them
+    mean_x, mean_y = window_means(reference, window), window_means(image, window)
+    variance_x = window_means(reference * reference, window) - mean_x ** 2
+    variance_y = window_means(image * image, window) - mean_y ** 2
+    covariance = window_means(reference * image, window) - mean_x * mean_y
+    ssim = ((2 * mean_x * mean_y + C1) * (2 * covariance + C2)
+            / ((mean_x ** 2 + mean_y ** 2 + C1) * (variance_x + variance_y + C2)))
+    return float(ssim.mean())
+
+
+def candidates(gray: numpy.ndarray, widths: Sequence[int] = DEFAULT_WIDTHS,
+               palette_sizes: Sequence[int] = DEFAULT_PALETTE_SIZES,
+               aspects: Sequence[float] = DEFAULT_ASPECTS) -> List[Candidate]:
+    """
+    Convert the image with every combination of width, aspect and palette size.
+
+    :param gray: the image, a 2D array of gray levels
+    :return: the conversions, in the order of the arguments
+    """
+    gray = numpy.asarray(gray)
+    reference = reference_image(gray)
+    result = []
+    for width in widths:
+        for aspect in aspects:
+            for size in palette_sizes:
+                palette = sub_palette(size)
+                art = convert.to_ascii(gray, width, aspect, palette)
+                # the packed format keeps the indexes of the full palette, the one the contract unpacks with
+                packed = packing.pack(art.decode('latin-1'))
+                image = packed if len(packed) < len(art) else art
+                quality = similarity(reference, draw(art, palette, reference.shape))
+                result.append(Candidate(width, art.count(b'\n') + 1, palette, image is packed, image, quality))
+    return result
+
+
+def best_within(options: Sequence[Candidate], budget: int) -> Candidate:
+    """
+    :param budget: the storage bytes available for the image of a token
+    :return: the candidate of best quality within the budget, the smallest of them on a tie
+    :raise ValueError: raised if no candidate fits in the budget.
+    """
+    fitting = [candidate for candidate in options if candidate.size <= budget]
+    if not fitting:
+        raise ValueError('no candidate fits in {0} bytes, the smallest takes {1}'.format(
+            budget, min(candidate.size for candidate in options)))
+    return max(fitting, key=lambda candidate: (candidate.quality, -candidate.size))
+
+
+def render_within(gray: numpy.ndarray, budget: int, widths: Sequence[int] = DEFAULT_WIDTHS,
+                  palette_sizes: Sequence[int] = DEFAULT_PALETTE_SIZES,
+                  aspects: Sequence[float] = DEFAULT_ASPECTS) -> bytes:
+    """
+    Convert an image to the art of best quality stored in at most `budget` bytes.
+
+    :return: the image to mint, packed or raw
+    """
+    return best_within(candidates(gray, widths, palette_sizes, aspects), budget).image
+
+
+def format_report(options: Sequence[Candidate], budget: int, storage_price: int = DEFAULT_STORAGE_PRICE) -> str:
+    """
+    A line per candidate by size: the chosen one is marked `*`, the ones over the budget `-`.
+    """
+    try:
+        chosen: Optional[Candidate] = best_within(options, budget)
+    except ValueError:
+        chosen = None
+    lines = ['  {0:>6}{1:>6}{2:>9}{3:>8}{4:>8}{5:>12}{6:>9}'.format(
+        'width', 'rows', 'palette', 'format', 'bytes', 'fee GAS', 'quality')]
+    for candidate in sorted(options, key=lambda candidate: (candidate.size, -candidate.quality)):
+        mark = '*' if candidate is chosen else '-' if candidate.size > budget else ' '
+        lines.append('{0} {1:>6}{2:>6}{3:>9}{4:>8}{5:>8}{6:>12.5f}{7:>9.4f}'.format(
+            mark, candidate.width, candidate.rows, len(candidate.palette), 'packed' if candidate.packed else 'raw',
+            candidate.size, candidate.fee(storage_price) / 10 ** GAS_DECIMALS, candidate.quality))
+    if chosen is None:
+        lines.append('no candidate fits in {0} bytes'.format(budget))
+    return '\n'.join(lines)
+
+
+def main(args: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('image', type=Path, help='the source image, or a .npy array of gray levels')
+    budget = parser.add_mutually_exclusive_group(required=True)
+    budget.add_argument('--bytes', type=int, help='the storage bytes of the image of a token')
+    budget.add_argument('--gas', type=float, help='the storage fee of the image of a token')
+    parser.add_argument('--storage-price', type=int, default=DEFAULT_STORAGE_PRICE, help='datoshi per byte')
+    parser.add_argument('--widths', type=int, nargs='+', default=DEFAULT_WIDTHS)
+    parser.add_argument('--palette-sizes', type=int, nargs='+', default=DEFAULT_PALETTE_SIZES)
+    parser.add_argument('--aspects', type=float, nargs='+', default=DEFAULT_ASPECTS,
+                        help='the aspects to try, a smaller aspect makes fewer rows')
+    parser.add_argument('--out', type=Path, help='write the chosen image, packed or raw, to this file')
+    options = parser.parse_args(args)
+
+    limit = options.bytes if options.bytes is not None else gas_to_bytes(options.gas, options.storage_price)
+    try:
+        found = candidates(convert.load_gray(options.image), options.widths, options.palette_sizes,
+                           options.aspects)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print('budget: {0} bytes, {1:.5f} GAS'.format(limit, limit * options.storage_price / 10 ** GAS_DECIMALS))
+    print(format_report(found, limit, options.storage_price))
+    try:
+        chosen = best_within(found, limit)
+    except ValueError:
+        return 1
+    if options.out is not None:
+        options.out.write_bytes(chosen.image)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
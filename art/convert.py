@@ -0,0 +1,119 @@
+"""
+Conversion of grayscale images to ascii art, the images minted by the tests and the client.
+
+A pixel is mapped to a palette character by its brightness, the darkest pixels to the first character, every
+`levels` levels of gray being one character. With the default palette of `packing.PALETTE` it is 25 levels, as the
+original conversion of the NEO logo in art/ascii_image.txt, the last character only gets the levels from 250. The
+mapping is a 256 entry lookup table applied to the whole pixel buffer at once, and the image is shrunk by averaging
+the pixels of each cell, so no Python code runs per pixel.
+
+Characters are taller than wide, `aspect` scales the height of the art to keep the proportions of the image.
+"""
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy
+
+from art.packing import PALETTE
+
+DEFAULT_WIDTH = 80
+DEFAULT_ASPECT = 0.55
+# gray levels per character of PALETTE
+PALETTE_LEVELS = 25
+NEWLINE = ord('\n')
+
+
+def lookup_table(palette: str = PALETTE, levels: Optional[int] = None) -> numpy.ndarray:
+    """
+    :param levels: the gray levels per character, PALETTE_LEVELS for PALETTE and an even split for other palettes
+        by default
+    :return: the palette character of each gray level, as bytes
+    :raise ValueError: raised if the palette is empty, has a newline or characters out of latin-1.
+    """
+    try:
+        codes = palette.encode('latin-1')
+    except UnicodeEncodeError:
+        raise ValueError('invalid palette {0!r}'.format(palette)) from None
+    if not 0 < len(codes) <= 256 or NEWLINE in codes:
+        raise ValueError('invalid palette {0!r}'.format(palette))
+    if levels is None and palette == PALETTE:
+        levels = PALETTE_LEVELS
+    if levels is None:
+        indexes = numpy.arange(256) * len(codes) // 256
+    elif levels < 1:
+        raise ValueError('invalid levels per character {0}'.format(levels))
+    else:
+        indexes = numpy.minimum(numpy.arange(256) // levels, len(codes) - 1)
+    return numpy.frombuffer(codes, dtype=numpy.uint8)[indexes]
+
+
+def resize(gray: numpy.ndarray, width: int, height: int) -> numpy.ndarray:
+    """
+    Shrink an image, each pixel of the result is the mean of the pixels it covers.
+
+    :param gray: the image, a 2D array of gray levels
+    :return: the resized image as a 2D array of uint8
+    """
+    rows, columns = gray.shape
+    if (height, width) == (rows, columns):
+        return gray.astype(numpy.uint8, copy=False)
+    row_starts = numpy.arange(height) * rows // height
+    column_starts = numpy.arange(width) * columns // width
+    # sums of up to 2^24 gray levels fit in 32 bits, the rows first as they are contiguous
+    sums = numpy.add.reduceat(gray, row_starts, axis=0, dtype=numpy.uint32)
+    sums = numpy.add.reduceat(sums, column_starts, axis=1, dtype=numpy.uint64)
+    # a cell of an enlarged image is a single pixel
+    row_counts = numpy.maximum(numpy.diff(numpy.append(row_starts, rows)), 1)
+    column_counts = numpy.maximum(numpy.diff(numpy.append(column_starts, columns)), 1)
+    return (sums // numpy.outer(row_counts, column_counts)).astype(numpy.uint8)
+
+
+def to_ascii(gray: numpy.ndarray, width: int = DEFAULT_WIDTH, aspect: float = DEFAULT_ASPECT,
+             palette: str = PALETTE, levels: Optional[int] = None) -> bytes:
+    """
+    Convert a grayscale image to ascii art.
+
+    :param gray: the image, a 2D array of gray levels from 0 to 255
+    :param width: the number of characters of every row
+    :param aspect: the height of a row relative to the width of a character, the art has
+        `height / width * width * aspect` rows
+    :param palette: the characters from the darkest to the brightest
+    :param levels: the gray levels per character, see `lookup_table`
+    :return: the rows of the art joined by newlines
+    :raise ValueError: raised if the image is not 2D, or the width, aspect or palette are invalid.
+    """
+    gray = numpy.asarray(gray)
+    if gray.ndim != 2 or gray.size == 0:
+        raise ValueError('expected a non empty 2D grayscale array, got shape {0}'.format(gray.shape))
+    if width < 1 or aspect <= 0:
+        raise ValueError('invalid width {0} or aspect {1}'.format(width, aspect))
+
+    rows, columns = gray.shape
+    height = max(1, int(rows / columns * width * aspect))
+    # bytes.translate maps a byte per few cycles, faster than indexing the table with the array
+    art = numpy.ascontiguousarray(resize(gray, width, height)).tobytes().translate(
+        lookup_table(palette, levels).tobytes())
+    lines = numpy.empty((height, width + 1), dtype=numpy.uint8)
+    lines[:, :width] = numpy.frombuffer(art, dtype=numpy.uint8).reshape(height, width)
+    lines[:, width] = NEWLINE
+    return lines.tobytes()[:-1]
+
+
+def load_gray(path: Union[str, Path]) -> numpy.ndarray:
+    """
+    Read an image file as a 2D array of gray levels, requires Pillow unless it is a `.npy` array.
+    """
+    if Path(path).suffix.lower() == '.npy':
+        return numpy.load(path, allow_pickle=False)
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return numpy.asarray(image.convert('L'))
+
+
+def image_to_ascii(path: Union[str, Path], width: int = DEFAULT_WIDTH, aspect: float = DEFAULT_ASPECT,
+                   palette: str = PALETTE, levels: Optional[int] = None) -> bytes:
+    """
+    Convert an image file to ascii art, see `to_ascii`.
+    """
+    return to_ascii(load_gray(path), width, aspect, palette, levels)
@@ -0,0 +1,144 @@
+"""
+Compact on-chain format of the ascii images, mirrored by `unpack_ascii_image` in contracts/ascii-nft.py.
+
+The images only use the 11 characters of `PALETTE` laid out in rows of a fixed width, so every character fits in a
+nibble and the newlines don't need to be stored at all::
+
+    byte 0     PACKED_IMAGE_MAGIC, never a printable character so raw images are still told apart
+    bytes 1-2  row width, big-endian
+    bytes 3-   nibble stream, high nibble first
+                 0x0 - 0xA  one palette character
+                 0xE        padding, ends the stream
+                 0xF c c    the previous character repeated `cc + RUN_MIN` more times, `cc` a byte over two nibbles
+"""
+from typing import Iterator, List
+
+PALETTE = 'BS#&@$%*!:.'
+PACKED_IMAGE_MAGIC = 0xA1
+HEADER_SIZE = 3
+
+PAD = 0xE
+RUN = 0xF
+RUN_MIN = 3
+RUN_MAX = RUN_MIN + 0xFF
+
+MAX_WIDTH = 0xFFFF
+
+
+def is_packed(data: bytes) -> bool:
+    return len(data) >= HEADER_SIZE and data[0] == PACKED_IMAGE_MAGIC
+
+
+def pack(image: str, palette: str = PALETTE) -> bytes:
+    """
+    Pack an ascii image.
+
+    :param image: the rows of the image joined by newlines, every row but the last one with the same width
+    :param palette: the characters the image is made of, at most 11
+    :return: the packed image
+    :raise ValueError: raised if the image uses characters out of the palette or if its rows have different widths.
+    """
+    if len(palette) > PAD:
+        raise ValueError('the palette can have at most {0} characters'.format(PAD))
+
+    rows = image.split('\n')
+    width = len(rows[0])
+    if not 0 < width <= MAX_WIDTH:
+        raise ValueError('invalid image width {0}'.format(width))
+    for number, row in enumerate(rows):
+        if len(row) != width and (number != len(rows) - 1 or len(row) == 0 or len(row) > width):
+            raise ValueError('row {0} is {1} characters wide, expected {2}'.format(number, len(row), width))
+
+    lookup = {char: code for code, char in enumerate(palette)}
+    try:
+        symbols = [lookup[char] for char in ''.join(rows)]
+    except KeyError as e:
+        raise ValueError('character {0!r} is not in the palette'.format(e.args[0])) from None
+
+    nibbles: List[int] = []
+    index = 0
+    while index < len(symbols):
+        symbol = symbols[index]
+        run = 1
+        while index + run < len(symbols) and symbols[index + run] == symbol:
+            run += 1
+        index += run
+
+        nibbles.append(symbol)
+        repeats = run - 1
+        while repeats >= RUN_MIN:
+            count = min(repeats, RUN_MAX)
+            nibbles.extend((RUN, (count - RUN_MIN) >> 4, (count - RUN_MIN) & 0x0F))
+            repeats -= count
+        nibbles.extend([symbol] * repeats)
+
+    if len(nibbles) % 2:
+        nibbles.append(PAD)
+
+    header = bytes([PACKED_IMAGE_MAGIC]) + width.to_bytes(2, 'big')
+    return header + bytes((nibbles[i] << 4) | nibbles[i + 1] for i in range(0, len(nibbles), 2))
+
+
+def _nibbles(data: bytes) -> Iterator[int]:
+    for byte in data:
+        yield byte >> 4
+        yield byte & 0x0F
+
+
+def unpack(data: bytes, palette: str = PALETTE, truncated: bool = False) -> str:
+    """
+    Unpack an image produced by `pack`.
+
+    :param data: the packed image
+    :param palette: the palette used to pack the image
+    :param truncated: whether `data` is only the start of the image, as the first chunk the contract serves in the
+        properties, then a run cut at the end is dropped
+    :return: the rows of the image joined by newlines
+    :raise ValueError: raised if the data is not a valid packed image.
+    """
+    if not is_packed(data):
+        raise ValueError('not a packed image')
+    width = int.from_bytes(data[1:HEADER_SIZE], 'big')
+    if width == 0:
+        raise ValueError('invalid image width 0')
+
+    symbols: List[str] = []
+    nibbles = _nibbles(data[HEADER_SIZE:])
+    for code in nibbles:
+        if code == PAD:
+            break
+        if code == RUN:
+            try:
+                count = (next(nibbles) << 4 | next(nibbles)) + RUN_MIN
+            except StopIteration:
+                if truncated:
+                    break
+                raise ValueError('truncated run') from None
+            if len(symbols) == 0:
+                raise ValueError('run without a previous character')
+            symbols.extend(symbols[-1] * count)
+        elif code < len(palette):
+            symbols.append(palette[code])
+        else:
+            raise ValueError('invalid code {0:#x}'.format(code))
+
+    if len(symbols) == 0:
+        raise ValueError('empty image')
+
+    flat = ''.join(symbols)
+    return '\n'.join(flat[start:start + width] for start in range(0, len(flat), width))
+
+
+if __name__ == '__main__':
+    import sys
+    from pathlib import Path
+
+    if len(sys.argv) != 3:
+        print('Usage: python -m art.packing <ascii image> <packed output>', file=sys.stderr)
+        sys.exit(2)
+
+    source = Path(sys.argv[1]).read_text()
+    packed = pack(source)
+    Path(sys.argv[2]).write_bytes(packed)
+    print('{0}: {1} bytes raw, {2} bytes packed ({3:.1f}% saved)'.format(
+        sys.argv[1], len(source.encode()), len(packed), 100 * (1 - len(packed) / len(source.encode()))))
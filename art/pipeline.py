@@ -0,0 +1,339 @@
+"""
+Turns a folder of source images into the payloads of a bulk mint, one JSON line per token.
+
+Every image is converted to ascii art (`art.convert`), packed with `art.packing` with `--pack`, and goes out with
+its metadata, royalties and locked content as the `mint`/`mintBatch` arguments of the contract::
+
+    {"source": "logo.png", "hash": "<sha256 of the file>", "meta": "{\"name\": \"logo\", ...}",
+     "lockedContent": "", "royalties": "[...]", "image": "<ascii art, hex when packed>", "packed": false}
+
+The conversions run on a pool of processes and are cached in `<out>/.asset_cache` by the hash of the source file
+and the conversion settings, so a re-run only converts the new or changed images and the ones converted with other
+settings. Files whose size and modification time did not change are not even hashed again. The metadata, royalties
+and locked content are cheap to build and are not cached, changing them never invalidates a conversion. With a
+budget per token (`--budget-bytes` or `--budget-gas`) every image gets the art of best quality within it, see
+`art.budget`, raw or packed whichever is smaller.
+
+A `<stem>.json` next to an image is merged into its metadata, a `<stem>.locked` is its locked content. Besides
+images Pillow reads, `.npy` files of 2D gray levels are converted without Pillow.
+
+Usage: python -m art.pipeline <images> [--out DIR] [--workers N] [--width W] [--pack] [--royalties JSON] ...
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from art import budget, convert, packing
+
+IMAGE_SUFFIXES = ('.bmp', '.gif', '.jpeg', '.jpg', '.npy', '.png', '.tif', '.tiff', '.webp')
+CACHE_DIRECTORY = '.asset_cache'
+# size, modification time and hash of the sources, to skip hashing unchanged files
+SOURCES_INDEX = 'sources.json'
+MANIFEST = 'manifest.jsonl'
+LOCKED_SUFFIX = '.locked'
+METADATA_SUFFIX = '.json'
+
+DEFAULT_METADATA = {
+    'name': '{stem}',
+    'description': '',
+    'image': '',
+    'tokenURI': '',
+}
+
+
+def list_sources(directory: Path) -> List[Path]:
+    """
+    :return: the images of the directory, not its subdirectories, sorted by name
+    """
+    return sorted(path for path in directory.iterdir() if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES)
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def conversion_settings(width: int = convert.DEFAULT_WIDTH, aspect: float = convert.DEFAULT_ASPECT,
+                        palette: str = packing.PALETTE, levels: Optional[int] = None, pack: bool = False,
+                        budget_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    The settings a conversion depends on, part of its cache key.
+
+    :param budget_bytes: convert every image to the art of best quality stored in this many bytes instead, see
+        `art.budget`, the other settings are then ignored
+    :raise ValueError: raised if the settings can not convert any image.
+    """
+    convert.lookup_table(palette, levels)
+    if width < 1 or aspect <= 0:
+        raise ValueError('invalid width {0} or aspect {1}'.format(width, aspect))
+    if pack and not set(palette) <= set(packing.PALETTE):
+        # the contract unpacks the images with its own palette
+        raise ValueError('the palette can only have characters of {0!r} to be packed'.format(packing.PALETTE))
+    if budget_bytes is not None and budget_bytes <= budget.IMAGE_STORAGE_OVERHEAD:
+        raise ValueError('a budget of {0} bytes can not store any image'.format(budget_bytes))
+    return {'width': width, 'aspect': aspect, 'palette': palette, 'levels': levels, 'pack': pack,
+            'budget': budget_bytes}
+
+
+def cache_key(source_hash: str, settings: Dict[str, Any]) -> str:
+    return hashlib.sha256('{0}:{1}'.format(source_hash, json.dumps(settings, sort_keys=True)).encode()).hexdigest()
+
+
+def convert_source(path: Path, settings: Dict[str, Any]) -> bytes:
+    """
+    Convert one image, run on the workers.
+
+    :return: the ascii art, packed if the settings say so
+    """
+    gray = convert.load_gray(path)
+    if settings['budget'] is not None:
+        return budget.render_within(gray, settings['budget'])
+    art = convert.to_ascii(gray, settings['width'], settings['aspect'], settings['palette'], settings['levels'])
+    if settings['pack']:
+        return packing.pack(art.decode('latin-1'))
+    return art
+
+
+def _convert_job(job: Tuple[Path, Dict[str, Any]]) -> Tuple[Optional[bytes], Optional[str]]:
+    path, settings = job
+    try:
+        return convert_source(path, settings), None
+    except Exception as e:
+        return None, '{0}: {1}'.format(type(e).__name__, e)
+
+
+class AssetCache:
+    """
+    The converted images of previous runs, a file per cache key.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = directory / SOURCES_INDEX
+        try:
+            self.sources: Dict[str, List[Any]] = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            self.sources = {}
+
+    def source_hash(self, path: Path) -> str:
+        """
+        :return: the hash of the file, from the index if its size and modification time did not change
+        """
+        stat = path.stat()
+        name = str(path.resolve())
+        entry = self.sources.get(name)
+        if entry is not None and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return entry[2]
+        digest = file_hash(path)
+        self.sources[name] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return (self.directory / key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes):
+        temporary = self.directory / '{0}.{1}.tmp'.format(key, os.getpid())
+        temporary.write_bytes(data)
+        os.replace(temporary, self.directory / key)
+
+    def save(self):
+        temporary = self.directory / '{0}.{1}.tmp'.format(SOURCES_INDEX, os.getpid())
+        temporary.write_text(json.dumps(self.sources))
+        os.replace(temporary, self.index_path)
+
+
+def token_metadata(path: Path, index: int, template: Dict[str, str]) -> Dict[str, Any]:
+    """
+    The metadata of a token, the template formatted with `{stem}`, `{name}` (the file name) and `{index}` and merged
+    with the `<stem>.json` of the image.
+
+    :raise ValueError: raised if the `<stem>.json` is not a JSON object.
+    """
+    fields = {'stem': path.stem, 'name': path.name, 'index': index}
+    metadata = {key: value.format(**fields) for key, value in template.items()}
+    sidecar = path.with_suffix(METADATA_SUFFIX)
+    if sidecar.is_file():
+        extra = json.loads(sidecar.read_text())
+        if not isinstance(extra, dict):
+            raise ValueError('{0} is not a JSON object'.format(sidecar.name))
+        metadata.update(extra)
+    return metadata
+
+
+def token_payload(path: Path, index: int, source_hash: str, image: bytes, template: Dict[str, str], royalties: str,
+                  locked: str) -> Dict[str, Any]:
+    """
+    :return: the manifest line of an image
+    """
+    sidecar = path.with_suffix(LOCKED_SUFFIX)
+    if sidecar.is_file():
+        locked = sidecar.read_text()
+    return {
+        'source': path.name,
+        'hash': source_hash,
+        'meta': json.dumps(token_metadata(path, index, template), separators=(',', ':')),
+        'lockedContent': locked,
+        'royalties': royalties,
+        'image': image.hex() if packing.is_packed(image) else image.decode('latin-1'),
+        'packed': packing.is_packed(image),
+    }
+
+
+def run_pipeline(directory: Path, out: Path, settings: Dict[str, Any], template: Optional[Dict[str, str]] = None,
+                 royalties: str = '', locked: str = '', workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Convert the images of `directory` that are not cached and write `<out>/manifest.jsonl`.
+
+    :param settings: see `conversion_settings`
+    :param template: the metadata fields, DEFAULT_METADATA by default
+    :param royalties: the royalties of every token, as the contract takes them
+    :param locked: the locked content of the tokens without a `<stem>.locked`
+    :param workers: the number of conversion processes, all cores by default
+    :return: the counts of images, cache hits and errors, the errors and the duration of the run
+    """
+    start = time.perf_counter()
+    template = DEFAULT_METADATA if template is None else template
+    out.mkdir(parents=True, exist_ok=True)
+    cache = AssetCache(out / CACHE_DIRECTORY)
+
+    sources = list_sources(directory)
+    hashes: List[str] = []
+    keys: List[str] = []
+    images: Dict[str, bytes] = {}
+    missing: Dict[str, Path] = {}
+    for path in sources:
+        hashes.append(cache.source_hash(path))
+        key = cache_key(hashes[-1], settings)
+        keys.append(key)
+        image = cache.get(key)
+        if image is not None:
+            images[key] = image
+        else:
+            # identical files are converted once
+            missing.setdefault(key, path)
+    hits = len(sources) - sum(1 for key in keys if key in missing)
+
+    jobs = [(path, settings) for path in missing.values()]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(_convert_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        results = [_convert_job(job) for job in jobs]
+
+    errors: Dict[str, str] = {}
+    for key, (image, error) in zip(missing, results):
+        if error is not None:
+            errors[key] = error
+        else:
+            cache.put(key, image)
+            images[key] = image
+    cache.save()
+
+    failures: List[Dict[str, str]] = []
+    temporary = out / '{0}.{1}.tmp'.format(MANIFEST, os.getpid())
+    with open(temporary, 'w') as manifest:
+        for index, (path, source_hash, key) in enumerate(zip(sources, hashes, keys)):
+            try:
+                if key in errors:
+                    raise ValueError(errors[key])
+                payload = token_payload(path, index, source_hash, images[key], template, royalties, locked)
+            except ValueError as e:
+                failures.append({'source': path.name, 'error': str(e)})
+                continue
+            manifest.write(json.dumps(payload) + '\n')
+    os.replace(temporary, out / MANIFEST)
+
+    return {
+        'images': len(sources),
+        'hits': hits,
+        'converted': len(jobs) - len(errors),
+        'errors': failures,
+        'workers': workers if jobs else 0,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def format_report(run: Dict[str, Any]) -> str:
+    seconds = run['seconds']
+    rate = run['images'] / seconds if seconds > 0 else 0.0
+    hit_rate = run['hits'] / run['images'] * 100 if run['images'] else 0.0
+    lines = ['{0} images in {1:.2f}s ({2:.1f} images/s), {3} converted on {4} workers, '
+             'cache hit rate {5:.1f}%'.format(run['images'], seconds, rate, run['converted'], run['workers'],
+                                               hit_rate)]
+    lines.extend('  {0}: {1}'.format(error['source'], error['error']) for error in run['errors'])
+    if run['errors']:
+        lines.append('{0} images left out of the manifest'.format(len(run['errors'])))
+    return '\n'.join(lines)
+
+
+def read_option(value: str) -> str:
+    """
+    :return: the content of the file if the value is `@<path>`, the value otherwise
+    """
+    return Path(value[1:]).read_text() if value.startswith('@') else value
+
+
+def main(args: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('images', type=Path, help='the directory of the source images')
+    parser.add_argument('--out', type=Path, default=Path('assets'), help='where the manifest and the cache go')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--width', type=int, default=convert.DEFAULT_WIDTH)
+    parser.add_argument('--aspect', type=float, default=convert.DEFAULT_ASPECT)
+    parser.add_argument('--palette', default=packing.PALETTE)
+    parser.add_argument('--levels', type=int)
+    parser.add_argument('--pack', action='store_true', help='store the images in the packed format, as hex')
+    limit = parser.add_mutually_exclusive_group()
+    limit.add_argument('--budget-bytes', type=int,
+                       help='pick the width, rows and palette of best quality within this storage per token')
+    limit.add_argument('--budget-gas', type=float, help='the same as a storage fee per token')
+    parser.add_argument('--storage-price', type=int, default=budget.DEFAULT_STORAGE_PRICE, help='datoshi per byte')
+    parser.add_argument('--name', default=DEFAULT_METADATA['name'],
+                        help='the name of the tokens, with {stem}, {name} and {index} replaced')
+    parser.add_argument('--description', default=DEFAULT_METADATA['description'])
+    parser.add_argument('--image-uri', default=DEFAULT_METADATA['image'])
+    parser.add_argument('--token-uri', default=DEFAULT_METADATA['tokenURI'])
+    parser.add_argument('--royalties', default='', help='the royalties JSON of every token, or @<file>')
+    parser.add_argument('--locked', default='', help='the locked content of the tokens without a <stem>.locked')
+    options = parser.parse_args(args)
+
+    try:
+        budget_bytes = options.budget_bytes
+        if options.budget_gas is not None:
+            budget_bytes = budget.gas_to_bytes(options.budget_gas, options.storage_price)
+        settings = conversion_settings(options.width, options.aspect, options.palette, options.levels,
+                                       options.pack, budget_bytes)
+        royalties = read_option(options.royalties)
+        if royalties and not isinstance(json.loads(royalties), list):
+            raise ValueError('the royalties must be a JSON list')
+        template = {'name': options.name, 'description': options.description, 'image': options.image_uri,
+                    'tokenURI': options.token_uri}
+        for value in template.values():
+            value.format(stem='', name='', index=0)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    except (KeyError, IndexError) as e:
+        parser.error('unknown field {0} in the metadata, use {{stem}}, {{name}} or {{index}}'.format(e))
+
+    run = run_pipeline(options.images, options.out, settings, template, royalties, options.locked,
+                       options.workers)
+    print(format_report(run))
+    return 1 if run['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
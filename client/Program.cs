@@ -1,4 +1,5 @@
 ﻿using System;
+using System.Collections.Generic;
 using System.Text;
 using System.IO;
 using System.Numerics;
@@ -16,6 +17,10 @@ namespace client;
 
 public class Program
 {
+    // see art/packing.py for the packed image format
+    private const string AsciiPalette = "BS#&@$%*!:.";
+    private const byte PackedImageMagic = 0xA1;
+
     public static void Main(string[] args)
     {
         MainAsync(args).GetAwaiter().GetResult();
@@ -37,7 +42,7 @@ public class Program
                 .WithNamed("w", v => wif = v)
                     .HavingLongAlias("wif")
                     .DescribedBy("WIF", "The WIF used to mint")
-                .WithNamed("r", v => wif = v)
+                .WithNamed("r", v => rpcUrl = v)
                     .HavingLongAlias("rpc")
                     .DescribedBy("RPC", "The RPC node to connect to")
                 .WithNamed("c", v => contract = UInt160.Parse(v))
@@ -100,15 +105,35 @@ public class Program
 
         var stackItem = (Neo.VM.Types.Map)rpcInvokeResult.Stack[0];
 
+        // ascii only holds the first chunk of an image of several chunks
+        bool chunked = false;
+        foreach (var item in stackItem)
+        {
+            if (item.Key.GetString() == "imageChunks")
+            {
+                chunked = true;
+            }
+        }
+
         foreach (var item in stackItem)
         {
             var key = item.Key.GetString();
             var value = item.Value.GetString();
 
+            if (key == "ascii" && chunked)
+            {
+                continue;
+            }
             if (key == "ascii")
             {
                 Console.WriteLine( key + $" : \n" + item.Value.GetString());
             }
+            else if (key == "imageChunks")
+            {
+                // the whole image, read chunk by chunk
+                var image = await ReadImage(client, contract, data, (int)item.Value.GetInteger(), signer0);
+                Console.WriteLine("ascii : \n" + image);
+            }
             else
             {
                 Console.WriteLine( key + $" : " + item.Value.GetString());
@@ -118,6 +143,97 @@ public class Program
         }
     }
 
+    private static async Task<string> ReadImage(RpcClient client, UInt160 contract, RpcStack tokenId, int chunks, Signer signer)
+    {
+        var image = new List<byte>();
+        for (int index = 0; index < chunks; index++)
+        {
+            RpcStack position = new RpcStack()
+            {
+                Type = "Integer",
+                Value = index.ToString()
+            };
+            RpcInvokeResult result = await client.InvokeFunctionAsync(contract.ToString(), "imageChunk", new RpcStack[] { tokenId, position }, signer);
+            if (!string.IsNullOrEmpty(result.Exception))
+            {
+                Console.WriteLine("Exception: " + result.Exception);
+                break;
+            }
+            image.AddRange(result.Stack[0].GetSpan().ToArray());
+        }
+
+        if (image.Count > 0 && image[0] == PackedImageMagic)
+        {
+            try
+            {
+                return UnpackImage(image.ToArray());
+            }
+            catch (FormatException e)
+            {
+                return "malformed image: " + e.Message;
+            }
+        }
+        return Encoding.UTF8.GetString(image.ToArray());
+    }
+
+    private static string UnpackImage(byte[] packed)
+    {
+        if (packed.Length < 3)
+        {
+            throw new FormatException("no header");
+        }
+        int width = packed[1] << 8 | packed[2];
+        if (width == 0)
+        {
+            throw new FormatException("width 0");
+        }
+        var nibbles = new List<int>();
+        for (int index = 3; index < packed.Length; index++)
+        {
+            nibbles.Add(packed[index] >> 4);
+            nibbles.Add(packed[index] & 0x0F);
+        }
+
+        var symbols = new StringBuilder();
+        for (int index = 0; index < nibbles.Count; index++)
+        {
+            int code = nibbles[index];
+            if (code == 0xE)
+            {
+                break;
+            }
+            if (code == 0xF)
+            {
+                // the previous character repeated 3 more times or more
+                if (symbols.Length == 0)
+                {
+                    throw new FormatException("run with no character before it");
+                }
+                if (index + 2 >= nibbles.Count)
+                {
+                    throw new FormatException("truncated run");
+                }
+                symbols.Append(symbols[symbols.Length - 1], (nibbles[index + 1] << 4 | nibbles[index + 2]) + 3);
+                index += 2;
+            }
+            else if (code < AsciiPalette.Length)
+            {
+                symbols.Append(AsciiPalette[code]);
+            }
+            else
+            {
+                throw new FormatException("unknown character code " + code);
+            }
+        }
+
+        var rows = new List<string>();
+        for (int start = 0; start < symbols.Length; start += width)
+        {
+            rows.Add(symbols.ToString(start, Math.Min(width, symbols.Length - start)));
+        }
+        return string.Join("\n", rows);
+    }
+
     private static async Task<BigInteger> Mint(string rpc, string wif, UInt160 contract, ProtocolSettings settings)
     {
         RpcClient client = new RpcClient(new Uri(rpc), null, null, settings);
@@ -44,33 +44,105 @@ TOKEN_SYMBOL = 'ASCII'  # TODO_TEMPLATE
 # Number of decimal places
 TOKEN_DECIMALS = 0
 
-# Whether the smart contract was deployed or not
+# Whether the smart contract was deployed or not, replaced by STATE
 DEPLOYED = b'deployed'
 
-# Whether the smart contract is paused or not
+# Whether the smart contract is paused or not, replaced by STATE
 PAUSED = b'paused'
 
+# Serialized [deployed, paused, token count, total supply], read once and written at most once per call
+STATE = b'STATE'
+STATE_DEPLOYED = 0
+STATE_PAUSED = 1
+STATE_TOKEN_COUNT = 2
+STATE_SUPPLY = 3
+
+
+# Characters of the packed ascii images, the nibble of each character is its index
+ASCII_PALETTE = 'BS#&@$%*!:.'
+
+# First byte of a packed ascii image, see art/packing.py for the format
+PACKED_IMAGE_MAGIC = b'\xa1'
+PACKED_HEADER_SIZE = 3
+PACKED_PAD = 14
+PACKED_RUN = 15
+PACKED_RUN_MIN = 3
+
+# First byte of a StdLib serialized Map, the metadata is stored serialized
+SERIALIZED_MAP_TYPE = b'\x48'
+
+# Maximum number of tokens returned by a page of tokensPaged and tokensOfPaged
+MAX_PAGE_SIZE = 100
+
+# Maximum number of token ids spanned by tokensRange and tokensOfRange
+MAX_RANGE_SIZE = 1024
+
+# Maximum number of entries read by balanceOfBatch and ownerOfBatch, and by propertiesBatch, so that a batch stays
+# well under the GAS limit of an RPC invocation
+MAX_BATCH_READ_SIZE = 500
+MAX_PROPERTIES_BATCH_SIZE = 100
+
+# Maximum number of token ids scanned by a call to sweepOrphans
+MAX_SWEEP_SIZE = 1024
+
+# Number of keys rewritten by update() and at most by a call to migrateStorage
+MIGRATION_BATCH_SIZE = 100
+MAX_MIGRATION_BATCH_SIZE = 1000
+
+# Token ids are big-endian on TOKEN_ID_SIZE bytes, so the storage order of the token keys is the minting order
+TOKEN_ID_SIZE = 4
+TOKEN_ID_OFFSET = 0x100000000
+MAX_TOKEN_ID = 0xffffffff
+# Ids sharing all bytes but the last one are found with a single prefix search
+TOKEN_ID_BLOCK = 256
+
+# Size of the sha256 under which the ascii images are shared between tokens
+IMAGE_HASH_SIZE = 32
+
+# Images are stored in chunks of IMAGE_CHUNK_SIZE bytes, the first one under the image key so an image of a single
+# chunk, as the 80 columns images, is still read with one get
+IMAGE_CHUNK_SIZE = 4096
+
 
 # -------------------------------------------
 # Prefixes
 # -------------------------------------------
 
-ACCOUNT_PREFIX = b'ACC'
-TOKEN_PREFIX = b'TPF'
-TOKEN_DATA_PREFIX = b'TDP'
-LOCKED_PREFIX = b'LCP'
-BALANCE_PREFIX = b'BLP'
-SUPPLY_PREFIX = b'SPP'
-META_PREFIX = b'MDP'
-LOCKED_VIEW_COUNT_PREFIX = b'LVCP'
-ROYALTIES_PREFIX = b'RYP'
-ASCII_PREFIX = b'ASC'
+# Single non-ascii bytes, they can't collide with the ascii keys of the previous layout
+TOKEN_PREFIX = b'\x01'
+ACCOUNT_PREFIX = b'\x02'
+ACCOUNT_SLOT_PREFIX = b'\x03'
+BALANCE_PREFIX = b'\x04'
+META_PREFIX = b'\x05'
+LOCKED_PREFIX = b'\x06'
+LOCKED_VIEW_COUNT_PREFIX = b'\x07'
+ROYALTIES_PREFIX = b'\x08'
+ASCII_PREFIX = b'\x09'
+IMAGE_PREFIX = b'\x0a'
+IMAGE_REF_PREFIX = b'\x0b'
+AUTH_PREFIX = b'\x0c'
+TOKEN_DATA_PREFIX = b'\x0d'
+IMAGE_CHUNK_PREFIX = b'\x0e'
+IMAGE_SIZE_PREFIX = b'\x0f'
+SUPPLY_PREFIX = b'SPP'  # replaced by STATE
+
+# Prefixes of the first deployed layout, only read by migrate_storage. Its account index entries hold the token id,
+# its metadata is json and every token has its own copy of the image. TDP was never written.
+LEGACY_TOKEN_PREFIX = b'TPF'
+LEGACY_ACCOUNT_PREFIX = b'ACC'
+LEGACY_BALANCE_PREFIX = b'BLP'
+LEGACY_META_PREFIX = b'MDP'
+LEGACY_LOCKED_PREFIX = b'LCP'
+LEGACY_LOCKED_VIEW_COUNT_PREFIX = b'LVCP'
+LEGACY_ROYALTIES_PREFIX = b'RYP'
+LEGACY_ASCII_PREFIX = b'ASC'
 
 
 # -------------------------------------------
 # Keys
 # -------------------------------------------
 
+# only read to migrate contracts deployed before STATE and the per-address AUTH_PREFIX keys
 TOKEN_COUNT = b'TOKEN_COUNT'
 AUTH_ADDRESSES = b'AUTH_ADDRESSES'
 
@@ -165,8 +237,7 @@ def totalSupply() -> int:
 
     :return: the total token supply deployed in the system.
     """
-    debug(['totalSupply: ', get(SUPPLY_PREFIX).to_int()])
-    return get(SUPPLY_PREFIX).to_int()
+    return cast(int, load_state()[STATE_SUPPLY])
 
 
 @public
@@ -186,6 +257,24 @@ def balanceOf(owner: UInt160) -> int:
     return get(mk_balance_key(owner)).to_int()
 
 
+@public
+def balanceOfBatch(owners: List[UInt160]) -> List[int]:
+    """
+    Get the current balance of several addresses in a single invocation
+
+    :param owners: the owner addresses to retrieve the balances for, at most MAX_BATCH_READ_SIZE
+    :type owners: List[UInt160]
+    :return: the balance of each address, in the order of `owners`
+    :raise AssertionError: raised if there are too many `owners` or if any `owner` length is not 20.
+    """
+    assert len(owners) <= MAX_BATCH_READ_SIZE, "Too many `owners`"
+    balances: List[int] = []
+    for owner in owners:
+        assert len(owner) == 20, "Incorrect `owner` length"
+        balances.append(get(mk_balance_key(owner)).to_int())
+    return balances
+
+
 @public
 def tokensOf(owner: UInt160) -> Iterator:
     """
@@ -236,16 +325,82 @@ def transfer(to: UInt160, tokenId: bytes, data: Any) -> bool:
         return False
 
     if (token_owner != to):
-        set_balance(token_owner, -1)
-        remove_token_account(token_owner, tokenId)
+        owner_balance = set_balance(token_owner, -1)
+        remove_token_account(token_owner, tokenId, owner_balance - 1)
 
-        set_balance(to, 1)
+        to_balance = set_balance(to, 1)
 
-        set_owner_of(tokenId, to)
-        add_token_account(to, tokenId)
+        set_owner_of(tokenId, to, to_balance)
+        add_token_account(to, tokenId, to_balance)
     post_transfer(token_owner, to, tokenId, data)
     return True
 
+
+@public
+def transferBatch(to: UInt160, tokenIds: List[bytes], data: Any) -> bool:
+    """
+    Transfers every token in tokenIds to address to
+
+    Same semantics as transfer, applied to a list of tokens: the pause status is checked once, the witness once per
+    distinct owner, and the balance of each distinct owner is written once. A Transfer event is fired and
+    onNEP11Payment is called for every token, in the order of tokenIds.
+
+    The batch is all or nothing: if the witness of any owner is missing nothing is transferred.
+
+    :param to: the address to transfer to
+    :type to: UInt160
+    :param tokenIds: the tokens to transfer
+    :type tokenIds: List[ByteString]
+    :param data: whatever data is pertinent to the onPayment method
+    :type data: Any
+    :return: whether the transfer was successful
+    :raise AssertionError: raised if `to` length is not 20, if any `tokenId` is not a valid NFT or is repeated, or if
+    the contract is paused.
+    """
+    assert len(to) == 20, "Incorrect `to` length"
+    assert not isPaused(), "Contract is currently paused"
+
+    # check every witness before writing anything
+    owners: List[UInt160] = []
+    balances: Dict[UInt160, int] = {}
+    seen: Dict[bytes, bool] = {}
+    for tokenId in tokenIds:
+        assert tokenId not in seen, "Duplicated `tokenId` in batch"
+        seen[tokenId] = True
+
+        token_owner = get_owner_of(tokenId)
+        if token_owner not in balances:
+            if not check_witness(token_owner):
+                return False
+            balances[token_owner] = get(mk_balance_key(token_owner)).to_int()
+        owners.append(token_owner)
+
+    # balances are tracked here while the tokens move and written once at the end
+    to_balance = get(mk_balance_key(to)).to_int()
+    received = 0
+    for index in range(len(tokenIds)):
+        token_owner = owners[index]
+        if token_owner != to:
+            tokenId = tokenIds[index]
+            owner_balance = balances[token_owner] - 1
+            balances[token_owner] = owner_balance
+
+            remove_token_account(token_owner, tokenId, owner_balance)
+            set_owner_of(tokenId, to, to_balance + received)
+            add_token_account(to, tokenId, to_balance + received)
+            received += 1
+
+    if received > 0:
+        for token_owner in balances.keys():
+            if token_owner != to:
+                put_balance(token_owner, balances[token_owner])
+        put_balance(to, to_balance + received)
+
+    for index in range(len(tokenIds)):
+        post_transfer(owners[index], to, tokenIds[index], data)
+    return True
+
+
 def post_transfer(token_owner: Union[UInt160, None], to: Union[UInt160, None], tokenId: bytes, data: Any):
     """
     Checks if the one receiving NEP11 tokens is a smart contract and if it's one the onPayment method will be called - internal
@@ -284,11 +439,36 @@ def ownerOf(tokenId: bytes) -> UInt160:
     return owner
 
 
+@public
+def ownerOfBatch(tokenIds: List[bytes]) -> List[Any]:
+    """
+    Get the owner of several tokens in a single invocation
+
+    Unlike ownerOf, an unknown or burned token doesn't throw, its owner is None.
+
+    :param tokenIds: the tokens for which to check the ownership, at most MAX_BATCH_READ_SIZE
+    :type tokenIds: List[ByteString]
+    :return: the owner of each token, in the order of `tokenIds`
+    :raise AssertionError: raised if there are too many `tokenIds`.
+    """
+    assert len(tokenIds) <= MAX_BATCH_READ_SIZE, "Too many `tokenIds`"
+    owners: List[Any] = []
+    for tokenId in tokenIds:
+        record = get(mk_token_key(tokenId))
+        if len(record) == 0:
+            owners.append(None)
+        else:
+            owners.append(UInt160(record[0:20]))
+    return owners
+
+
 @public
 def tokens() -> Iterator:
     """
     Get all tokens minted by the contract
 
+    The token ids are fixed-width big-endian, the iterator returns them in minting order.
+
     :return: an iterator that contains all of the tokens minted by the contract.
     """
     flags = FindOptions.REMOVE_PREFIX | FindOptions.KEYS_ONLY
@@ -297,7 +477,122 @@ def tokens() -> Iterator:
 
 
 @public
-def properties(tokenId: bytes) -> Dict[str, str]:
+def tokensPaged(cursor: int, count: int) -> List[Any]:
+    """
+    Get a page of the tokens minted by the contract
+
+    Token ids are read in minting order, starting after `cursor`, so the cost only depends on `count`. Burned
+    tokens are skipped, a page may then hold less than `count` tokens even if it isn't the last one.
+
+    :param cursor: 0 for the first page, then the cursor returned by the previous page
+    :type cursor: int
+    :param count: the number of token ids to read, at most MAX_PAGE_SIZE
+    :type count: int
+    :return: a list with the token ids of the page and the cursor of the next page, 0 after the last page
+    :raise AssertionError: raised if `cursor` is negative or if `count` is out of range.
+    """
+    assert cursor >= 0, "Invalid `cursor`"
+    assert 0 < count <= MAX_PAGE_SIZE, "Invalid `count`"
+
+    last = cast(int, load_state()[STATE_TOKEN_COUNT])
+    end = cursor + count
+    if end > last:
+        end = last
+
+    page: List[bytes] = []
+    for tokenId in range(cursor + 1, end + 1):
+        token_id_bytes = mk_token_id(tokenId)
+        if len(get(mk_token_key(token_id_bytes))) != 0:
+            page.append(token_id_bytes)
+
+    next_cursor = end
+    if end >= last:
+        next_cursor = 0
+    return [page, next_cursor]
+
+
+@public
+def tokensOfPaged(owner: UInt160, cursor: int, count: int) -> List[Any]:
+    """
+    Get a page of the token ids owned by the specified address
+
+    The tokens of an owner are kept in contiguous slots, a page reads `count` slots starting at `cursor` so the
+    cost only depends on `count`. Removing a token moves the owner's last token into its slot, so pages read while
+    the owner's tokens change may miss or repeat a token. Empty slots are skipped, a page may hold fewer ids.
+
+    :param owner: the owner address to retrieve the tokens for
+    :type owner: UInt160
+    :param cursor: 0 for the first page, then the cursor returned by the previous page
+    :type cursor: int
+    :param count: the number of token ids to read, at most MAX_PAGE_SIZE
+    :type count: int
+    :return: a list with the token ids of the page and the cursor of the next page, 0 after the last page
+    :raise AssertionError: raised if `owner` length is not 20, if `cursor` is negative or if `count` is out of range.
+    """
+    assert len(owner) == 20, "Incorrect `owner` length"
+    assert cursor >= 0, "Invalid `cursor`"
+    assert 0 < count <= MAX_PAGE_SIZE, "Invalid `count`"
+
+    balance = get(mk_balance_key(owner)).to_int()
+    end = cursor + count
+    if end > balance:
+        end = balance
+
+    page: List[bytes] = []
+    for slot in range(cursor, end):
+        token_id_bytes = get(mk_account_slot_key(owner, slot))
+        if len(token_id_bytes) != 0:
+            page.append(token_id_bytes)
+
+    next_cursor = end
+    if end >= balance:
+        next_cursor = 0
+    return [page, next_cursor]
+
+
+@public
+def tokensRange(startId: int, endId: int) -> List[bytes]:
+    """
+    Get the tokens minted by the contract with an id between startId and endId, both included
+
+    The ids are returned in minting order, burned tokens are skipped. Indexers can catch up on the tokens minted
+    after the last id they know of by reading successive ranges.
+
+    :param startId: the first token id of the range
+    :type startId: int
+    :param endId: the last token id of the range, at most MAX_RANGE_SIZE ids after startId
+    :type endId: int
+    :return: the token ids found in the range
+    :raise AssertionError: raised if the range is empty, too large or out of the token ids.
+    """
+    assert_token_range(startId, endId)
+    return find_token_range(TOKEN_PREFIX, startId, endId)
+
+
+@public
+def tokensOfRange(owner: UInt160, startId: int, endId: int) -> List[bytes]:
+    """
+    Get the token ids owned by the specified address between startId and endId, both included
+
+    The ids are returned in minting order.
+
+    :param owner: the owner address to retrieve the tokens for
+    :type owner: UInt160
+    :param startId: the first token id of the range
+    :type startId: int
+    :param endId: the last token id of the range, at most MAX_RANGE_SIZE ids after startId
+    :type endId: int
+    :return: the token ids owned by `owner` in the range
+    :raise AssertionError: raised if `owner` length is not 20, or if the range is empty, too large or out of the
+    token ids.
+    """
+    assert len(owner) == 20, "Incorrect `owner` length"
+    assert_token_range(startId, endId)
+    return find_token_range(mk_account_key(owner), startId, endId)
+
+
+@public
+def properties(tokenId: bytes) -> Dict[str, Any]:
     """
     Get the properties of a token.
 
@@ -308,21 +603,35 @@ def properties(tokenId: bytes) -> Dict[str, str]:
     :return: a serialized NVM object containing the properties for the given NFT.
     :raise AssertionError: raised if `tokenId` is not a valid NFT, or if no metadata available.
     """
-    metaBytes = cast(str, get_meta(tokenId))
-    assert len(metaBytes) != 0, 'No metadata available for token'
-    metaObject = cast(Dict[str, str], json_deserialize(metaBytes))
+    meta = get_meta(tokenId)
+    assert len(meta) != 0, 'No metadata available for token'
+    return build_properties(tokenId, meta, itoa(current_index), itoa(time))
 
-    img = get_ascii_image(tokenId)
-    current_blk_str = itoa(current_index)
-    current_time_str = itoa(time)
 
-    curr_len_blk = len(current_blk_str)
-    curr_len_time = len(current_time_str)
-    last = img[-1]
-    new = img[0: - (curr_len_blk + curr_len_time + 1)] + current_blk_str + last + current_time_str
-    metaObject["ascii"] = new
+@public
+def propertiesBatch(tokenIds: List[bytes]) -> List[Any]:
+    """
+    Get the properties of several tokens in a single invocation
 
-    return metaObject
+    Unlike properties, an unknown or burned token doesn't throw, its properties are None.
+
+    :param tokenIds: the tokens for which to check the properties, at most MAX_PROPERTIES_BATCH_SIZE
+    :type tokenIds: List[ByteString]
+    :return: the properties of each token, in the order of `tokenIds`
+    :raise AssertionError: raised if there are too many `tokenIds`.
+    """
+    assert len(tokenIds) <= MAX_PROPERTIES_BATCH_SIZE, "Too many `tokenIds`"
+    # the block and the time are the same for the whole batch
+    block = itoa(current_index)
+    now = itoa(time)
+    batch: List[Any] = []
+    for tokenId in tokenIds:
+        meta = get_meta(tokenId)
+        if len(meta) == 0:
+            batch.append(None)
+        else:
+            batch.append(build_properties(tokenId, meta, block, now))
+    return batch
 
 
 @public
@@ -340,9 +649,10 @@ def propertiesJson(tokenId: bytes, with_image: bool) -> bytes:
     meta = get_meta(tokenId)
     # assert len(meta) != 0, 'No metadata available for token'
     # debug(['properties: ', meta])
-    # meta_object = cast(Dict[str, str], json_deserialize(cast(str, meta)))
     # meta_object["ascii_image"] = get_ascii_image(tokenId)
-    return meta
+    if len(meta) == 0:
+        return meta
+    return cast(bytes, json_serialize(load_meta(meta)))
 
 
 @public
@@ -352,17 +662,23 @@ def _deploy(data: Any, upgrade: bool):
     """
     debug(["deploy now"])
     if upgrade:
+        # the authorized addresses go first, verify() needs them to continue the migration
+        migrate_authorized_addresses()
+        migrate_state()
+        # as with migrateStorage, the keys only move while nothing else writes them
+        if isPaused():
+            migrate_storage(MIGRATION_BATCH_SIZE)
         return
 
-    if get(DEPLOYED).to_bool():
+    if cast(bool, load_state()[STATE_DEPLOYED]):
         return
 
     tx = cast(Transaction, script_container)
     debug(["tx.sender: ", tx.sender, get_network()])
     owner: UInt160 = tx.sender
-    network = get_network()
 #DEBUG_START
 #custom owner for tests, ugly hack, because TestEnginge sets an unkown tx.sender...
+    network = get_network()
     if data is not None and network == 860833102:
         newOwner = cast(UInt160, data)
         debug(["check", newOwner])
@@ -378,14 +694,101 @@ def _deploy(data: Any, upgrade: bool):
 def internal_deploy(owner: UInt160):
 
     debug(["internal: ", owner])
-    put(DEPLOYED, True)
-    put(PAUSED, False)
-    put(TOKEN_COUNT, 0)
+    save_state([True, False, 0, 0])
 
-    auth: List[UInt160] = []
-    auth.append(owner)
-    serialized = serialize(auth)
-    put(AUTH_ADDRESSES, serialized)
+    put(mk_auth_key(owner), True)
+
+def migrate_authorized_addresses():
+    # contracts deployed before the per-address keys kept the addresses in a serialized list
+    serialized = get(AUTH_ADDRESSES)
+    if len(serialized) == 0:
+        return
+
+    auth = cast(list[UInt160], deserialize(serialized))
+    for addr in auth:
+        put(mk_auth_key(addr), True)
+    delete(AUTH_ADDRESSES)
+    debug(['migrated authorized addresses: ', len(auth)])
+
+def migrate_state():
+    # contracts deployed before STATE kept each value under its own key
+    if len(get(STATE)) != 0 or not get(DEPLOYED).to_bool():
+        return
+
+    save_state([True, get(PAUSED).to_bool(), get(TOKEN_COUNT).to_int(), get(SUPPLY_PREFIX).to_int()])
+    delete(DEPLOYED)
+    delete(PAUSED)
+    delete(TOKEN_COUNT)
+    delete(SUPPLY_PREFIX)
+
+def migrate_storage(budget: int) -> bool:
+    # the owners' slots and balances are rebuilt from the account index, the json metadata moves as is, load_meta
+    # reads it. The legacy token ids are converted on the way, see convert_token_id
+    budget = migrate_token_accounts(budget)
+    budget = delete_prefix(LEGACY_BALANCE_PREFIX, budget)
+    budget = migrate_token_prefix(LEGACY_META_PREFIX, META_PREFIX, budget)
+    budget = migrate_token_prefix(LEGACY_LOCKED_PREFIX, LOCKED_PREFIX, budget)
+    budget = migrate_token_prefix(LEGACY_LOCKED_VIEW_COUNT_PREFIX, LOCKED_VIEW_COUNT_PREFIX, budget)
+    budget = migrate_token_prefix(LEGACY_ROYALTIES_PREFIX, ROYALTIES_PREFIX, budget)
+    budget = migrate_ascii_images(budget)
+    # some budget left means every legacy key was moved
+    return budget > 0
+
+def convert_token_id(tokenId: bytes) -> bytes:
+    # the first deployed layout kept the ids as integers, little-endian on as few bytes as they take
+    return mk_token_id(tokenId.to_int())
+
+def migrate_token_prefix(old_prefix: bytes, new_prefix: bytes, budget: int) -> int:
+    # runs once every account is migrated, the entries of the tokens burned without an owner record are dropped
+    entries = find(old_prefix, get_context(), FindOptions.REMOVE_PREFIX)
+    while budget > 0 and entries.next():
+        entry = cast(List[bytes], entries.value)
+        tokenId = convert_token_id(entry[0])
+        if len(get(mk_token_key(tokenId))) != 0:
+            put(new_prefix + tokenId, entry[1])
+        delete(old_prefix + entry[0])
+        budget -= 1
+    return budget
+
+def delete_prefix(old_prefix: bytes, budget: int) -> int:
+    keys = find(old_prefix, get_context(), FindOptions.REMOVE_PREFIX | FindOptions.KEYS_ONLY)
+    while budget > 0 and keys.next():
+        delete(old_prefix + cast(bytes, keys.value))
+        budget -= 1
+    return budget
+
+def migrate_token_accounts(budget: int) -> int:
+    # each token takes the next slot of its owner, the balance counts the tokens migrated so far, so it goes on
+    # from the tokens minted since the upgrade and ends up as the legacy balance. The change of id is notified as the
+    # burn of the legacy id and the mint of the new one, so the indexers follow it
+    keys = find(LEGACY_ACCOUNT_PREFIX, get_context(), FindOptions.REMOVE_PREFIX | FindOptions.KEYS_ONLY)
+    while budget > 0 and keys.next():
+        key = cast(bytes, keys.value)
+        owner = UInt160(key[0:20])
+        legacy_id = key[20:]
+        tokenId = convert_token_id(legacy_id)
+        slot = set_balance(owner, 1)
+        set_owner_of(tokenId, owner, slot)
+        add_token_account(owner, tokenId, slot)
+        delete(LEGACY_TOKEN_PREFIX + legacy_id)
+        delete(LEGACY_ACCOUNT_PREFIX + key)
+        on_transfer(owner, None, 1, legacy_id)
+        on_transfer(None, owner, 1, tokenId)
+        budget -= 1
+    return budget
+
+def migrate_ascii_images(budget: int) -> int:
+    # the copies of the same image end up shared, as if the tokens were minted now. The burns of the first deployed
+    # contract left the images behind, the ones of tokens without an owner are dropped instead of shared
+    entries = find(LEGACY_ASCII_PREFIX, get_context(), FindOptions.REMOVE_PREFIX)
+    while budget > 0 and entries.next():
+        entry = cast(List[bytes], entries.value)
+        tokenId = convert_token_id(entry[0])
+        if len(entry[1]) != 0 and len(get(mk_token_key(tokenId))) != 0:
+            share_ascii_image(tokenId, cast(str, entry[1]))
+        delete(LEGACY_ASCII_PREFIX + entry[0])
+        budget -= 1
+    return budget
 
 
 @public
@@ -433,8 +836,9 @@ def burn(tokenId: bytes) -> bool:
     :return: whether the burn was successful.
     :raise AssertionError: raised if the contract is paused.
     """
-    assert not isPaused(), "Contract is currently paused"
-    return internal_burn(tokenId)
+    state = load_state()
+    assert not cast(bool, state[STATE_PAUSED]), "Contract is currently paused"
+    return internal_burn(tokenId, state)
 
 
 @public
@@ -455,13 +859,43 @@ def mint(account: UInt160, meta: bytes, lockedContent: bytes, royalties: bytes,
     :return: tokenId of the token minted
     :raise AssertionError: raised if the contract is paused or if check witness fails.
     """
-    assert not isPaused(), "Contract is currently paused"
+    state = load_state()
+    assert not cast(bool, state[STATE_PAUSED]), "Contract is currently paused"
 
     # TODO_TEMPLATE: add own logic if necessary, or uncomment below to restrict minting to contract authorized addresses
     # assert verify(), '`acccount` is not allowed to mint'
     assert check_witness(account), "Invalid witness" 
 
-    return internal_mint(account, meta, lockedContent, royalties, data)
+    return internal_mint(state, account, meta, lockedContent, royalties, data)
+
+
+@public
+def mintBatch(account: UInt160, metas: List[bytes], lockedContents: List[bytes], royalties: List[bytes],
+              images: List[Any]) -> List[bytes]:
+    """
+    Mint several new tokens in a single call.
+
+    The token ids are reserved as one contiguous range and the token counter, the total supply and the balance of
+    `account` are written once for the whole batch. A Transfer event is still fired for every token.
+
+    :param account: the address of the account that is minting the tokens
+    :type account: UInt160
+    :param metas: the metadata of each token
+    :type metas: List[bytes]
+    :param lockedContents: the lock content of each token, empty bytes for none
+    :type lockedContents: List[bytes]
+    :param royalties: the royalties of each token, empty bytes for none
+    :type royalties: List[bytes]
+    :param images: the ascii image of each token, None for none
+    :type images: List[Any]
+    :return: tokenIds of the tokens minted, in minting order
+    :raise AssertionError: raised if the contract is paused, if check witness fails or if the lists lengths differ.
+    """
+    state = load_state()
+    assert not cast(bool, state[STATE_PAUSED]), "Contract is currently paused"
+    assert check_witness(account), "Invalid witness"
+
+    return internal_mint_batch(state, account, metas, lockedContents, royalties, images)
 
 
 @public
@@ -479,6 +913,48 @@ def getRoyalties(tokenId: bytes) -> bytes:
     return royalties
 
 
+@public
+def imageInfo(tokenId: bytes) -> List[int]:
+    """
+    Get the size of a token image, to read it with imageChunk.
+
+    :param tokenId: the token to query
+    :type tokenId: ByteString
+    :return: the size of the image as stored, packed or raw, and its number of chunks of IMAGE_CHUNK_SIZE bytes, 0
+    and 0 for a token without image or an unknown token.
+    """
+    stored = get(mk_ascii_key(tokenId))
+    size = get_image_size(stored, get_image_head(stored))
+    return [size, (size + IMAGE_CHUNK_SIZE - 1) // IMAGE_CHUNK_SIZE]
+
+
+@public
+def imageChunk(tokenId: bytes, index: int) -> bytes:
+    """
+    Get a chunk of a token image, the chunks from 0 to the count of imageInfo joined are the image as stored, to
+    unpack if it starts with PACKED_IMAGE_MAGIC.
+
+    :param tokenId: the token to query
+    :type tokenId: ByteString
+    :param index: the index of the chunk
+    :type index: int
+    :return: the bytes of the image from `index` * IMAGE_CHUNK_SIZE, at most IMAGE_CHUNK_SIZE of them.
+    :raise AssertionError: raised if the image has no chunk at `index`.
+    """
+    assert index >= 0, 'Invalid chunk index'
+    stored = get(mk_ascii_key(tokenId))
+    head = get_image_head(stored)
+    # only a full first chunk of a shared image can have others
+    if index > 0 and len(head) == IMAGE_CHUNK_SIZE and len(stored) == IMAGE_HASH_SIZE:
+        chunk = get(mk_image_chunk_key(stored, index))
+        if len(chunk) != 0:
+            return chunk
+    # the images minted before the chunks are stored whole
+    start = index * IMAGE_CHUNK_SIZE
+    assert start < len(head), 'Invalid chunk index'
+    return head[start:start + IMAGE_CHUNK_SIZE]
+
+
 @public
 def getLockedContentViewCount(tokenId: bytes) -> int:
     """
@@ -518,21 +994,14 @@ def getLockedContent(tokenId: bytes) -> bytes:
 @public
 def getAuthorizedAddress() -> list[UInt160]:
     """
-    Configure authorized addresses.
-
-    When this contract address is included in the transaction signature,
-    this method will be triggered as a VerificationTrigger to verify that the signature is correct.
-    For example, this method needs to be called when withdrawing token from the contract.
+    Get the authorized addresses.
 
-    :param address: the address of the account that is being authorized
-    :type address: UInt160
-    :param authorized: authorization status of this address
-    :type authorized: bool
-    :return: whether the transaction signature is correct
-    :raise AssertionError: raised if witness is not verified.
+    :return: the addresses allowed to administrate the contract
     """
-    serialized = get(AUTH_ADDRESSES)
-    auth = cast(list[UInt160], deserialize(serialized))
+    auth: List[UInt160] = []
+    addresses = find_authorized_addresses()
+    while addresses.next():
+        auth.append(cast(UInt160, addresses.value))
 
     return auth
 
@@ -554,23 +1023,11 @@ def setAuthorizedAddress(address: UInt160, authorized: bool):
     :raise AssertionError: raised if witness is not verified.
     """
     assert verify(), '`acccount` is not allowed for setAuthorizedAddress'
-    serialized = get(AUTH_ADDRESSES)
-    auth = cast(list[UInt160], deserialize(serialized))
-
     if authorized:
-        found = False
-        for i in auth:
-            if i == address:
-                found = True
-
-        if not found:
-            auth.append(address)
-
-        put(AUTH_ADDRESSES, serialize(auth))
+        put(mk_auth_key(address), True)
         on_auth(address, 0, True)
     else:
-        auth.remove(address)
-        put(AUTH_ADDRESSES, serialize(auth))
+        delete(mk_auth_key(address))
         on_auth(address, 0, False)
 
 
@@ -585,9 +1042,11 @@ def updatePause(status: bool) -> bool:
     :raise AssertionError: raised if witness is not verified.
     """
     assert verify(), '`acccount` is not allowed for updatePause'
-    put(PAUSED, status)
-    debug(['updatePause: ', get(PAUSED).to_bool()])
-    return get(PAUSED).to_bool() 
+    state = load_state()
+    state[STATE_PAUSED] = status
+    save_state(state)
+    debug(['updatePause: ', status])
+    return status
 
 
 @public
@@ -599,12 +1058,22 @@ def isPaused() -> bool:
 
     :return: whether the contract is paused
     """
-    debug(['isPaused: ', get(PAUSED).to_bool()])
-    if get(PAUSED).to_bool():
+    if cast(bool, load_state()[STATE_PAUSED]):
         return True
     return False
 
 
+@public
+def stats() -> List[Any]:
+    """
+    Get the contract state in a single read.
+
+    :return: a list with whether the contract is deployed, whether it is paused, the last token id minted and the
+    total supply
+    """
+    return load_state()
+
+
 @public
 def verify() -> bool:
     """
@@ -614,17 +1083,17 @@ def verify() -> bool:
     this method will be triggered as a VerificationTrigger to verify that the signature is correct.
     For example, this method needs to be called when withdrawing token from the contract.
 
+    The authorized address must be the sender of the transaction, a single lookup whatever the number of
+    authorized addresses.
+
     :return: whether the transaction signature is correct
     """
-    serialized = get(AUTH_ADDRESSES)
-    auth = cast(list[UInt160], deserialize(serialized))
     tx = cast(Transaction, script_container)
-    for addr in auth: 
-        if check_witness(addr):
-            debug(["Verification successful", addr, tx.sender])
-            return True
+    if is_authorized(tx.sender) and check_witness(tx.sender):
+        debug(["Verification successful", tx.sender])
+        return True
 
-    debug(["Verification failed", addr])
+    debug(["Verification failed", tx.sender])
     return False
 
 
@@ -644,6 +1113,69 @@ def update(script: bytes, manifest: bytes):
     debug(['update called and done'])
 
 
+@public
+def migrateStorage(count: int) -> bool:
+    """
+    Move up to `count` keys of the first deployed storage layout to the current one.
+
+    update() moves the first MIGRATION_BATCH_SIZE keys when the contract is paused, this method is then called until
+    it returns True. A transfer or a mint between two batches would mix both layouts, the contract must stay paused
+    until the last one. The tokens get ids of TOKEN_ID_SIZE bytes, as the tokens minted now, a Transfer burning the
+    old id and minting the new one is notified for each of them. The entries left by burned tokens are dropped.
+
+    :param count: the maximum number of keys to move, at most MAX_MIGRATION_BATCH_SIZE
+    :type count: int
+    :return: whether every key was moved
+    :raise AssertionError: raised if witness is not verified, if the contract is not paused or if `count` is out of
+        range.
+    """
+    assert verify(), '`acccount` is not allowed for migrateStorage'
+    assert isPaused(), 'pause the contract before migrating'
+    assert 0 < count <= MAX_MIGRATION_BATCH_SIZE, "Invalid `count`"
+    return migrate_storage(count)
+
+
+@public
+def sweepOrphans(cursor: int, limit: int) -> List[Any]:
+    """
+    Delete the per-token entries left by the tokens that no longer have an owner.
+
+    Burns made before burn removed the view counter and the token data left them behind. Token ids are scanned in
+    minting order starting after `cursor`, with one prefix search per block of ids and per-token prefix, so the cost
+    depends on `limit` and on the entries found, not on the size of the collection.
+
+    :param cursor: 0 for the first page, then the cursor returned by the previous call
+    :type cursor: int
+    :param limit: the number of token ids to scan, at most MAX_SWEEP_SIZE
+    :type limit: int
+    :return: a list with the number of entries deleted and the cursor of the next call, 0 after the last token
+    :raise AssertionError: raised if witness is not verified, if `cursor` is negative or if `limit` is out of range.
+    """
+    assert verify(), '`acccount` is not allowed for sweepOrphans'
+    assert cursor >= 0, "Invalid `cursor`"
+    assert 0 < limit <= MAX_SWEEP_SIZE, "Invalid `limit`"
+
+    last = cast(int, load_state()[STATE_TOKEN_COUNT])
+    end = cursor + limit
+    if end > last:
+        end = last
+
+    removed = 0
+    if cursor < end:
+        removed += sweep_orphans(META_PREFIX, cursor + 1, end)
+        removed += sweep_orphans(LOCKED_PREFIX, cursor + 1, end)
+        removed += sweep_orphans(LOCKED_VIEW_COUNT_PREFIX, cursor + 1, end)
+        removed += sweep_orphans(ROYALTIES_PREFIX, cursor + 1, end)
+        removed += sweep_orphans(ASCII_PREFIX, cursor + 1, end)
+        removed += sweep_orphans(TOKEN_DATA_PREFIX, cursor + 1, end)
+    debug(['sweepOrphans: ', cursor, end, removed])
+
+    next_cursor = end
+    if end >= last:
+        next_cursor = 0
+    return [removed, next_cursor]
+
+
 @public
 def destroy():
     """
@@ -656,12 +1188,14 @@ def destroy():
     debug(['destroy called and done'])
 
 
-def internal_burn(tokenId: bytes) -> bool:
+def internal_burn(tokenId: bytes, state: List[Any]) -> bool:
     """
     Burn a token - internal
 
     :param tokenId: the token to burn
     :type tokenId: ByteString
+    :param state: the contract state, as returned by load_state
+    :type state: List[Any]
     :return: whether the burn was successful.
     :raise AssertionError: raised if `tokenId` is not a valid NFT.
     """
@@ -670,22 +1204,29 @@ def internal_burn(tokenId: bytes) -> bool:
     if not check_witness(owner):
         return False
 
+    owner_balance = set_balance(owner, -1)
+    remove_token_account(owner, tokenId, owner_balance - 1)
     remove_owner_of(tokenId)
-    set_balance(owner, -1)
-    add_to_supply(-1)
+    state[STATE_SUPPLY] = cast(int, state[STATE_SUPPLY]) - 1
+    save_state(state)
     remove_meta(tokenId)
     remove_locked_content(tokenId)
     remove_royalties(tokenId)
-    remove_token_account(owner, tokenId)
+    remove_ascii_image(tokenId)
+    remove_locked_view_counter(tokenId)
+    remove_token_data(tokenId)
     
     post_transfer(owner, None, tokenId, None)
     return True
 
 
-def internal_mint(account: UInt160, meta: bytes, lockedContent: bytes, royalties: bytes, data: Any) -> bytes:
+def internal_mint(state: List[Any], account: UInt160, meta: bytes, lockedContent: bytes, royalties: bytes,
+                  data: Any) -> bytes:
     """
     Mint new token - internal
 
+    :param state: the contract state, as returned by load_state
+    :type state: List[Any]
     :param account: the address of the account that is minting token
     :type account: UInt160
     :param meta: the metadata to use for this token
@@ -699,45 +1240,143 @@ def internal_mint(account: UInt160, meta: bytes, lockedContent: bytes, royalties
     :return: tokenId of the token minted
     :raise AssertionError: raised if meta is empty, or if contract is paused.
     """
-    assert len(meta) != 0, '`meta` can not be empty'
+    tokenId = cast(int, state[STATE_TOKEN_COUNT]) + 1
+    assert tokenId <= MAX_TOKEN_ID, "No token id left"
+    state[STATE_TOKEN_COUNT] = tokenId
+    state[STATE_SUPPLY] = cast(int, state[STATE_SUPPLY]) + 1
+    save_state(state)
+    token_id_bytes = mk_token_id(tokenId)
+
+    balance = set_balance(account, 1)
+
+    add_token(token_id_bytes, account, balance, meta, lockedContent, royalties, data)
+    post_transfer(None, account, token_id_bytes, None)
+    return token_id_bytes
+
+
+def internal_mint_batch(state: List[Any], account: UInt160, metas: List[bytes], lockedContents: List[bytes],
+                        royalties: List[bytes], images: List[Any]) -> List[bytes]:
+    """
+    Mint several new tokens - internal
+
+    :param state: the contract state, as returned by load_state
+    :type state: List[Any]
+    :param account: the address of the account that is minting the tokens
+    :type account: UInt160
+    :param metas: the metadata of each token
+    :type metas: List[bytes]
+    :param lockedContents: the lock content of each token
+    :type lockedContents: List[bytes]
+    :param royalties: the royalties of each token
+    :type royalties: List[bytes]
+    :param images: the ascii image of each token
+    :type images: List[Any]
+    :return: tokenIds of the tokens minted
+    :raise AssertionError: raised if the batch is empty, if the lists lengths differ or if any meta is empty.
+    """
+    amount = len(metas)
+    assert amount > 0, '`metas` can not be empty'
+    assert len(lockedContents) == amount, '`lockedContents` length does not match `metas`'
+    assert len(royalties) == amount, '`royalties` length does not match `metas`'
+    assert len(images) == amount, '`images` length does not match `metas`'
+
+    first = cast(int, state[STATE_TOKEN_COUNT]) + 1
+    assert first + amount - 1 <= MAX_TOKEN_ID, "No token id left"
+    state[STATE_TOKEN_COUNT] = first + amount - 1
+    state[STATE_SUPPLY] = cast(int, state[STATE_SUPPLY]) + amount
+    save_state(state)
+
+    balance = set_balance(account, amount)
+    debug(['mintBatch: ', first, amount])
+
+    tokenIds: List[bytes] = []
+    for index in range(amount):
+        token_id_bytes = mk_token_id(first + index)
+        add_token(token_id_bytes, account, balance + index, metas[index], lockedContents[index], royalties[index],
+                  images[index])
+        post_transfer(None, account, token_id_bytes, None)
+        tokenIds.append(token_id_bytes)
+
+    return tokenIds
+
+
+def add_token(tokenId: bytes, account: UInt160, slot: int, meta: bytes, lockedContent: bytes, royalties: bytes,
+              data: Any):
+    """
+    Store everything a newly minted token owns - internal
+
+    Counters, supply and balances are left to the caller so they can be updated once per batch.
 
-    tokenId = get(TOKEN_COUNT).to_int() + 1
-    put(TOKEN_COUNT, tokenId)
-    token_id_bytes = tokenId.to_bytes()
+    :param tokenId: the id of the new token
+    :type tokenId: bytes
+    :param account: the address of the account that owns the token
+    :type account: UInt160
+    :param slot: the position of the token in the tokens of `account`
+    :type slot: int
+    :param meta: the metadata to use for this token
+    :type meta: bytes
+    :param lockedContent: the lock content to use for this token
+    :type lockedContent: bytes
+    :param royalties: the royalties to use for this token
+    :type royalties: bytes
+    :param data: the ascii image of this token
+    :type data: Any
+    :raise AssertionError: raised if meta is empty.
+    """
+    assert len(meta) != 0, '`meta` can not be empty'
 
-    set_owner_of(token_id_bytes, account)
-    set_balance(account, 1)
-    add_to_supply(1)
+    set_owner_of(tokenId, account, slot)
 
-    add_meta(token_id_bytes, meta)
+    # parsed once here so reads only need a deserialize
+    meta_object = json_deserialize(cast(str, meta))
+    assert isinstance(meta_object, dict), '`meta` must be a json object'
+    add_meta(tokenId, serialize(meta_object))
     debug(['metadata: ', meta])
 
     if len(lockedContent) != 0:
-        add_locked_content(token_id_bytes, lockedContent)
+        add_locked_content(tokenId, lockedContent)
         debug(['locked: ', lockedContent])
 
     if len(royalties) != 0:
-        add_royalties(token_id_bytes, cast(str, royalties))
+        add_royalties(tokenId, cast(str, royalties))
         debug(['royalties: ', royalties])
 
     if data is not None:
         str_data: str = cast(str, data)
-        add_ascii_image(token_id_bytes, str_data)
+        add_ascii_image(tokenId, str_data)
 
-    add_token_account(account, token_id_bytes)
-    post_transfer(None, account, token_id_bytes, None)
-    return token_id_bytes
+    add_token_account(account, tokenId, slot)
 
 
-def remove_token_account(holder: UInt160, tokenId: bytes):
+def remove_token_account(holder: UInt160, tokenId: bytes, last_slot: int):
+    # called before the owner record of tokenId is changed, it still holds the slot
+    # the last token of the holder takes the freed slot so the slots stay contiguous
     key = mk_account_key(holder) + tokenId
-    debug(['add_token_account: ', key, tokenId])
+    debug(['remove_token_account: ', key, tokenId])
+    slot = get_slot_of(tokenId)
     delete(key)
 
-def add_token_account(holder: UInt160, tokenId: bytes):
+    # the slots are only updated when the token is found in its slot, an owner whose tokens have no slot keys, as
+    # before migrate_storage wrote them, has nothing to move and an empty entry is never moved into a slot
+    slot_key = mk_account_slot_key(holder, slot)
+    if get(slot_key) != tokenId:
+        return
+    last_key = mk_account_slot_key(holder, last_slot)
+    if slot != last_slot:
+        moved_token = get(last_key)
+        if len(moved_token) == 0:
+            delete(slot_key)
+        else:
+            put(slot_key, moved_token)
+            set_owner_of(moved_token, holder, slot)
+    delete(last_key)
+
+def add_token_account(holder: UInt160, tokenId: bytes, slot: int):
+    # index entry with an empty value, tokensOf only reads the keys
     key = mk_account_key(holder) + tokenId
-    debug(['add_token_account: ', key, tokenId])
-    put(key, tokenId)
+    debug(['add_token_account: ', key, tokenId, slot])
+    put(key, b'')
+    put(mk_account_slot_key(holder, slot), tokenId)
 
 def get_token_data(tokenId: bytes) -> Union[bytes, None]:
     key = mk_token_data_key(tokenId)
@@ -745,40 +1384,119 @@ def get_token_data(tokenId: bytes) -> Union[bytes, None]:
     val = get(key)
     return val
 
+def remove_token_data(tokenId: bytes):
+    key = mk_token_data_key(tokenId)
+    debug(['remove_token_data: ', key, tokenId])
+    delete(key)
+
 def add_token_data(tokenId: bytes, data: bytes):
     key = mk_token_data_key(tokenId)
     debug(['add_token_data: ', key, tokenId])
     put(key, data)
 
 def get_owner_of(tokenId: bytes) -> UInt160:
+    # the owner record is the owner address followed by the slot of the token in its tokens
     key = mk_token_key(tokenId)
     debug(['get_owner_of: ', key, tokenId])
     owner = get(key)
-    return UInt160(owner)
+    return UInt160(owner[0:20])
+
+def get_slot_of(tokenId: bytes) -> int:
+    record = get(mk_token_key(tokenId))
+    return record[20:].to_int()
 
 def remove_owner_of(tokenId: bytes):
     key = mk_token_key(tokenId)
     debug(['remove_owner_of: ', key, tokenId])
     delete(key)
 
-def set_owner_of(tokenId: bytes, owner: UInt160):
+def set_owner_of(tokenId: bytes, owner: UInt160, slot: int):
     key = mk_token_key(tokenId)
-    debug(['set_owner_of: ', key, tokenId])
-    put(key, owner)
+    debug(['set_owner_of: ', key, tokenId, slot])
+    put(key, owner + slot.to_bytes())
+
+def is_authorized(address: UInt160) -> bool:
+    return len(get(mk_auth_key(address))) != 0
+
+def find_authorized_addresses() -> Iterator:
+    flags = FindOptions.REMOVE_PREFIX | FindOptions.KEYS_ONLY
+    return find(AUTH_PREFIX, get_context(), flags)
 
-def add_to_supply(amount: int):
-    total = totalSupply() + (amount)
-    debug(['add_to_supply: ', amount])
-    put(SUPPLY_PREFIX, total)
+def assert_token_range(startId: int, endId: int):
+    assert 0 < startId <= endId, "Invalid range"
+    assert endId <= MAX_TOKEN_ID, "Invalid `endId`"
+    assert endId - startId < MAX_RANGE_SIZE, "Range is too large"
 
-def set_balance(owner: UInt160, amount: int):
+def find_token_range(prefix: bytes, startId: int, endId: int) -> List[bytes]:
+    # one prefix search per block of TOKEN_ID_BLOCK ids, the keys come in id order
+    tokenIds: List[bytes] = []
+    flags = FindOptions.REMOVE_PREFIX | FindOptions.KEYS_ONLY
+    context = get_context()
+    block_start = startId - startId % TOKEN_ID_BLOCK
+    while block_start <= endId:
+        block = mk_token_id(block_start)[0:TOKEN_ID_SIZE - 1]
+        keys = find(prefix + block, context, flags)
+        while keys.next():
+            last_byte = cast(bytes, keys.value)
+            low: int = last_byte[0]
+            tokenId = block_start + low
+            if tokenId > endId:
+                break
+            if tokenId >= startId:
+                tokenIds.append(block + last_byte)
+        block_start += TOKEN_ID_BLOCK
+    return tokenIds
+
+def sweep_orphans(prefix: bytes, startId: int, endId: int) -> int:
+    # the entries of prefix between startId and endId whose token has no owner record
+    removed = 0
+    for tokenId in find_token_range(prefix, startId, endId):
+        if len(get(mk_token_key(tokenId))) == 0:
+            if prefix == ASCII_PREFIX:
+                # shared images are reference counted
+                remove_ascii_image(tokenId)
+            else:
+                delete(prefix + tokenId)
+            removed += 1
+    return removed
+
+def build_properties(tokenId: bytes, meta: bytes, block: str, now: str) -> Dict[str, Any]:
+    metaObject = load_meta(meta)
+
+    # the dynamic fields get their own entries. An image of several chunks is served truncated to its first chunk,
+    # for the readers of `ascii`, with its number of chunks to read the whole image with imageChunk
+    stored = get(mk_ascii_key(tokenId))
+    head = get_image_head(stored)
+    size = get_image_size(stored, head)
+    if size > len(head):
+        metaObject["imageChunks"] = (size + IMAGE_CHUNK_SIZE - 1) // IMAGE_CHUNK_SIZE
+    metaObject["ascii"] = get_ascii_image(head)
+    metaObject["block"] = block
+    metaObject["time"] = now
+    return metaObject
+
+def load_state() -> List[Any]:
+    serialized = get(STATE)
+    if len(serialized) == 0:
+        return [False, False, 0, 0]
+    return cast(List[Any], deserialize(serialized))
+
+def save_state(state: List[Any]):
+    debug(['save_state: ', state])
+    put(STATE, serialize(state))
+
+def set_balance(owner: UInt160, amount: int) -> int:
+    # returns the balance before the change
     old = balanceOf(owner)
     new = old + (amount)
     debug(['set_balance: ', amount])
+    put_balance(owner, new)
+    return old
 
+def put_balance(owner: UInt160, balance: int):
     key = mk_balance_key(owner)
-    if (new > 0):
-        put(key, new)
+    if (balance > 0):
+        put(key, balance)
     else:
         delete(key)
 
@@ -788,6 +1506,12 @@ def get_meta(tokenId: bytes) -> bytes:
     val = get(key)
     return val
 
+def load_meta(meta: bytes) -> Dict[str, Any]:
+    # tokens minted before the metadata was serialized at mint keep the json
+    if meta[0:1] == SERIALIZED_MAP_TYPE:
+        return cast(Dict[str, Any], deserialize(meta))
+    return cast(Dict[str, Any], json_deserialize(cast(str, meta)))
+
 def remove_meta(tokenId: bytes):
     key = mk_meta_key(tokenId)
     debug(['remove_meta: ', key, tokenId])
@@ -831,12 +1555,168 @@ def remove_royalties(tokenId: bytes):
     delete(key)
 
 def add_ascii_image(tokenId: bytes, ascii_data: str):
-    key = mk_ascii_key(tokenId)
-    put(key, ascii_data)
+    if is_packed_image(ascii_data):
+        assert packed_image_width(ascii_data) > 0, 'Invalid packed image width'
+        assert is_valid_packed_image(ascii_data), 'Invalid packed image'
+    share_ascii_image(tokenId, ascii_data)
+
+def share_ascii_image(tokenId: bytes, ascii_data: str):
+    # images are stored once under their hash, the token only keeps the hash
+    image_hash = sha256(ascii_data)
+    ref_key = mk_image_ref_key(image_hash)
+    refs = get(ref_key).to_int()
+    if refs == 0:
+        put_image_chunks(image_hash, ascii_data)
+    put(ref_key, refs + 1)
+    debug(['add_ascii_image: ', image_hash, refs + 1])
 
-def get_ascii_image(tokenId: bytes) -> str:
     key = mk_ascii_key(tokenId)
-    return cast(str, get(key))
+    put(key, image_hash)
+
+def put_image_chunks(image_hash: bytes, ascii_data: str):
+    # the size is only stored for the images of several chunks
+    size = len(ascii_data)
+    put(mk_image_key(image_hash), ascii_data[0:IMAGE_CHUNK_SIZE])
+    if size > IMAGE_CHUNK_SIZE:
+        put(mk_image_size_key(image_hash), size)
+        index = 1
+        start = IMAGE_CHUNK_SIZE
+        while start < size:
+            put(mk_image_chunk_key(image_hash, index), ascii_data[start:start + IMAGE_CHUNK_SIZE])
+            index += 1
+            start += IMAGE_CHUNK_SIZE
+
+def delete_image_chunks(image_hash: bytes):
+    size_key = mk_image_size_key(image_hash)
+    size = get(size_key).to_int()
+    delete(mk_image_key(image_hash))
+    if size > 0:
+        delete(size_key)
+        index = 1
+        start = IMAGE_CHUNK_SIZE
+        while start < size:
+            delete(mk_image_chunk_key(image_hash, index))
+            index += 1
+            start += IMAGE_CHUNK_SIZE
+
+def get_image_head(stored: bytes) -> bytes:
+    # the first chunk of a shared image, tokens minted before the images were shared keep the image itself
+    if len(stored) == IMAGE_HASH_SIZE:
+        shared = get(mk_image_key(stored))
+        if len(shared) != 0:
+            return shared
+    return stored
+
+def get_image_size(stored: bytes, head: bytes) -> int:
+    # an image of several chunks has a full first chunk, other images are all in their head
+    if len(head) == IMAGE_CHUNK_SIZE and len(stored) == IMAGE_HASH_SIZE:
+        size = get(mk_image_size_key(stored)).to_int()
+        if size > 0:
+            return size
+    return len(head)
+
+def get_ascii_image(head: bytes) -> str:
+    ascii_data = cast(str, head)
+    if is_packed_image(ascii_data):
+        return unpack_ascii_image(ascii_data)
+    return ascii_data
+
+def remove_ascii_image(tokenId: bytes):
+    key = mk_ascii_key(tokenId)
+    image_hash = get(key)
+    delete(key)
+    if len(image_hash) != IMAGE_HASH_SIZE:
+        return
+
+    ref_key = mk_image_ref_key(image_hash)
+    refs = get(ref_key).to_int() - 1
+    debug(['remove_ascii_image: ', image_hash, refs])
+    if refs > 0:
+        put(ref_key, refs)
+    else:
+        delete(ref_key)
+        delete_image_chunks(image_hash)
+
+def is_packed_image(ascii_data: str) -> bool:
+    return len(ascii_data) >= PACKED_HEADER_SIZE and ascii_data[0:1] == PACKED_IMAGE_MAGIC
+
+def packed_image_width(packed: str) -> int:
+    data = cast(bytes, packed)
+    high: int = data[1]
+    low: int = data[2]
+    return high * 256 + low
+
+def packed_image_nibble(data: bytes, position: int) -> int:
+    value: int = data[position // 2]
+    if position % 2 == 0:
+        return value >> 4
+    return value & 0x0F
+
+def is_valid_packed_image(packed: str) -> bool:
+    # walks the whole nibble stream at mint, so unpack_ascii_image never reads past it or repeats nothing
+    data = cast(bytes, packed)
+    symbols = 0
+    position = PACKED_HEADER_SIZE * 2
+    end = len(data) * 2
+    while position < end:
+        code = packed_image_nibble(data, position)
+        if code == PACKED_RUN:
+            if symbols == 0 or position + 3 > end:
+                return False
+            position += 3
+        elif code == PACKED_PAD:
+            position = end
+        elif code < len(ASCII_PALETTE):
+            symbols += 1
+            position += 1
+        else:
+            return False
+    return symbols > 0
+
+def repeat_symbol(symbol: str, times: int) -> str:
+    # doubling keeps the number of concatenations logarithmic in the run length
+    result = ''
+    chunk = symbol
+    remaining = times
+    while remaining > 0:
+        if remaining % 2 == 1:
+            result = result + chunk
+        remaining = remaining // 2
+        if remaining > 0:
+            chunk = chunk + chunk
+    return result
+
+def unpack_ascii_image(packed: str) -> str:
+    data = cast(bytes, packed)
+    width = packed_image_width(packed)
+
+    symbols = ''
+    previous = ''
+    position = PACKED_HEADER_SIZE * 2
+    end = len(data) * 2
+    while position < end:
+        code = packed_image_nibble(data, position)
+        if code == PACKED_RUN and position + 3 > end:
+            # a run cut by the end of the first chunk of an image
+            position = end
+        elif code == PACKED_RUN:
+            run = packed_image_nibble(data, position + 1) * 16 + packed_image_nibble(data, position + 2)
+            symbols = symbols + repeat_symbol(previous, run + PACKED_RUN_MIN)
+            position += 3
+        elif code == PACKED_PAD:
+            position = end
+        else:
+            previous = ASCII_PALETTE[code:code + 1]
+            symbols = symbols + previous
+            position += 1
+
+    image = symbols[0:width]
+    start = width
+    total = len(symbols)
+    while start < total:
+        image = image + '\n' + symbols[start:start + width]
+        start += width
+    return image
 
 def get_locked_view_counter(tokenId: bytes) -> int:
     key = mk_lv_key(tokenId)
@@ -859,6 +1739,17 @@ def set_locked_view_counter(tokenId: bytes):
 def mk_account_key(address: UInt160) -> bytes:
     return ACCOUNT_PREFIX + address
 
+def mk_token_id(tokenId: int) -> bytes:
+    # the offset keeps the little-endian encoding on TOKEN_ID_SIZE bytes plus a 0x01, which is dropped
+    little_endian = (tokenId + TOKEN_ID_OFFSET).to_bytes()
+    return little_endian[3:4] + little_endian[2:3] + little_endian[1:2] + little_endian[0:1]
+
+def mk_auth_key(address: UInt160) -> bytes:
+    return AUTH_PREFIX + address
+
+def mk_account_slot_key(address: UInt160, slot: int) -> bytes:
+    return ACCOUNT_SLOT_PREFIX + address + slot.to_bytes()
+
 def mk_balance_key(address: UInt160) -> bytes:
     return BALANCE_PREFIX + address
 
@@ -880,5 +1771,17 @@ def mk_royalties_key(tokenId: bytes) -> bytes:
 def mk_ascii_key(tokenId: bytes) -> bytes:
     return ASCII_PREFIX + tokenId
 
+def mk_image_key(image_hash: bytes) -> bytes:
+    return IMAGE_PREFIX + image_hash
+
+def mk_image_ref_key(image_hash: bytes) -> bytes:
+    return IMAGE_REF_PREFIX + image_hash
+
+def mk_image_chunk_key(image_hash: bytes, index: int) -> bytes:
+    return IMAGE_CHUNK_PREFIX + image_hash + index.to_bytes()
+
+def mk_image_size_key(image_hash: bytes) -> bytes:
+    return IMAGE_SIZE_PREFIX + image_hash
+
 def mk_lv_key(tokenId: bytes) -> bytes:
     return LOCKED_VIEW_COUNT_PREFIX + tokenId
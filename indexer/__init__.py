@@ -0,0 +1,12 @@
+"""
+Off-chain index of the NFT contract, built from its notifications.
+
+The contract fires `Transfer` on mint, transfer and burn, `Authorized` when an address is added to or removed from
+the authorized addresses and `UnlockIncremented` when a locked content is read. Replaying them in order rebuilds
+the owner of every token, the tokens of every owner, the total supply and the authorized addresses, which the
+frontend then reads from SQLite instead of iterating the contract storage over RPC.
+
+Usage: python -m indexer --db <index.sqlite> (--jsonl <events.jsonl> | --rpc <url> --contract <hash>)
+"""
+from indexer.events import Event, from_application_log, read_jsonl, read_node, write_jsonl
+from indexer.store import IndexStore
@@ -0,0 +1,39 @@
+import argparse
+import sys
+from pathlib import Path
+from typing import List
+
+import indexer
+from indexer.events import read_jsonl, read_node, rpc_call
+from indexer.store import IndexStore
+
+
+def main(args: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='python -m indexer', description=indexer.__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', required=True, help='SQLite file of the index, created if missing')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--jsonl', type=Path, help='recorded events, see indexer/events.py')
+    source.add_argument('--rpc', help='RPC url of the node, e.g. http://localhost:50012')
+    parser.add_argument('--contract', help='script hash of the contract, with --rpc')
+    options = parser.parse_args(args)
+
+    store = IndexStore(options.db)
+    try:
+        if options.rpc is not None:
+            if options.contract is None:
+                parser.error('--contract is required with --rpc')
+            call = rpc_call(options.rpc)
+            end = call('getblockcount', []) - 1
+            applied = store.apply(read_node(call, options.contract, store.checkpoint + 1, end), until=end)
+        else:
+            applied = store.apply(read_jsonl(options.jsonl))
+        print('applied {0} events'.format(applied))
+        for name, value in store.stats().items():
+            print('{0:<12}{1:>12}'.format(name, value))
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,99 @@
+"""
+Replay speed of the indexer, in events per second, over a synthetic log.
+
+The log mimics a busy collection: mints, transfers, burns and locked content reads between a pool of owners, with
+a few authorization changes, 100 events per block. It is written as JSONL first so the replay includes reading and
+decoding the recording, as when replaying a real one.
+
+Usage: python -m indexer.bench [events] [--keep <dir>]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, List
+
+from indexer.events import AUTHORIZED, TRANSFER, UNLOCK_INCREMENTED, Event, read_jsonl, write_jsonl
+from indexer.store import IndexStore
+
+DEFAULT_EVENTS = 1000000
+EVENTS_PER_BLOCK = 100
+OWNERS = 1000
+
+
+def synthetic_events(count: int, seed: int = 0) -> Iterator[Event]:
+    """
+    Generate a consistent event log, every transfer and burn is of a live token.
+
+    :param count: the number of events
+    :param seed: the seed of the generator, the same seed gives the same log
+    """
+    rng = random.Random(seed)
+    owners = [rng.getrandbits(160).to_bytes(20, 'little') for _ in range(OWNERS)]
+    live: List[bytes] = []
+    owner_of = {}
+    unlocks = {}
+    next_id = 1
+    for number in range(count):
+        block, index = divmod(number, EVENTS_PER_BLOCK)
+        tx = '0x{0:064x}'.format(number)
+        roll = rng.random()
+        if roll < 0.4 or len(live) < 2:
+            token = next_id.to_bytes(4, 'big')
+            next_id += 1
+            owner_of[token] = rng.choice(owners)
+            live.append(token)
+            yield Event(block, tx, index, TRANSFER, (None, owner_of[token], 1, token))
+        elif roll < 0.8:
+            token = rng.choice(live)
+            to = rng.choice(owners)
+            yield Event(block, tx, index, TRANSFER, (owner_of[token], to, 1, token))
+            owner_of[token] = to
+        elif roll < 0.9:
+            token = rng.choice(live)
+            unlocks[token] = unlocks.get(token, 0) + 1
+            yield Event(block, tx, index, UNLOCK_INCREMENTED, (token, unlocks[token]))
+        elif roll < 0.98:
+            position = rng.randrange(len(live))
+            token = live[position]
+            live[position] = live[-1]
+            live.pop()
+            unlocks.pop(token, None)
+            yield Event(block, tx, index, TRANSFER, (owner_of.pop(token), None, 1, token))
+        else:
+            yield Event(block, tx, index, AUTHORIZED, (rng.choice(owners), 0, rng.random() < 0.7))
+
+
+def main(args: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='python -m indexer.bench', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('events', type=int, nargs='?', default=DEFAULT_EVENTS)
+    parser.add_argument('--keep', type=Path, help='write the log and the database in this directory and keep them')
+    options = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory() as temp:
+        directory = options.keep if options.keep is not None else Path(temp)
+        directory.mkdir(parents=True, exist_ok=True)
+        log_path = directory / 'events.jsonl'
+        db_path = directory / 'index.sqlite'
+        if db_path.exists():
+            db_path.unlink()
+
+        start = time.perf_counter()
+        count = write_jsonl(synthetic_events(options.events), log_path)
+        print('generated {0} events in {1:.2f}s'.format(count, time.perf_counter() - start))
+
+        store = IndexStore(str(db_path))
+        start = time.perf_counter()
+        applied = store.apply(read_jsonl(log_path))
+        elapsed = time.perf_counter() - start
+        print('replayed {0} events in {1:.2f}s, {2:.0f} events/s'.format(applied, elapsed, applied / elapsed))
+        for name, value in store.stats().items():
+            print('{0:<12}{1:>12}'.format(name, value))
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
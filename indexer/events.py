@@ -0,0 +1,127 @@
+"""
+Notifications of the contract, read from the application logs of a node or from a JSONL recording.
+
+A recording holds one notification per line, with its byte string arguments in hex::
+
+    {"block": 12, "tx": "0x...", "index": 0, "event": "Transfer", "args": [null, "a1b2...", 1, "00000001"]}
+"""
+import base64
+import json
+import urllib.request
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+TRANSFER = 'Transfer'
+AUTHORIZED = 'Authorized'
+UNLOCK_INCREMENTED = 'UnlockIncremented'
+EVENT_NAMES = (TRANSFER, AUTHORIZED, UNLOCK_INCREMENTED)
+
+RpcCall = Callable[[str, List[Any]], Any]
+
+
+class Event(NamedTuple):
+    block: int
+    tx: str
+    # position of the notification in its transaction
+    index: int
+    name: str
+    args: Tuple[Any, ...]
+
+
+def from_stack_item(item: Dict[str, Any]) -> Any:
+    """
+    Decode a stack item of an application log.
+
+    :return: bytes for byte strings and buffers, lists for arrays and None for null
+    """
+    kind = item['type']
+    if kind == 'Any':
+        return None
+    if kind == 'Integer':
+        return int(item['value'])
+    if kind == 'Boolean':
+        return item['value']
+    if kind in ('ByteString', 'Buffer'):
+        return base64.b64decode(item['value'])
+    if kind in ('Array', 'Struct'):
+        return [from_stack_item(value) for value in item['value']]
+    raise ValueError('unsupported stack item {0}'.format(kind))
+
+
+def from_application_log(block: int, log: Dict[str, Any], contract: str) -> List[Event]:
+    """
+    Extract the notifications of the contract from the application log of a transaction.
+
+    The notifications of faulted executions are dropped, their state changes were reverted.
+
+    :param block: the height of the block of the transaction
+    :param log: the result of `getapplicationlog`
+    :param contract: the script hash of the contract, 0x prefixed
+    :return: the events, in notification order
+    """
+    events = []
+    for execution in log['executions']:
+        if execution['vmstate'] != 'HALT':
+            continue
+        for index, notification in enumerate(execution['notifications']):
+            if notification['contract'].lower() != contract.lower() or notification['eventname'] not in EVENT_NAMES:
+                continue
+            events.append(Event(block, log['txid'], index, notification['eventname'],
+                                tuple(from_stack_item(notification['state']))))
+    return events
+
+
+def read_node(call: RpcCall, contract: str, start: int, end: Optional[int] = None) -> Iterator[Event]:
+    """
+    Read the events of the contract from the blocks of a node, neo-express or any node with the ApplicationLogs plugin.
+
+    :param call: sends a JSON-RPC request and returns its result, see rpc_call
+    :param contract: the script hash of the contract, 0x prefixed
+    :param start: the first block to read
+    :param end: the last block to read, the current height by default
+    :return: the events, in chain order
+    """
+    if end is None:
+        end = call('getblockcount', []) - 1
+    for height in range(start, end + 1):
+        block = call('getblock', [height, True])
+        for tx in block['tx']:
+            yield from from_application_log(height, call('getapplicationlog', [tx['hash']]), contract)
+
+
+def rpc_call(url: str) -> RpcCall:
+    def call(method: str, params: List[Any]) -> Any:
+        body = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params}).encode()
+        request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request) as response:
+            result = json.loads(response.read())
+        if 'error' in result:
+            raise RuntimeError('{0}: {1}'.format(method, result['error'].get('message')))
+        return result['result']
+    return call
+
+
+def read_jsonl(path: Path) -> Iterator[Event]:
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            args = tuple(bytes.fromhex(arg) if isinstance(arg, str) else arg for arg in record['args'])
+            yield Event(record['block'], record['tx'], record['index'], record['event'], args)
+
+
+def write_jsonl(events: Iterable[Event], path: Path) -> int:
+    """
+    Record events, to replay them later without a node.
+
+    :return: the number of events written
+    """
+    count = 0
+    with open(path, 'w') as f:
+        for event in events:
+            args = [arg.hex() if isinstance(arg, bytes) else arg for arg in event.args]
+            f.write(json.dumps({'block': event.block, 'tx': event.tx, 'index': event.index,
+                                'event': event.name, 'args': args}) + '\n')
+            count += 1
+    return count
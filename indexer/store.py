@@ -0,0 +1,164 @@
+"""
+SQLite tables of the index, updated by replaying the events of the contract in chain order.
+
+The checkpoint is the height of the last block whose events are all applied, it is committed along with them so an
+interrupted sync resumes after it without applying an event twice.
+"""
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+
+from indexer.events import AUTHORIZED, TRANSFER, UNLOCK_INCREMENTED, Event
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tokens (
+    token_id BLOB PRIMARY KEY,
+    owner BLOB NOT NULL,
+    unlock_count INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tokens_by_owner ON tokens (owner, token_id);
+CREATE TABLE IF NOT EXISTS authorized (
+    address BLOB PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS state (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+'''
+
+CHECKPOINT = 'checkpoint'
+SUPPLY = 'supply'
+
+# blocks applied per SQLite transaction
+DEFAULT_COMMIT_EVERY = 1000
+
+
+class IndexStore:
+    """
+    The index of the contract in a SQLite database.
+
+    :param path: the database file, in memory by default
+    """
+
+    def __init__(self, path: str = ':memory:'):
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        state = dict(self.db.execute('SELECT name, value FROM state'))
+        self._checkpoint: int = state.get(CHECKPOINT, -1)
+        self._supply: int = state.get(SUPPLY, 0)
+
+    def close(self):
+        self.db.close()
+
+    @property
+    def checkpoint(self) -> int:
+        """
+        :return: the height of the last block applied, -1 before the first one
+        """
+        return self._checkpoint
+
+    def apply(self, events: Iterable[Event], commit_every: int = DEFAULT_COMMIT_EVERY,
+              until: Optional[int] = None) -> int:
+        """
+        Apply events in chain order.
+
+        The events of blocks up to the checkpoint are skipped. The events of a block must all be in `events`, the
+        last block is considered complete when `events` ends.
+
+        :param events: the events, in chain order
+        :param commit_every: the number of blocks applied per transaction
+        :param until: the last block read by the source, the checkpoint moves there even if its last blocks had no
+            event
+        :return: the number of events applied
+        :raise ValueError: raised if the events are not in block order.
+        """
+        handlers = {
+            TRANSFER: self._transfer,
+            AUTHORIZED: self._authorized,
+            UNLOCK_INCREMENTED: self._unlock,
+        }
+        applied = 0
+        block = self._checkpoint
+        blocks = 0
+        try:
+            for event in events:
+                if event.block <= self._checkpoint:
+                    continue
+                if event.block < block:
+                    raise ValueError('event of block {0} after block {1}'.format(event.block, block))
+                if event.block != block:
+                    if blocks >= commit_every:
+                        self._commit(block)
+                        blocks = 0
+                    block = event.block
+                    blocks += 1
+                handler = handlers.get(event.name)
+                if handler is not None:
+                    handler(*event.args)
+                    applied += 1
+        except BaseException:
+            self.db.rollback()
+            self._load_supply()
+            raise
+        self._commit(block if until is None else max(block, until))
+        return applied
+
+    def owner_of(self, token_id: bytes) -> Optional[bytes]:
+        row = self.db.execute('SELECT owner FROM tokens WHERE token_id = ?', (token_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def tokens_of(self, owner: bytes) -> List[bytes]:
+        rows = self.db.execute('SELECT token_id FROM tokens WHERE owner = ? ORDER BY token_id', (owner,))
+        return [row[0] for row in rows]
+
+    def balance_of(self, owner: bytes) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM tokens WHERE owner = ?', (owner,)).fetchone()[0]
+
+    def unlock_count(self, token_id: bytes) -> int:
+        row = self.db.execute('SELECT unlock_count FROM tokens WHERE token_id = ?', (token_id,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def supply(self) -> int:
+        return self._supply
+
+    def authorized(self) -> List[bytes]:
+        return [row[0] for row in self.db.execute('SELECT address FROM authorized ORDER BY address')]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            CHECKPOINT: self._checkpoint,
+            SUPPLY: self._supply,
+            'owners': self.db.execute('SELECT COUNT(DISTINCT owner) FROM tokens').fetchone()[0],
+            'authorized': self.db.execute('SELECT COUNT(*) FROM authorized').fetchone()[0],
+        }
+
+    def _commit(self, block: int):
+        if block > self._checkpoint:
+            self.db.executemany('INSERT OR REPLACE INTO state (name, value) VALUES (?, ?)',
+                                ((CHECKPOINT, block), (SUPPLY, self._supply)))
+            self._checkpoint = block
+        self.db.commit()
+
+    def _load_supply(self):
+        row = self.db.execute('SELECT value FROM state WHERE name = ?', (SUPPLY,)).fetchone()
+        self._supply = 0 if row is None else row[0]
+
+    def _transfer(self, from_address: Optional[bytes], to_address: Optional[bytes], amount: int, token_id: bytes):
+        if from_address is None:
+            self.db.execute('INSERT OR REPLACE INTO tokens (token_id, owner) VALUES (?, ?)', (token_id, to_address))
+            self._supply += 1
+        elif to_address is None:
+            self.db.execute('DELETE FROM tokens WHERE token_id = ?', (token_id,))
+            self._supply -= 1
+        else:
+            self.db.execute('UPDATE tokens SET owner = ? WHERE token_id = ?', (to_address, token_id))
+
+    def _authorized(self, address: bytes, kind: int, add: bool):
+        if add:
+            self.db.execute('INSERT OR IGNORE INTO authorized (address) VALUES (?)', (address,))
+        else:
+            self.db.execute('DELETE FROM authorized WHERE address = ?', (address,))
+
+    def _unlock(self, token_id: bytes, counter: int):
+        self.db.execute('UPDATE tokens SET unlock_count = ? WHERE token_id = ?', (counter, token_id))
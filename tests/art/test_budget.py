@@ -0,0 +1,105 @@
+import sys
+import unittest
+from pathlib import Path
+
+import numpy
+
+sys.path.insert(0, str(Path(__file__).parents[2]))
+
+from art import budget, convert, packing
+
+
+def disc(size: int = 256) -> numpy.ndarray:
+    """
+    A bright disc with a dark ring on a gradient, sharp edges and smooth areas.
+    """
+    y, x = numpy.mgrid[:size, :size]
+    radius = numpy.hypot(x - size / 2, y - size / 2)
+    gray = x * 200 // size
+    gray[radius < size * 0.4] = 30
+    gray[radius < size * 0.3] = 240
+    return gray.astype(numpy.uint8)
+
+
+class BudgetTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.gray = disc()
+        cls.candidates = budget.candidates(cls.gray)
+
+    def test_sub_palette(self):
+        self.assertEqual('B.', budget.sub_palette(2))
+        self.assertEqual('B$.', budget.sub_palette(3))
+        self.assertEqual(packing.PALETTE, budget.sub_palette(len(packing.PALETTE)))
+        for size in (0, len(packing.PALETTE) + 1):
+            with self.assertRaises(ValueError):
+                budget.sub_palette(size)
+
+    def test_character_levels(self):
+        levels = budget.character_levels('B.')
+        self.assertEqual((63.5, 191.5), (levels[ord('B')], levels[ord('.')]))
+        # the last character of the default palette only covers 250 to 255
+        self.assertEqual(252.5, budget.character_levels(packing.PALETTE)[ord('.')])
+
+    def test_similarity(self):
+        reference = budget.reference_image(self.gray)
+        self.assertAlmostEqual(1.0, budget.similarity(reference, reference))
+        self.assertLess(budget.similarity(reference, 255 - reference), 0.5)
+        # a drawn art is the more similar the larger it is
+        qualities = [budget.similarity(reference, budget.draw(convert.to_ascii(self.gray, width), packing.PALETTE,
+                                                              reference.shape)) for width in (16, 40, 160)]
+        self.assertEqual(sorted(qualities), qualities)
+
+    def test_candidates(self):
+        self.assertEqual(len(budget.DEFAULT_WIDTHS) * len(budget.DEFAULT_PALETTE_SIZES), len(self.candidates))
+        for candidate in self.candidates:
+            if candidate.packed:
+                art = packing.unpack(candidate.image)
+            else:
+                art = candidate.image.decode()
+            rows = art.split('\n')
+            self.assertEqual((candidate.rows, candidate.width), (len(rows), len(rows[0])))
+            self.assertLessEqual(set(art) - {'\n'}, set(candidate.palette))
+            self.assertEqual(len(candidate.image) + budget.IMAGE_STORAGE_OVERHEAD, candidate.size)
+            self.assertEqual(candidate.size * budget.DEFAULT_STORAGE_PRICE, candidate.fee())
+
+    def test_best_within(self):
+        sizes = sorted(candidate.size for candidate in self.candidates)
+        previous = None
+        for limit in (sizes[0], sizes[len(sizes) // 2], sizes[-1]):
+            best = budget.best_within(self.candidates, limit)
+            self.assertLessEqual(best.size, limit)
+            self.assertEqual(max(candidate.quality for candidate in self.candidates if candidate.size <= limit),
+                             best.quality)
+            if previous is not None:
+                self.assertGreaterEqual(best.quality, previous.quality)
+            previous = best
+        with self.assertRaises(ValueError):
+            budget.best_within(self.candidates, sizes[0] - 1)
+
+        self.assertEqual(budget.best_within(self.candidates, 1000).image, budget.render_within(self.gray, 1000))
+
+    def test_chunked_storage_size(self):
+        self.assertEqual(budget.IMAGE_CHUNK_SIZE + budget.IMAGE_STORAGE_OVERHEAD,
+                         budget.storage_size(bytes(budget.IMAGE_CHUNK_SIZE)))
+        # the size, 2 bytes, and the second chunk, index 1
+        self.assertEqual(budget.IMAGE_CHUNK_SIZE + 1 + budget.IMAGE_STORAGE_OVERHEAD + (33 + 2) + (33 + 1),
+                         budget.storage_size(bytes(budget.IMAGE_CHUNK_SIZE + 1)))
+
+    def test_gas_budget(self):
+        self.assertEqual(1000, budget.gas_to_bytes(1))
+        self.assertEqual(500, budget.gas_to_bytes(0.1, storage_price=20000))
+
+    def test_report(self):
+        limit = sorted(candidate.size for candidate in self.candidates)[10]
+        lines = budget.format_report(self.candidates, limit).splitlines()
+        self.assertEqual(len(self.candidates) + 1, len(lines))
+        self.assertEqual(1, sum(line.startswith('*') for line in lines))
+        self.assertEqual(sum(candidate.size > limit for candidate in self.candidates),
+                         sum(line.startswith('-') for line in lines))
+        self.assertTrue(budget.format_report(self.candidates, 0).endswith('no candidate fits in 0 bytes'))
+
+
+if __name__ == '__main__':
+    unittest.main()
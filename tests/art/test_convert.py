@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy
+
+sys.path.insert(0, str(Path(__file__).parents[2]))
+
+from art import bench, convert, packing
+
+
+class ConvertTest(unittest.TestCase):
+
+    def test_lookup_table_matches_the_loop(self):
+        table = convert.lookup_table()
+        self.assertEqual(''.join(packing.PALETTE[level // 25] for level in range(256)).encode(), table.tobytes())
+
+    def test_lookup_table_of_other_palettes(self):
+        self.assertEqual(b'#' * 256, convert.lookup_table('#').tobytes())
+        self.assertEqual(b'#' * 128 + b' ' * 128, convert.lookup_table('# ').tobytes())
+        table = convert.lookup_table(''.join(chr(code) for code in range(200, 256)))
+        self.assertEqual(200, table[0])
+        self.assertEqual(255, table[255])
+        self.assertEqual(b'#' * 10 + b' ' * 246, convert.lookup_table('# ', levels=10).tobytes())
+        for palette in ('', 'a\nb', '█ '):
+            with self.assertRaises(ValueError):
+                convert.lookup_table(palette)
+        with self.assertRaises(ValueError):
+            convert.lookup_table(levels=0)
+
+    def test_full_size_matches_the_loop(self):
+        gray = bench.synthetic_image(64)
+        self.assertEqual(bench.legacy_to_ascii(gray), convert.to_ascii(gray, width=64, aspect=1.0))
+
+    def test_size(self):
+        gray = numpy.zeros((512, 512), dtype=numpy.uint8)
+        art = convert.to_ascii(gray)
+        rows = art.split(b'\n')
+        # the size of art/ascii_image.txt, from the 512x512 logo
+        self.assertEqual((44, 80), (len(rows), len(rows[0])))
+        self.assertEqual({b'B' * 80}, set(rows))
+
+        rows = convert.to_ascii(numpy.zeros((100, 400)), width=40, aspect=1.0).split(b'\n')
+        self.assertEqual((10, 40), (len(rows), len(rows[0])))
+        # never less than a row
+        self.assertEqual(b'BB', convert.to_ascii(numpy.zeros((1, 100)), width=2))
+
+    def test_cells_are_averaged(self):
+        gray = numpy.array([[0, 0, 255, 255],
+                            [0, 0, 255, 255],
+                            [0, 255, 0, 255],
+                            [255, 0, 255, 0]], dtype=numpy.uint8)
+        # the bottom cells are half bright, 127 // 25 = 5
+        self.assertEqual(b'B.\n$$', convert.to_ascii(gray, width=2, aspect=1.0))
+        self.assertEqual(b'B.\n$$', convert.to_ascii(gray.astype(numpy.int64), width=2, aspect=1.0))
+        # a larger art repeats the pixels
+        self.assertEqual(b'BB..', convert.to_ascii(gray[:1, 1:3], width=4, aspect=0.25))
+
+    def test_packs(self):
+        art = convert.to_ascii(bench.synthetic_image(512)).decode()
+        self.assertEqual(art, packing.unpack(packing.pack(art)))
+
+    def test_invalid_input(self):
+        for gray, width, aspect in ((numpy.zeros(10), 80, 0.5), (numpy.zeros((0, 4)), 80, 0.5),
+                                    (numpy.zeros((3, 3, 3)), 80, 0.5), (numpy.zeros((4, 4)), 0, 0.5),
+                                    (numpy.zeros((4, 4)), 4, 0)):
+            with self.assertRaises(ValueError):
+                convert.to_ascii(gray, width, aspect)
+
+    def test_no_files_written(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                convert.to_ascii(bench.synthetic_image(128))
+                self.assertEqual([], os.listdir(directory))
+            finally:
+                os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2]))
+
+from art import packing
+
+
+class PackingTest(unittest.TestCase):
+    ASCII_IMAGE_PATH = Path(__file__).parents[2] / 'art' / 'ascii_image.txt'
+
+    def assertRoundTrip(self, image: str) -> bytes:
+        packed = packing.pack(image)
+        self.assertTrue(packing.is_packed(packed))
+        self.assertEqual(image, packing.unpack(packed))
+        return packed
+
+    def test_header(self):
+        packed = packing.pack('BS\n#&')
+        self.assertEqual(packing.PACKED_IMAGE_MAGIC, packed[0])
+        self.assertEqual(2, int.from_bytes(packed[1:3], 'big'))
+        # B S # & -> 0x01 0x23
+        self.assertEqual(b'\x01\x23', packed[3:])
+
+    def test_odd_number_of_nibbles_is_padded(self):
+        packed = self.assertRoundTrip('BS#')
+        self.assertEqual(b'\x01\x2e', packed[3:])
+
+    def test_runs(self):
+        for length in (1, 2, 3, 4, 5, packing.RUN_MAX, packing.RUN_MAX + 1, packing.RUN_MAX + 3, 1000):
+            with self.subTest(length=length):
+                self.assertRoundTrip('.' * length)
+
+        packed = packing.pack('.' * 80)
+        # one literal and one run marker
+        self.assertEqual(packing.HEADER_SIZE + 2, len(packed))
+
+    def test_runs_span_rows(self):
+        image = '\n'.join(['....', '....', '..@@', '@@@@', '@.'])
+        self.assertRoundTrip(image)
+
+    def test_every_palette_character(self):
+        image = '\n'.join(packing.PALETTE[i:] + packing.PALETTE[:i] for i in range(len(packing.PALETTE)))
+        self.assertRoundTrip(image)
+
+    def test_reference_image(self):
+        image = self.ASCII_IMAGE_PATH.read_text()
+        packed = self.assertRoundTrip(image)
+        self.assertLess(len(packed), len(image) // 2)
+        print('\n{0}: {1} bytes raw, {2} bytes packed'.format(self.ASCII_IMAGE_PATH.name, len(image), len(packed)))
+
+    def test_invalid_images(self):
+        with self.assertRaises(ValueError):
+            packing.pack('')
+        with self.assertRaises(ValueError):
+            packing.pack('BS\nBSB')
+        with self.assertRaises(ValueError):
+            packing.pack('BS\nB\nBS')
+        with self.assertRaises(ValueError):
+            packing.pack('BS\n')
+        with self.assertRaises(ValueError):
+            packing.pack('Bx')
+
+    def test_invalid_packed_data(self):
+        with self.assertRaises(ValueError):
+            packing.unpack(b'BS#')
+        with self.assertRaises(ValueError):
+            packing.unpack(bytes([packing.PACKED_IMAGE_MAGIC, 0, 0, 0x01]))
+        with self.assertRaises(ValueError):
+            packing.unpack(bytes([packing.PACKED_IMAGE_MAGIC, 0, 1, 0xF0]))
+        with self.assertRaises(ValueError):
+            packing.unpack(bytes([packing.PACKED_IMAGE_MAGIC, 0, 1, 0xB0]))
+        with self.assertRaises(ValueError):
+            packing.unpack(bytes([packing.PACKED_IMAGE_MAGIC, 0, 1, 0xEE]))
+
+    def test_truncated_packed_data(self):
+        image = 'B' * 10 + 'S'
+        packed = packing.pack(image)
+        self.assertEqual(image, packing.unpack(packed, truncated=True))
+        # the stream cut in the run after the first character
+        with self.assertRaises(ValueError):
+            packing.unpack(packed[:packing.HEADER_SIZE + 1])
+        self.assertEqual('B', packing.unpack(packed[:packing.HEADER_SIZE + 1], truncated=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy
+
+sys.path.insert(0, str(Path(__file__).parents[2]))
+
+from art import bench, budget, convert, packing, pipeline
+
+
+class PipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.images = Path(self.directory.name) / 'images'
+        self.out = Path(self.directory.name) / 'assets'
+        self.images.mkdir()
+        for seed in range(3):
+            numpy.save(self.images / 'token{0}.npy'.format(seed), bench.synthetic_image(64, seed))
+        (self.images / 'notes.txt').write_text('not an image')
+        self.settings = pipeline.conversion_settings(width=16)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def manifest(self):
+        with open(self.out / pipeline.MANIFEST) as file:
+            return [json.loads(line) for line in file]
+
+    def test_manifest(self):
+        (self.images / 'token1.json').write_text('{"description": "the second", "rarity": 3}')
+        (self.images / 'token2.locked').write_text('secret')
+        royalties = '[{"address": "NZcuGiwRu1QscpmCyxj5XwQBUf6sk7dJJN", "value": 2000}]'
+        template = dict(pipeline.DEFAULT_METADATA, name='Token #{index}', image='ipfs://images/{name}')
+
+        run = pipeline.run_pipeline(self.images, self.out, self.settings, template, royalties, 'public', workers=2)
+        self.assertEqual((3, 0, 3, []), (run['images'], run['hits'], run['converted'], run['errors']))
+
+        tokens = self.manifest()
+        self.assertEqual(['token0.npy', 'token1.npy', 'token2.npy'], [token['source'] for token in tokens])
+        gray = numpy.load(self.images / 'token1.npy')
+        self.assertEqual(convert.to_ascii(gray, width=16).decode(), tokens[1]['image'])
+        self.assertEqual({'name': 'Token #1', 'description': 'the second', 'image': 'ipfs://images/token1.npy',
+                          'tokenURI': '', 'rarity': 3}, json.loads(tokens[1]['meta']))
+        self.assertEqual(['public', 'public', 'secret'], [token['lockedContent'] for token in tokens])
+        self.assertEqual({royalties}, {token['royalties'] for token in tokens})
+        self.assertEqual(pipeline.file_hash(self.images / 'token0.npy'), tokens[0]['hash'])
+
+    def test_unchanged_images_are_cached(self):
+        pipeline.run_pipeline(self.images, self.out, self.settings, workers=1)
+        first = self.manifest()
+
+        run = pipeline.run_pipeline(self.images, self.out, self.settings, workers=2)
+        self.assertEqual((3, 3, 0), (run['images'], run['hits'], run['converted']))
+        self.assertEqual(first, self.manifest())
+
+        # a changed image is converted again
+        numpy.save(self.images / 'token1.npy', bench.synthetic_image(64, 10))
+        # same size, the modification time may not have moved on a coarse clock
+        os.utime(self.images / 'token1.npy', ns=(1, 1))
+        run = pipeline.run_pipeline(self.images, self.out, self.settings, workers=1)
+        self.assertEqual((2, 1), (run['hits'], run['converted']))
+        self.assertNotEqual(first[1]['image'], self.manifest()[1]['image'])
+
+        # and every image with other settings
+        run = pipeline.run_pipeline(self.images, self.out, pipeline.conversion_settings(width=20), workers=1)
+        self.assertEqual((0, 3), (run['hits'], run['converted']))
+
+    def test_unchanged_files_are_not_hashed(self):
+        pipeline.run_pipeline(self.images, self.out, self.settings, workers=1)
+        source = self.images / 'token0.npy'
+        index = json.loads((self.out / pipeline.CACHE_DIRECTORY / pipeline.SOURCES_INDEX).read_text())
+        self.assertEqual(pipeline.file_hash(source), index[str(source.resolve())][2])
+
+        # the recorded hash is trusted while the size and modification time match
+        cache = pipeline.AssetCache(self.out / pipeline.CACHE_DIRECTORY)
+        cache.sources[str(source.resolve())][2] = 'recorded'
+        self.assertEqual('recorded', cache.source_hash(source))
+        os.utime(source, ns=(0, 0))
+        self.assertEqual(pipeline.file_hash(source), cache.source_hash(source))
+
+    def test_packed(self):
+        settings = pipeline.conversion_settings(width=16, pack=True)
+        pipeline.run_pipeline(self.images, self.out, settings, workers=1)
+        token = self.manifest()[0]
+        self.assertTrue(token['packed'])
+        gray = numpy.load(self.images / 'token0.npy')
+        self.assertEqual(convert.to_ascii(gray, width=16).decode(), packing.unpack(bytes.fromhex(token['image'])))
+
+    def test_budget(self):
+        settings = pipeline.conversion_settings(budget_bytes=400)
+        run = pipeline.run_pipeline(self.images, self.out, settings, workers=1)
+        self.assertEqual(3, run['converted'])
+        for token in self.manifest():
+            image = bytes.fromhex(token['image']) if token['packed'] else token['image'].encode()
+            self.assertEqual(token['packed'], packing.is_packed(image))
+            self.assertLessEqual(budget.storage_size(image), 400)
+
+        # a new budget is a new conversion
+        run = pipeline.run_pipeline(self.images, self.out, pipeline.conversion_settings(budget_bytes=800), workers=1)
+        self.assertEqual(0, run['hits'])
+
+    def test_errors(self):
+        (self.images / 'broken.npy').write_bytes(b'not numpy')
+        (self.images / 'token2.json').write_text('[]')
+        run = pipeline.run_pipeline(self.images, self.out, self.settings, workers=2)
+        self.assertEqual(['broken.npy', 'token2.npy'], [error['source'] for error in run['errors']])
+        self.assertEqual(['token0.npy', 'token1.npy'], [token['source'] for token in self.manifest()])
+        self.assertIn('2 images left out', pipeline.format_report(run))
+
+    def test_invalid_settings(self):
+        for width, palette, pack in ((0, packing.PALETTE, False), (80, '', False), (80, 'ab', True)):
+            with self.assertRaises(ValueError):
+                pipeline.conversion_settings(width=width, palette=palette, pack=pack)
+        with self.assertRaises(ValueError):
+            pipeline.conversion_settings(budget_bytes=budget.IMAGE_STORAGE_OVERHEAD)
+
+    def test_report(self):
+        report = pipeline.format_report({'images': 200, 'hits': 150, 'converted': 50, 'errors': [], 'workers': 4,
+                                         'seconds': 2.0})
+        self.assertEqual('200 images in 2.00s (100.0 images/s), 50 converted on 4 workers, cache hit rate 75.0%',
+                         report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict
+
+from boa3_test.tests.boa_test import BoaTest
+from boa3_test.tests.test_classes.testengine import TestEngine
+from boa3.neo.cryptography import hash160
+
+import test_nep11
+
+sys.path.insert(0, str(Path(__file__).parents[2]))
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+import numpy
+from art import convert, packing
+from compile_cache import CachedCompileMixin
+from engine_snapshots import EngineSnapshotMixin
+import gas_baseline
+
+
+class GasRegressionTest(CachedCompileMixin, EngineSnapshotMixin, BoaTest):
+    """
+    GAS of each public method over a matrix of input sizes, compared with the committed baseline.
+
+    Run with `make bench-contract`. The suite fails when a benchmark costs more than GAS_THRESHOLD percent (2 by
+    default) over tests/contract/gas_baseline.json. `make bench-contract-update` records the current figures as the
+    new baseline, to commit along with an intended cost change. The module is not named test_*, so that the suite
+    only runs from these targets and not in `make test-contract`.
+    """
+    p = Path(__file__)
+    NEP11_ROOT = str(p.parents[2])
+
+    CONTRACT_PATH_NEF = NEP11_ROOT + '/contracts/ascii-nft.nef'
+    CONTRACT_PATH_PY = NEP11_ROOT + '/contracts/ascii-nft.py'
+    ASCII_IMAGE_PATH = NEP11_ROOT + '/art/ascii_image.txt'
+    BASELINE_PATH = p.parent / 'gas_baseline.json'
+
+    TEST_ENGINE_PATH = test_nep11.NEP11Test.TEST_ENGINE_PATH
+    OWNER_SCRIPT_HASH = test_nep11.NEP11Test.OWNER_SCRIPT_HASH
+    OTHER_ACCOUNT_1 = test_nep11.NEP11Test.OTHER_ACCOUNT_1
+    TOKEN_META = test_nep11.NEP11Test.TOKEN_META
+    TOKEN_LOCKED = test_nep11.NEP11Test.TOKEN_LOCKED
+
+    # royalties with 0, 2 and 10 receivers
+    ROYALTIES = {
+        'none': b'',
+        '2': test_nep11.NEP11Test.ROYALTIES,
+        '10': json.dumps([{'address': 'NZcuGiwRu1QscpmCyxj5XwQBUf6sk7dJJN', 'value': 100}] * 10).encode(),
+    }
+    AUTHORIZED = (1, 10, 100)
+
+    def images(self) -> Dict[str, object]:
+        with open(self.ASCII_IMAGE_PATH) as f:
+            raw = f.read()
+        # three chunks, only their number is read by properties
+        chunked = convert.to_ascii(numpy.add.outer(numpy.arange(90), numpy.arange(100)) % 256, width=100,
+                                   aspect=1.0).decode()
+        return {'none': None, 'packed': packing.pack(raw), 'raw': raw, 'chunked': chunked}
+
+    def prepare_testengine(self) -> TestEngine:
+        def deploy(engine: TestEngine):
+            engine.add_signer_account(self.OWNER_SCRIPT_HASH)
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, '_deploy', self.OWNER_SCRIPT_HASH, False,
+                                    signer_accounts=[self.OWNER_SCRIPT_HASH],
+                                    expected_result_type=bool)
+
+        engine, _ = self.snapshot_engine('deployed', [self.CONTRACT_PATH_NEF], self.create_testengine, deploy)
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+        return engine
+
+    def create_testengine(self) -> TestEngine:
+        return test_nep11.NEP11Test.create_testengine(self)
+
+    def prepare_minter(self, engine: TestEngine) -> bytes:
+        output, manifest = self.compile_and_save(
+            self.get_contract_path('test_native', 'auxiliary_contract.py'))
+        aux_address = hash160(output)
+        engine.add_gas(aux_address, 1000 * 10 ** 8)
+        return aux_address
+
+    def mint(self, engine: TestEngine, minter: bytes, image, royalties: bytes = b'') -> bytes:
+        return self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                       minter, self.TOKEN_META, self.TOKEN_LOCKED, royalties, image,
+                                       signer_accounts=[minter],
+                                       expected_result_type=bytes)
+
+    def bench_tokens(self, figures: Dict[str, int]):
+        images = self.images()
+        for image_name, image in images.items():
+            for royalties_name, royalties in self.ROYALTIES.items():
+                engine = self.prepare_testengine()
+                minter = self.prepare_minter(engine)
+                token = self.mint(engine, minter, image, royalties)
+                figures['mint[image={0},royalties={1}]'.format(image_name, royalties_name)] = engine.gas_consumed
+
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', token)
+            figures['properties[image={0}]'.format(image_name)] = engine.gas_consumed
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'propertiesJson', token, False)
+            figures['propertiesJson[image={0}]'.format(image_name)] = engine.gas_consumed
+
+        engine = self.prepare_testengine()
+        minter = self.prepare_minter(engine)
+        token = self.mint(engine, minter, images['packed'])
+
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'ownerOf', token)
+        figures['ownerOf'] = engine.gas_consumed
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'balanceOf', minter)
+        figures['balanceOf'] = engine.gas_consumed
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'totalSupply')
+        figures['totalSupply'] = engine.gas_consumed
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'stats')
+        figures['stats'] = engine.gas_consumed
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getRoyalties', token)
+        figures['getRoyalties'] = engine.gas_consumed
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'imageInfo', token)
+        figures['imageInfo'] = engine.gas_consumed
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'imageChunk', token, 0)
+        figures['imageChunk'] = engine.gas_consumed
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getLockedContent', token,
+                                signer_accounts=[minter])
+        figures['getLockedContent'] = engine.gas_consumed
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getLockedContentViewCount', token)
+        figures['getLockedContentViewCount'] = engine.gas_consumed
+
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transfer', self.OTHER_ACCOUNT_1, token, None,
+                                signer_accounts=[minter],
+                                expected_result_type=bool)
+        figures['transfer'] = engine.gas_consumed
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', token,
+                                signer_accounts=[self.OTHER_ACCOUNT_1],
+                                expected_result_type=bool)
+        figures['burn'] = engine.gas_consumed
+
+    def bench_batches(self, figures: Dict[str, int]):
+        image = self.images()['packed']
+        for amount in (1, 10, 50):
+            engine = self.prepare_testengine()
+            minter = self.prepare_minter(engine)
+            tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                             minter, [self.TOKEN_META] * amount, [self.TOKEN_LOCKED] * amount,
+                                             [b''] * amount, [image] * amount,
+                                             signer_accounts=[minter],
+                                             expected_result_type=list)
+            figures['mintBatch[tokens={0}]'.format(amount)] = engine.gas_consumed
+
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfPaged', minter, 0, amount)
+            figures['tokensOfPaged[tokens={0}]'.format(amount)] = engine.gas_consumed
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensRange', 1, amount)
+            figures['tokensRange[tokens={0}]'.format(amount)] = engine.gas_consumed
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'ownerOfBatch', tokens)
+            figures['ownerOfBatch[tokens={0}]'.format(amount)] = engine.gas_consumed
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'propertiesBatch', tokens)
+            figures['propertiesBatch[tokens={0}]'.format(amount)] = engine.gas_consumed
+
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transferBatch', self.OTHER_ACCOUNT_1, tokens,
+                                    None,
+                                    signer_accounts=[minter],
+                                    expected_result_type=bool)
+            figures['transferBatch[tokens={0}]'.format(amount)] = engine.gas_consumed
+
+    def bench_admin(self, figures: Dict[str, int]):
+        for amount in self.AUTHORIZED:
+            engine = self.prepare_testengine()
+            # the owner is already authorized by the deploy
+            for index in range(1, amount):
+                engine.storage_put(b'\x0c' + index.to_bytes(20, 'little'), 1, self.CONTRACT_PATH_NEF)
+
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'setAuthorizedAddress',
+                                    self.OTHER_ACCOUNT_1, True,
+                                    signer_accounts=[self.OWNER_SCRIPT_HASH])
+            figures['setAuthorizedAddress[authorized={0}]'.format(amount)] = engine.gas_consumed
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getAuthorizedAddress')
+            figures['getAuthorizedAddress[authorized={0}]'.format(amount)] = engine.gas_consumed
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'updatePause', False,
+                                    signer_accounts=[self.OWNER_SCRIPT_HASH],
+                                    expected_result_type=bool)
+            figures['updatePause[authorized={0}]'.format(amount)] = engine.gas_consumed
+
+    def test_gas_regression(self):
+        self.compile_and_save(self.CONTRACT_PATH_PY)
+        figures: Dict[str, int] = {}
+        self.bench_tokens(figures)
+        self.bench_batches(figures)
+        self.bench_admin(figures)
+
+        baseline = gas_baseline.load_baseline(self.BASELINE_PATH)
+        print('\n' + gas_baseline.format_report(baseline, figures))
+        if os.environ.get('GAS_BASELINE_UPDATE'):
+            gas_baseline.save_baseline(self.BASELINE_PATH, figures)
+            print('Wrote {0}'.format(self.BASELINE_PATH))
+            return
+        if len(baseline) == 0:
+            self.fail('No GAS baseline in {0}, record it with `make bench-contract-update` and commit it'.format(
+                self.BASELINE_PATH))
+
+        threshold = float(os.environ.get('GAS_THRESHOLD', gas_baseline.DEFAULT_THRESHOLD))
+        regressions = gas_baseline.compare(baseline, figures, threshold)
+        self.assertEqual([], regressions,
+                         '\n'.join('{0} costs {1:+.2f}% over the baseline, more than {2}%'.format(
+                             regression.name, regression.change, threshold) for regression in regressions))
@@ -0,0 +1,523 @@
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from boa3_test.tests.boa_test import BoaTest
+from boa3_test.tests.test_classes.storage import Storage, StorageItem
+from boa3_test.tests.test_classes.testengine import TestEngine
+from boa3.neo.cryptography import hash160
+
+import test_nep11
+
+sys.path.insert(0, str(Path(__file__).parents[2]))
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+from art import packing
+from compile_cache import CachedCompileMixin
+from engine_snapshots import EngineSnapshotMixin
+import storage_footprint
+from engine_server import shared_server
+from persistent_engine import PersistentTestEngine
+
+
+class NEP11Bench(CachedCompileMixin, EngineSnapshotMixin, BoaTest):
+    """
+    GAS benchmarks of the contract hot paths, run with `make bench-contract-gas`.
+
+    The module is not named test_*, the benchmarks mint thousands of tokens and stay out of `make test-contract`.
+
+    The figures are printed, the assertions only check that the optimized paths stay cheaper than the naive ones.
+    """
+    p = Path(__file__)
+    NEP11_ROOT = str(p.parents[2])
+
+    CONTRACT_PATH_NEF = NEP11_ROOT + '/contracts/ascii-nft.nef'
+    CONTRACT_PATH_PY = NEP11_ROOT + '/contracts/ascii-nft.py'
+    # the first deployed contract, the base the optimizations are measured against
+    BASELINE_REVISION = 'fa8fe24'
+    ASCII_IMAGE_PATH = NEP11_ROOT + '/art/ascii_image.txt'
+
+    TEST_ENGINE_PATH = test_nep11.NEP11Test.TEST_ENGINE_PATH
+    OWNER_SCRIPT_HASH = test_nep11.NEP11Test.OWNER_SCRIPT_HASH
+    OTHER_ACCOUNT_1 = test_nep11.NEP11Test.OTHER_ACCOUNT_1
+    TOKEN_META = test_nep11.NEP11Test.TOKEN_META
+    TOKEN_LOCKED = test_nep11.NEP11Test.TOKEN_LOCKED
+    ROYALTIES = test_nep11.NEP11Test.ROYALTIES
+
+    def prepare_testengine(self, contract_path: str = CONTRACT_PATH_NEF) -> TestEngine:
+        def deploy(engine: TestEngine):
+            engine.add_signer_account(self.OWNER_SCRIPT_HASH)
+            self.run_smart_contract(engine, contract_path, '_deploy', self.OWNER_SCRIPT_HASH, False,
+                                    signer_accounts=[self.OWNER_SCRIPT_HASH],
+                                    expected_result_type=bool)
+
+        engine, _ = self.snapshot_engine('deployed', [contract_path], self.create_testengine, deploy)
+        return engine
+
+    def create_testengine(self) -> TestEngine:
+        return test_nep11.NEP11Test.create_testengine(self)
+
+    def compile_baseline(self) -> str:
+        """
+        Compile the contract as it was at BASELINE_REVISION, read from the git history.
+
+        :return: the path of the compiled nef
+        """
+        source = subprocess.run(['git', 'show', self.BASELINE_REVISION + ':contracts/ascii-nft.py'],
+                                cwd=self.NEP11_ROOT, capture_output=True, check=True).stdout
+        path = Path(tempfile.mkdtemp()) / 'ascii-nft.py'
+        path.write_bytes(source)
+        self.compile_and_save(str(path))
+        return str(path.with_suffix('.nef'))
+
+    def prepare_minter(self, engine: TestEngine) -> bytes:
+        output, manifest = self.compile_and_save(
+            self.get_contract_path('test_native', 'auxiliary_contract.py'))
+        aux_address = hash160(output)
+        engine.add_gas(aux_address, 10000 * 10 ** 8)
+        return aux_address
+
+    def storage_put_raw(self, engine: TestEngine, key: bytes, value: bytes):
+        # TestEngine.storage_put serializes bytes values as stack items
+        contract_id = engine._get_contract_id(self.CONTRACT_PATH_NEF)
+        engine._storage._dict[Storage.build_key(key, contract_id)] = StorageItem(value)
+
+    def contract_storage(self, engine: TestEngine, script_hash: bytes) -> Dict[bytes, bytes]:
+        storage = engine.storage
+        contract_id = storage.get_contract_id(script_hash)
+        return {key._key: item.value for key, item in storage._dict.items() if key._ID == contract_id}
+
+    def ascii_image(self) -> str:
+        with open(self.ASCII_IMAGE_PATH) as f:
+            return f.read()
+
+    def print_table(self, title: str, header: List[str], rows: List[List]):
+        print('\n' + title)
+        print(''.join('{0:>16}'.format(column) for column in header))
+        for row in rows:
+            print(''.join('{0:>16}'.format(value if isinstance(value, str) else '{0:.8f}'.format(value / 10 ** 8))
+                          for value in row))
+
+    def test_bench_mint_batch(self):
+        self.compile_and_save(self.CONTRACT_PATH_PY)
+        ascii_img = self.ascii_image()
+        rows = []
+        per_token: Dict[int, float] = {}
+
+        for amount in (1, 10, 50, 100):
+            # looping `mint`, one invocation per token
+            engine = self.prepare_testengine()
+            minter = self.prepare_minter(engine)
+            loop_gas = 0
+            for _ in range(amount):
+                self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                        minter, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES, ascii_img,
+                                        signer_accounts=[minter],
+                                        expected_result_type=bytes)
+                loop_gas += engine.gas_consumed
+
+            # a single `mintBatch`
+            engine = self.prepare_testengine()
+            minter = self.prepare_minter(engine)
+            tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                             minter, [self.TOKEN_META] * amount, [self.TOKEN_LOCKED] * amount,
+                                             [self.ROYALTIES] * amount, [ascii_img] * amount,
+                                             signer_accounts=[minter],
+                                             expected_result_type=list)
+            batch_gas = engine.gas_consumed
+            self.assertEqual(amount, len(tokens))
+
+            per_token[amount] = batch_gas / amount
+            rows.append([str(amount), loop_gas / amount, batch_gas / amount,
+                         '{0:.1f}%'.format(100 * (loop_gas - batch_gas) / loop_gas)])
+
+        self.print_table('GAS per token, mint loop vs mintBatch',
+                         ['batch size', 'mint', 'mintBatch', 'saved'], rows)
+        self.assertLess(per_token[100], per_token[1])
+
+    def test_bench_owner_of_invocations(self):
+        """
+        Invocations per second of `ownerOf`, with a dotnet process per invocation and on the engine server.
+        """
+        server = shared_server()
+        if server is None:
+            self.skipTest('tools/engine-server is not built, run `make build-engine-server`')
+        self.compile_and_save(self.CONTRACT_PATH_PY)
+        invocations = 100
+        batch_size = 25
+        rows = []
+
+        for name, engine in (('process per call', TestEngine(self.TEST_ENGINE_PATH)),
+                             ('engine server', PersistentTestEngine(server, self.TEST_ENGINE_PATH))):
+            engine.reset_engine()
+            engine.add_signer_account(self.OWNER_SCRIPT_HASH)
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, '_deploy', self.OWNER_SCRIPT_HASH, False,
+                                    signer_accounts=[self.OWNER_SCRIPT_HASH],
+                                    expected_result_type=bool)
+            minter = self.prepare_minter(engine)
+            token = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                            minter, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES, None,
+                                            signer_accounts=[minter],
+                                            expected_result_type=bytes)
+
+            start = time.perf_counter()
+            for _ in range(invocations):
+                owner = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'ownerOf', token)
+                self.assertEqual(minter, owner)
+            rows.append([name, invocations / (time.perf_counter() - start)])
+
+            if isinstance(engine, PersistentTestEngine):
+                start = time.perf_counter()
+                for _ in range(invocations // batch_size):
+                    owners = engine.run_batch([(self.CONTRACT_PATH_NEF, 'ownerOf', [token])] * batch_size)
+                    self.assertEqual([minter] * batch_size, owners)
+                rows.append(['batches of {0}'.format(batch_size), invocations / (time.perf_counter() - start)])
+
+        print('\nownerOf invocations per second')
+        for name, rate in rows:
+            print('{0:>20}{1:>12.1f}'.format(name, rate))
+        self.assertGreater(rows[1][1], rows[0][1])
+
+    def test_bench_transfer_batch(self):
+        self.compile_and_save(self.CONTRACT_PATH_PY)
+        ascii_img = self.ascii_image()
+        rows = []
+        per_token: Dict[int, float] = {}
+
+        for amount in (1, 10, 50):
+            engine = self.prepare_testengine()
+            minter = self.prepare_minter(engine)
+            tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                             minter, [self.TOKEN_META] * 2 * amount,
+                                             [self.TOKEN_LOCKED] * 2 * amount,
+                                             [self.ROYALTIES] * 2 * amount, [ascii_img] * 2 * amount,
+                                             signer_accounts=[minter],
+                                             expected_result_type=list)
+
+            # one `transfer` per token on the first half
+            single_gas = 0
+            for token in tokens[:amount]:
+                self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transfer',
+                                        self.OTHER_ACCOUNT_1, token, None,
+                                        signer_accounts=[minter],
+                                        expected_result_type=bool)
+                single_gas += engine.gas_consumed
+
+            # a single `transferBatch` on the second half
+            result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transferBatch',
+                                             self.OTHER_ACCOUNT_1, tokens[amount:], None,
+                                             signer_accounts=[minter],
+                                             expected_result_type=bool)
+            self.assertEqual(True, result)
+            batch_gas = engine.gas_consumed
+
+            per_token[amount] = batch_gas / amount
+            rows.append([str(amount), single_gas / amount, batch_gas / amount,
+                         '{0:.1f}%'.format(100 * (single_gas - batch_gas) / single_gas)])
+
+        self.print_table('GAS per token, transfer vs transferBatch',
+                         ['batch size', 'transfer', 'transferBatch', 'saved'], rows)
+        self.assertLess(per_token[50], per_token[1])
+
+    def test_bench_tokens_paged(self):
+        self.compile_and_save(self.CONTRACT_PATH_PY)
+        ascii_img = self.ascii_image()
+        page_size = 100
+        rows = []
+        page_gas: Dict[int, List[int]] = {}
+
+        engine = self.prepare_testengine()
+        minter = self.prepare_minter(engine)
+        minted = 0
+        for total in (100, 1000, 10000):
+            while minted < total:
+                self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                        minter, [self.TOKEN_META] * page_size, [self.TOKEN_LOCKED] * page_size,
+                                        [self.ROYALTIES] * page_size, [ascii_img] * page_size,
+                                        signer_accounts=[minter],
+                                        expected_result_type=list)
+                minted += page_size
+
+            # first and last page of the collection and of the owner
+            cursors = [0, total - page_size]
+            gas = []
+            for method, args in (('tokensPaged', []), ('tokensOfPaged', [minter])):
+                for cursor in cursors:
+                    page = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, method,
+                                                   *args, cursor, page_size)
+                    self.assertEqual(page_size, len(page[0]))
+                    gas.append(engine.gas_consumed)
+            page_gas[total] = gas
+            rows.append([str(total)] + gas)
+
+        self.print_table('GAS per page of {0} tokens'.format(page_size),
+                         ['tokens', 'tokensPaged', 'last page', 'tokensOfPaged', 'last page'], rows)
+        # a page costs the same whatever the size of the collection, up to the width of the ids
+        for gas in page_gas.values():
+            for index in range(len(gas)):
+                self.assertLess(abs(gas[index] - page_gas[100][index]), page_gas[100][index] / 100)
+
+    def test_bench_packed_image(self):
+        output, manifest = self.compile_and_save(self.CONTRACT_PATH_PY)
+        nep11_address = hash160(output)
+        ascii_img = self.ascii_image()
+        packed_img = packing.pack(ascii_img)
+        rows = []
+        mint_gas = {}
+
+        for name, image in (('raw', ascii_img), ('packed', packed_img)):
+            engine = self.prepare_testengine()
+            minter = self.prepare_minter(engine)
+            before = sum(len(k) + len(v) for k, v in self.contract_storage(engine, nep11_address).items())
+            token = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                            minter, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES, image,
+                                            signer_accounts=[minter],
+                                            expected_result_type=bytes)
+            mint_gas[name] = engine.gas_consumed
+            after = sum(len(k) + len(v) for k, v in self.contract_storage(engine, nep11_address).items())
+
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', token)
+            rows.append([name, str(len(image)), str(after - before), mint_gas[name], engine.gas_consumed])
+
+        self.print_table('ascii image storage, raw vs packed',
+                         ['image', 'image bytes', 'stored bytes', 'mint', 'properties'], rows)
+        self.assertLess(mint_gas['packed'], mint_gas['raw'])
+
+    def test_bench_shared_images(self):
+        output, manifest = self.compile_and_save(self.CONTRACT_PATH_PY)
+        nep11_address = hash160(output)
+        ascii_img = self.ascii_image()
+        # 10 distinct images, each shared by 100 tokens
+        images = [ascii_img[:-1] + packing.PALETTE[index] for index in range(10)]
+        tokens_per_image = 100
+
+        engine = self.prepare_testengine()
+        minter = self.prepare_minter(engine)
+        before = self.contract_storage(engine, nep11_address)
+        for image in images:
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                    minter, [self.TOKEN_META] * tokens_per_image,
+                                    [self.TOKEN_LOCKED] * tokens_per_image,
+                                    [self.ROYALTIES] * tokens_per_image, [image] * tokens_per_image,
+                                    signer_accounts=[minter],
+                                    expected_result_type=list)
+        after = self.contract_storage(engine, nep11_address)
+        minted = {k: v for k, v in after.items() if before.get(k) != v}
+
+        shared_bytes = sum(len(k) + len(v) for k, v in minted.items())
+        # the same tokens with the image copied under every `ASC` key
+        copied_bytes = sum(len(k) + len(v) for k, v in minted.items() if not k.startswith((b'\x0a', b'\x0b')))
+        copied_bytes += sum(len(images[0].encode()) - len(v) for k, v in minted.items() if k.startswith(b'\x09'))
+
+        self.print_table('storage of 1000 tokens sharing 10 images',
+                         ['layout', 'bytes', 'bytes/token'],
+                         [['copied', str(copied_bytes), str(copied_bytes // 1000)],
+                          ['shared', str(shared_bytes), str(shared_bytes // 1000)]])
+        self.assertLess(shared_bytes, copied_bytes)
+
+    def test_bench_properties(self):
+        self.compile_and_save(self.CONTRACT_PATH_PY)
+        ascii_img = self.ascii_image()
+        packed_img = packing.pack(ascii_img)
+        rows = []
+        properties_gas = {}
+
+        for name, image in (('raw', ascii_img), ('packed', packed_img)):
+            engine = self.prepare_testengine()
+            minter = self.prepare_minter(engine)
+            token = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                            minter, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES, image,
+                                            signer_accounts=[minter],
+                                            expected_result_type=bytes)
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', token)
+            serialized_gas = engine.gas_consumed
+
+            # the metadata as it was stored before, parsed on every read
+            engine.storage_put(b'\x05' + token, self.TOKEN_META.decode(), self.CONTRACT_PATH_NEF)
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', token)
+            json_gas = engine.gas_consumed
+
+            properties_gas[name] = (json_gas, serialized_gas)
+            rows.append([name, json_gas, serialized_gas,
+                         '{0:.1f}%'.format(100 * (json_gas - serialized_gas) / json_gas)])
+
+        self.print_table('GAS of properties, json vs serialized metadata',
+                         ['image', 'json', 'serialized', 'saved'], rows)
+        for json_gas, serialized_gas in properties_gas.values():
+            self.assertLess(serialized_gas, json_gas)
+
+    def test_bench_authorized_addresses(self):
+        self.compile_and_save(self.CONTRACT_PATH_PY)
+        rows = []
+        admin_gas: Dict[int, List[int]] = {}
+
+        for amount in (1, 10, 100):
+            engine = self.prepare_testengine()
+            # the owner is already authorized by the deploy
+            for index in range(1, amount):
+                engine.storage_put(b'\x0c' + index.to_bytes(20, 'little'), 1, self.CONTRACT_PATH_NEF)
+
+            gas = []
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'updatePause', False,
+                                    signer_accounts=[self.OWNER_SCRIPT_HASH],
+                                    expected_result_type=bool)
+            gas.append(engine.gas_consumed)
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'setAuthorizedAddress',
+                                    self.OTHER_ACCOUNT_1, True,
+                                    signer_accounts=[self.OWNER_SCRIPT_HASH])
+            gas.append(engine.gas_consumed)
+            auth = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getAuthorizedAddress')
+            gas.append(engine.gas_consumed)
+            self.assertEqual(amount + 1, len(auth))
+
+            admin_gas[amount] = gas
+            rows.append([str(amount)] + gas)
+
+        self.print_table('GAS per call with authorized addresses',
+                         ['addresses', 'updatePause', 'setAuthorized', 'getAuthorized'], rows)
+        # the signer is the transaction sender, checked with a single lookup
+        for gas in admin_gas.values():
+            self.assertEqual(admin_gas[1][0], gas[0])
+            self.assertEqual(admin_gas[1][1], gas[1])
+
+    def test_bench_state_record(self):
+        # the baseline keeps deployed, paused, the token count and the supply under separate keys
+        baseline_nef = self.compile_baseline()
+        self.compile_and_save(self.CONTRACT_PATH_PY)
+        ascii_img = self.ascii_image()
+        rows = []
+
+        for name, path in (('separate keys', baseline_nef), ('STATE', self.CONTRACT_PATH_NEF)):
+            engine = self.prepare_testengine(path)
+            minter = self.prepare_minter(engine)
+
+            gas = []
+            token = self.run_smart_contract(engine, path, 'mint',
+                                            minter, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES, ascii_img,
+                                            signer_accounts=[minter],
+                                            expected_result_type=bytes)
+            gas.append(engine.gas_consumed)
+            self.run_smart_contract(engine, path, 'transfer', self.OTHER_ACCOUNT_1, token, None,
+                                    signer_accounts=[minter],
+                                    expected_result_type=bool)
+            gas.append(engine.gas_consumed)
+            self.run_smart_contract(engine, path, 'burn', token,
+                                    signer_accounts=[self.OTHER_ACCOUNT_1],
+                                    expected_result_type=bool)
+            gas.append(engine.gas_consumed)
+
+            rows.append([name] + gas)
+
+        # the baseline also differs by every later change to mint and burn, the figures are printed to be read
+        # next to the other benchmarks, not compared
+        self.print_table('GAS per call, baseline separate state keys vs STATE record',
+                         ['state', 'mint', 'transfer', 'burn'], rows)
+
+    def test_bench_token_ranges(self):
+        self.compile_and_save(self.CONTRACT_PATH_PY)
+        total = 100000
+        span = 1024
+        rows = []
+        range_gas: Dict[int, List[int]] = {}
+
+        # only the keys read by the range queries, minting 100k tokens through the engine would take hours
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+        owner = self.OTHER_ACCOUNT_1
+        for token_id in range(1, total + 1):
+            token = token_id.to_bytes(4, 'big')
+            holder = owner if token_id % 4 == 0 else self.OWNER_SCRIPT_HASH
+            self.storage_put_raw(engine, b'\x01' + token, holder)
+            self.storage_put_raw(engine, b'\x02' + holder + token, b'')
+
+        # same offset in a block of 256 ids for every range, so they all skip the same number of keys
+        for start in (1, 196 * 256 + 1, 382 * 256 + 1):
+            gas = []
+            tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensRange', start, start + span - 1)
+            self.assertEqual(span, len(tokens))
+            self.assertEqual(start.to_bytes(4, 'big'), tokens[0])
+            gas.append(engine.gas_consumed)
+            tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfRange', owner,
+                                             start, start + span - 1)
+            self.assertEqual(span // 4, len(tokens))
+            gas.append(engine.gas_consumed)
+
+            range_gas[start] = gas
+            rows.append([str(start)] + gas)
+
+        self.print_table('GAS per range of {0} ids in {1} tokens'.format(span, total),
+                         ['first id', 'tokensRange', 'tokensOfRange'], rows)
+        # the cost depends on the span of the range, not on where it is in the collection
+        for gas in range_gas.values():
+            for index in range(len(gas)):
+                self.assertLess(abs(gas[index] - range_gas[1][index]), range_gas[1][index] / 100)
+
+    def test_bench_storage_layout(self):
+        # the first deployed layout: 3-4 byte prefixes, ids of 1-2 bytes, json metadata and a copy of the image per
+        # token. It has no mintBatch, both contracts mint the same raw image one token at a time
+        baseline_nef = self.compile_baseline()
+        self.compile_and_save(self.CONTRACT_PATH_PY)
+        ascii_img = self.ascii_image()
+        amount = 20
+        rows = []
+        token_bytes: Dict[str, float] = {}
+
+        for name, path in (('baseline', baseline_nef), ('current', self.CONTRACT_PATH_NEF)):
+            engine = self.prepare_testengine(path)
+            minter = self.prepare_minter(engine)
+            script, manifest = self.compile_and_save(path.replace('.nef', '.py'))
+            script_hash = hash160(script)
+            before = self.contract_storage(engine, script_hash)
+            for _ in range(amount):
+                self.run_smart_contract(engine, path, 'mint',
+                                        minter, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES, ascii_img,
+                                        signer_accounts=[minter],
+                                        expected_result_type=bytes)
+            after = self.contract_storage(engine, script_hash)
+
+            # the shared image and the balance are stored once, the other keys once per token
+            minted = {key: value for key, value in after.items() if before.get(key) != value}
+            key_size = sum(len(key) for key in minted)
+            size = key_size + sum(len(value) for value in minted.values())
+            token_bytes[name] = size / amount
+            rows.append([name, '{0}'.format(len(minted)), '{0:.1f}'.format(key_size / amount),
+                         '{0:.1f}'.format(size / amount)])
+
+        saved = token_bytes['baseline'] - token_bytes['current']
+        rows.append(['saved', '', '', '{0:.1f}'.format(saved)])
+        self.print_table('Storage bytes per token, {0} tokens minted'.format(amount),
+                         ['layout', 'keys', 'key bytes/token', 'bytes/token'], rows)
+        self.assertGreater(saved, 0)
+
+    def test_bench_storage_footprint(self):
+        script, manifest = self.compile_and_save(self.CONTRACT_PATH_PY)
+        ascii_img = self.ascii_image()
+        amount = 50
+        engine = self.prepare_testengine()
+        minter = self.prepare_minter(engine)
+        # half of the tokens share the same packed image, the others each have their own raw image
+        images = [packing.pack(ascii_img)] * (amount // 2)
+        images += [ascii_img.replace('.', ':', index + 1) for index in range(amount - amount // 2)]
+        tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                         minter, [self.TOKEN_META] * amount, [self.TOKEN_LOCKED] * amount,
+                                         [self.ROYALTIES] * amount, images,
+                                         signer_accounts=[minter],
+                                         expected_result_type=list)
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transferBatch',
+                                self.OTHER_ACCOUNT_1, tokens[:10], None,
+                                signer_accounts=[minter],
+                                expected_result_type=bool)
+
+        storage = self.contract_storage(engine, hash160(script))
+        dump_path = Path(tempfile.mkdtemp()) / 'storage.json'
+        storage_footprint.dump_storage(storage, dump_path)
+        print('\nStorage of {0} tokens, dumped to {1}'.format(amount, dump_path))
+
+        groups = storage_footprint.read_groups(Path(self.CONTRACT_PATH_PY).read_text())
+        footprints = storage_footprint.footprint(storage, groups)
+        print(storage_footprint.format_table(footprints, storage_footprint.DEFAULT_PROJECTION))
+        by_name = {entry.name: entry for entry in footprints}
+        self.assertNotIn(storage_footprint.UNKNOWN, by_name)
+        self.assertEqual(amount, by_name['TOKEN_PREFIX'].keys)
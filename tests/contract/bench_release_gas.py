@@ -0,0 +1,114 @@
+from pathlib import Path
+from typing import Dict, Optional
+
+from boa3_test.tests.boa_test import BoaTest
+from boa3_test.tests.test_classes.testengine import TestEngine
+from boa3_test.tests.test_classes.TestExecutionException import TestExecutionException
+from boa3.neo.cryptography import hash160
+
+import test_nep11
+from compile_cache import CachedCompileMixin
+
+
+class ReleaseGasTest(CachedCompileMixin, BoaTest):
+    """
+    Runs the same scenario against the debug and the release build and prints the GAS consumed per method.
+
+    The release build is produced by `make build-contract-release`, it is compiled here if it's missing. Only that
+    target runs the comparison, the module is not named test_* so `make test-contract` skips it.
+    """
+    p = Path(__file__)
+    NEP11_ROOT = str(p.parents[2])
+
+    CONTRACT_PATH_NEF = NEP11_ROOT + '/contracts/ascii-nft.nef'
+    RELEASE_PATH_PY = NEP11_ROOT + '/contracts/release/ascii-nft.py'
+    RELEASE_PATH_NEF = NEP11_ROOT + '/contracts/release/ascii-nft.nef'
+    ASCII_IMAGE_PATH = NEP11_ROOT + '/art/ascii_image.txt'
+
+    TEST_ENGINE_PATH = test_nep11.NEP11Test.TEST_ENGINE_PATH
+    OWNER_SCRIPT_HASH = test_nep11.NEP11Test.OWNER_SCRIPT_HASH
+    OTHER_ACCOUNT_1 = test_nep11.NEP11Test.OTHER_ACCOUNT_1
+    TOKEN_META = test_nep11.NEP11Test.TOKEN_META
+    TOKEN_LOCKED = test_nep11.NEP11Test.TOKEN_LOCKED
+    ROYALTIES = test_nep11.NEP11Test.ROYALTIES
+
+    def build_release(self):
+        import sys
+        sys.path.insert(0, self.NEP11_ROOT + '/tools')
+        from strip_debug import strip_debug
+
+        release = Path(self.RELEASE_PATH_PY)
+        release.parent.mkdir(parents=True, exist_ok=True)
+        release.write_text(strip_debug(Path(self.CONTRACT_PATH_NEF.replace('.nef', '.py')).read_text()))
+        self.compile_and_save(self.RELEASE_PATH_PY)
+
+    def measure(self, nef_path: str) -> Dict[str, Optional[int]]:
+        engine = TestEngine(self.TEST_ENGINE_PATH)
+        engine.reset_engine()
+        engine.add_signer_account(self.OWNER_SCRIPT_HASH)
+
+        output, manifest = self.compile_and_save(
+            self.get_contract_path('test_native', 'auxiliary_contract.py'))
+        aux_address = hash160(output)
+        engine.add_gas(aux_address, 10 * 10 ** 8)
+
+        with open(self.ASCII_IMAGE_PATH) as f:
+            ascii_img = f.read()
+
+        gas: Dict[str, Optional[int]] = {}
+
+        def run(name, method, *args, signer=None):
+            signers = [signer] if signer is not None else []
+            try:
+                result = self.run_smart_contract(engine, nef_path, method, *args, signer_accounts=signers)
+                gas[name] = engine.gas_consumed
+                return result
+            except TestExecutionException:
+                # admin methods fail on the release build, the TestEngine owner workaround is debug only
+                gas[name] = None
+                return None
+
+        run('_deploy', '_deploy', self.OWNER_SCRIPT_HASH, False, signer=self.OWNER_SCRIPT_HASH)
+        run('symbol', 'symbol')
+        run('decimals', 'decimals')
+        run('isPaused', 'isPaused')
+        token = run('mint', 'mint', aux_address, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES, ascii_img,
+                    signer=aux_address)
+        run('totalSupply', 'totalSupply')
+        run('balanceOf', 'balanceOf', aux_address)
+        run('ownerOf', 'ownerOf', token)
+        run('properties', 'properties', token)
+        run('getRoyalties', 'getRoyalties', token)
+        run('getLockedContent', 'getLockedContent', token, signer=aux_address)
+        run('getLockedContentViewCount', 'getLockedContentViewCount', token)
+        run('transfer', 'transfer', self.OTHER_ACCOUNT_1, token, None, signer=aux_address)
+        run('burn', 'burn', token, signer=self.OTHER_ACCOUNT_1)
+        run('updatePause', 'updatePause', False, signer=self.OWNER_SCRIPT_HASH)
+        run('setAuthorizedAddress', 'setAuthorizedAddress', self.OTHER_ACCOUNT_1, True,
+            signer=self.OWNER_SCRIPT_HASH)
+        run('verify', 'verify', signer=self.OWNER_SCRIPT_HASH)
+        return gas
+
+    def test_release_gas_comparison(self):
+        self.compile_and_save(self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
+        self.build_release()
+
+        debug_gas = self.measure(self.CONTRACT_PATH_NEF)
+        release_gas = self.measure(self.RELEASE_PATH_NEF)
+
+        def fmt(value):
+            return '-' if value is None else '{0:.8f}'.format(value / 10 ** 8)
+
+        print('\n{0:<28}{1:>14}{2:>14}{3:>14}{4:>8}'.format('method', 'debug', 'release', 'saved', '%'))
+        for method, debug_value in debug_gas.items():
+            release_value = release_gas.get(method)
+            if debug_value is None or release_value is None:
+                saved, percent = None, '-'
+            else:
+                saved = debug_value - release_value
+                percent = '{0:.1f}'.format(100 * saved / debug_value) if debug_value else '-'
+            print('{0:<28}{1:>14}{2:>14}{3:>14}{4:>8}'.format(method, fmt(debug_value), fmt(release_value),
+                                                            fmt(saved), percent))
+
+        self.assertIsNotNone(release_gas['mint'])
+        self.assertLess(release_gas['mint'], debug_gas['mint'])
@@ -0,0 +1,141 @@
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from boa3.neo.smart_contract.VoidType import VoidType
+from boa3.neo.smart_contract.notification import Notification
+from boa3.neo.utils import stack_item_from_json
+from boa3.neo3.core.types import UInt160
+from boa3.neo3.vm import VMState
+from boa3_test.tests.test_classes.block import Block
+from boa3_test.tests.test_classes.storage import Storage, StorageItem, StorageKey
+from boa3_test.tests.test_classes.testcontract import TestContract
+from boa3_test.tests.test_classes.testengine import TestEngine
+from boa3_test.tests.test_classes.transaction import Transaction
+
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+from engine_server import EngineServer, EngineServerError
+
+Invocation = Tuple[Union[str, UInt160], str, Sequence[Any]]
+
+
+class PersistentTestEngine(TestEngine):
+    """
+    A TestEngine running its invocations on the engine server instead of a new dotnet process each.
+
+    The storage is only sent when the server does not hold it yet, e.g. after `add_gas`, a raw storage write or a
+    snapshot restore, and only its changes come back. The results are applied as TestEngine.run of neo3-boa 0.11
+    applies them.
+    """
+
+    def __init__(self, server: EngineServer, root_path: str = None):
+        super().__init__(root_path)
+        self._server = server
+
+    def run(self, contract_id: Union[str, UInt160], method: str, *arguments: Any, reset_engine: bool = False,
+            rollback_on_fault: bool = True) -> Any:
+        contract_id = self._prepare_invocation(contract_id)
+        try:
+            result = self._server.invoke(self.to_json(contract_id, method, *arguments), self._storage)
+        except EngineServerError as e:
+            result = {'error': str(e)}
+        return self._apply_result(result, reset_engine, rollback_on_fault)
+
+    def run_batch(self, invocations: List[Invocation], rollback_on_fault: bool = True) -> List[Any]:
+        """
+        Run invocations in a single request to the server.
+
+        The invocations run on the chain state (height, blocks, signers) of the start of the batch, only the
+        storage goes from one to the next.
+
+        :return: the result of each invocation
+        """
+        requests = []
+        for contract_id, method, arguments in invocations:
+            contract_id = self._prepare_invocation(contract_id)
+            requests.append(self.to_json(contract_id, method, *arguments))
+        try:
+            results = self._server.invoke_batch(requests, self._storage)
+        except EngineServerError as e:
+            results = [{'error': str(e)}] * len(requests)
+        return [self._apply_result(result, False, rollback_on_fault) for result in results]
+
+    def _prepare_invocation(self, contract_id: Union[str, UInt160]) -> Union[str, UInt160]:
+        if isinstance(contract_id, str) and contract_id not in self.contracts:
+            self.add_contract(contract_id)
+        # build an UInt160 value if the contract_id is not a path
+        if isinstance(contract_id, bytes) and not isinstance(contract_id, UInt160):
+            contract_id = UInt160(contract_id)
+        return contract_id
+
+    def _apply_result(self, result: Dict[str, Any], reset_engine: bool, rollback_on_fault: bool) -> Any:
+        # the storage changes apply to the storage of the run, not to the one cleared by the reset
+        storage = self._storage.copy() if reset_engine else self._storage
+        if reset_engine:
+            self.reset_engine()
+        else:
+            self.reset_state()
+
+        try:
+            self._error_message = result['error'] if 'error' in result else None
+            if 'vmstate' in result:
+                self._vm_state = VMState.get_vm_state(result['vmstate'])
+            if 'gasconsumed' in result:
+                self._gas_consumed = int(result['gasconsumed'])
+            if 'resultstack' in result:
+                stack = result['resultstack'] if isinstance(result['resultstack'], list) else [result['resultstack']]
+                self._result_stack = [stack_item_from_json(value) for value in stack]
+
+            if self._vm_state is VMState.HALT or not rollback_on_fault:
+                self._apply_changes(result, storage)
+
+            if self._vm_state is VMState.HALT and 'storagechanges' in result:
+                self._server.sync(self._storage)
+            elif self._vm_state is VMState.FAULT and rollback_on_fault and not reset_engine:
+                # both sides kept the storage from before the invocation
+                self._server.sync(self._storage)
+            else:
+                self._server.forget()
+        except BaseException as e:
+            self._error_message = str(e)
+            self._server.forget()
+
+        return self._result_stack[-1] if len(self._result_stack) > 0 else VoidType
+
+    def _apply_changes(self, result: Dict[str, Any], storage: Storage):
+        if 'notifications' in result:
+            notifications = result['notifications']
+            if not isinstance(notifications, list):
+                notifications = [notifications]
+            self._notifications.extend(notification for notification in map(Notification.from_json, notifications)
+                                       if notification is not None)
+
+        if 'storagechanges' in result:
+            self._storage = storage
+            self._apply_storage_changes(result['storagechanges'])
+            for contract in self._contract_paths.copy():
+                if (not isinstance(contract, TestContract)
+                        or contract.script_hash is None
+                        or not self._storage.has_contract(contract.script_hash)):
+                    self.remove_contract(contract.path)
+
+        if 'currentblock' in result:
+            current_block = Block.from_json(result['currentblock'])
+            existing_block = next((block for block in self._blocks if block.index == current_block.index), None)
+            if existing_block is not None:
+                self._blocks.remove(existing_block)
+            self._blocks.append(current_block)
+
+        if 'transaction' in result and self._vm_state is VMState.HALT:
+            block = self.current_block
+            if block is None:
+                block = self.increase_block(self.height)
+            block.add_transaction(Transaction.from_json(result['transaction']))
+
+    def _apply_storage_changes(self, changes: Dict[str, List[Dict[str, Any]]]):
+        # the items are replaced, never changed in place, the snapshots and the server rely on it
+        storage = self._storage._dict
+        for key in changes['delete']:
+            storage.pop(StorageKey.from_json(key), None)
+        for entry in changes['put']:
+            storage[StorageKey.from_json(entry['key'])] = StorageItem.from_json(entry['value'])
@@ -1,10 +1,11 @@
+import os
 import sys
 import json
-from PIL import Image
 from typing import Dict
 from pathlib import Path
 from boa3_test.tests.boa_test import BoaTest
 from boa3_test.tests.test_classes.testengine import TestEngine
+from boa3_test.tests.test_classes.storage import Storage, StorageItem
 from boa3.neo.smart_contract.VoidType import VoidType
 from boa3.neo.cryptography import hash160
 from boa3.constants import GAS_SCRIPT
@@ -16,8 +17,17 @@ from boa3.builtin.interop.iterator import Iterator
 from boa3_test.tests.test_classes.TestExecutionException import TestExecutionException
 from boa3.neo.core.types.InteropInterface import InteropInterface
 
+sys.path.insert(0, str(Path(__file__).parents[2]))
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+import numpy
+from art import budget, convert, packing
+from compile_cache import CachedCompileMixin
+from engine_snapshots import EngineSnapshotMixin
+from engine_server import shared_server
+from persistent_engine import PersistentTestEngine
 
-class NEP11Test(BoaTest):
+
+class NEP11Test(CachedCompileMixin, EngineSnapshotMixin, BoaTest):
     p = Path(__file__)
     NEP11_ROOT = str(p.parents[2])
     PRJ_ROOT = str(p.parents[3])
@@ -25,9 +35,11 @@ class NEP11Test(BoaTest):
     CONTRACT_PATH_JSON = NEP11_ROOT + '/contracts/ascii-nft.manifest.json'
     CONTRACT_PATH_NEF = NEP11_ROOT + '/contracts/ascii-nft.nef'
     CONTRACT_PATH_PY = NEP11_ROOT + '/contracts/ascii-nft.py'
+    ASCII_IMAGE_PATH = NEP11_ROOT + '/art/ascii_image.txt'
 
     # TODO add .env file and move test engine path there
-    TEST_ENGINE_PATH = '../TestEngine/src/Neo.TestEngine/bin/Debug/net6.0/'
+    # absolute, the parallel runner moves every worker into its own directory
+    TEST_ENGINE_PATH = str(p.parents[1]) + '/TestEngine/src/Neo.TestEngine/bin/Debug/net6.0/'
     OWNER_SCRIPT_HASH = UInt160(to_script_hash(
         b'NZcuGiwRu1QscpmCyxj5XwQBUf6sk7dJJN'))
     # OWNER_SCRIPT_HASH = UInt160(to_script_hash(b'NaCEUqriRmYeH9AKH11FvKGDJ1jWgBwAzi'))
@@ -61,14 +73,45 @@ class NEP11Test(BoaTest):
                                              self.OWNER_SCRIPT_HASH],
                                          expected_result_type=bool)
 
-    def prepare_testengine(self, preprocess=False) -> TestEngine:
-        # self.build_contract(preprocess)
-        engine = TestEngine(self.TEST_ENGINE_PATH)
+    def create_testengine(self) -> TestEngine:
+        # one long-lived engine process when tools/engine-server is built
+        server = shared_server()
+        engine = (TestEngine(self.TEST_ENGINE_PATH) if server is None
+                  else PersistentTestEngine(server, self.TEST_ENGINE_PATH))
         engine.reset_engine()
+        return engine
 
-        self.deploy_contract(engine)
+    def prepare_testengine(self, preprocess=False) -> TestEngine:
+        # self.build_contract(preprocess)
+        # deployed once per run, the following tests restore the snapshot
+        engine, _ = self.snapshot_engine('deployed', [self.CONTRACT_PATH_NEF],
+                                         self.create_testengine, self.deploy_contract)
         return engine
 
+    def prepare_minted_testengine(self):
+        """
+        An engine with the contract deployed and one token minted to the auxiliary contract, restored from a snapshot
+        after the first call.
+
+        :return: the engine, the auxiliary contract address, with 10 GAS for fees, and the minted token
+        """
+        aux_path = self.get_contract_path('test_native', 'auxiliary_contract.py')
+        output, manifest = self.compile_and_save(aux_path)
+        aux_address = hash160(output)
+
+        def mint(engine: TestEngine) -> bytes:
+            engine.add_contract(self.CONTRACT_PATH_NEF)
+            engine.add_gas(aux_address, 10 * 10 ** 8)
+            return self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                           aux_address, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES,
+                                           self.get_ascii_image(),
+                                           signer_accounts=[aux_address],
+                                           expected_result_type=bytes)
+
+        engine, token = self.snapshot_engine('minted', [self.CONTRACT_PATH_NEF, aux_path.replace('.py', '.nef')],
+                                             self.prepare_testengine, mint)
+        return engine, aux_address, token
+
     def print_notif(self, notifications):
         print('\n=========================== NOTIFICATIONS START ===========================\n')
         for notif in notifications:
@@ -146,6 +189,13 @@ class NEP11Test(BoaTest):
         # check if the event was triggered and the address was authorized
         self.assertEqual(0, auth_events[0].arguments[1])
         self.assertEqual(1, auth_events[0].arguments[2])
+        auth = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getAuthorizedAddress')
+        self.assertEqual({self.OWNER_SCRIPT_HASH, self.OTHER_ACCOUNT_1}, set(auth))
+
+        # the new address can now administrate the contract
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'updatePause', False,
+                                signer_accounts=[self.OTHER_ACCOUNT_1],
+                                expected_result_type=bool)
 
         # now deauthorize the address
         self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'setAuthorizedAddress',
@@ -156,6 +206,89 @@ class NEP11Test(BoaTest):
         # check if the event was triggered and the address was authorized
         self.assertEqual(0, auth_events[1].arguments[1])
         self.assertEqual(0, auth_events[1].arguments[2])
+        auth = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getAuthorizedAddress')
+        self.assertEqual([self.OWNER_SCRIPT_HASH], auth)
+
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'updatePause', False,
+                                    signer_accounts=[self.OTHER_ACCOUNT_1],
+                                    expected_result_type=bool)
+
+        # only the sender, the first signer, is verified, an authorized co-signer is not enough
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'updatePause', False,
+                                    signer_accounts=[self.OTHER_ACCOUNT_1, self.OWNER_SCRIPT_HASH],
+                                    expected_result_type=bool)
+
+    def test_nep11_authorize_migration(self):
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+
+        # addresses kept in a single serialized list, as stored before the per-address keys
+        engine.storage_put(b'AUTH_ADDRESSES', [self.OWNER_SCRIPT_HASH, self.OTHER_ACCOUNT_1],
+                           self.CONTRACT_PATH_NEF)
+
+        # `update` runs `_deploy` with upgrade set
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, '_deploy', None, True,
+                                signer_accounts=[self.OWNER_SCRIPT_HASH])
+        self.assertIsNone(engine.storage_get(b'AUTH_ADDRESSES', self.CONTRACT_PATH_NEF))
+        auth = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getAuthorizedAddress')
+        self.assertEqual({self.OWNER_SCRIPT_HASH, self.OTHER_ACCOUNT_1}, set(auth))
+
+    def test_nep11_stats(self):
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+        aux_path = self.get_contract_path(
+            'test_native', 'auxiliary_contract.py')
+        output, manifest = self.compile_and_save(
+            self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
+        output, manifest = self.compile_and_save(aux_path)
+        aux_address = hash160(output)
+
+        # add some gas for fees
+        add_amount = 10 * 10 ** 8
+        engine.add_gas(aux_address, add_amount)
+
+        # deployed, paused, token count and supply
+        stats = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'stats')
+        self.assertEqual([True, False, 0, 0], stats)
+
+        ascii_img = self.get_ascii_image()
+        tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                         aux_address, [self.TOKEN_META] * 2, [self.TOKEN_LOCKED] * 2,
+                                         [self.ROYALTIES] * 2, [ascii_img] * 2,
+                                         signer_accounts=[aux_address],
+                                         expected_result_type=list)
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', tokens[0],
+                                signer_accounts=[aux_address],
+                                expected_result_type=bool)
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'updatePause', True,
+                                signer_accounts=[self.OWNER_SCRIPT_HASH],
+                                expected_result_type=bool)
+        stats = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'stats')
+        self.assertEqual([True, True, 2, 1], stats)
+        supply = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'totalSupply')
+        self.assertEqual(1, supply)
+
+    def test_nep11_stats_migration(self):
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+
+        # state kept under one key per value, as stored before the STATE record
+        # an empty STATE reads as a missing one
+        engine.storage_put(b'STATE', '', self.CONTRACT_PATH_NEF)
+        engine.storage_put(b'deployed', 1, self.CONTRACT_PATH_NEF)
+        engine.storage_put(b'paused', 1, self.CONTRACT_PATH_NEF)
+        engine.storage_put(b'TOKEN_COUNT', 7, self.CONTRACT_PATH_NEF)
+        engine.storage_put(b'SPP', 5, self.CONTRACT_PATH_NEF)
+
+        # `update` runs `_deploy` with upgrade set
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, '_deploy', None, True,
+                                signer_accounts=[self.OWNER_SCRIPT_HASH])
+        stats = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'stats')
+        self.assertEqual([True, True, 7, 5], stats)
+        for key in (b'deployed', b'paused', b'TOKEN_COUNT', b'SPP'):
+            self.assertIsNone(engine.storage_get(key, self.CONTRACT_PATH_NEF))
 
     def test_nep11_pause(self):
         engine = self.prepare_testengine()
@@ -226,11 +359,24 @@ class NEP11Test(BoaTest):
 
         properties = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', token, expected_result_type=bytes)
         img = json.loads(str(properties).replace("\'", "\""))["ascii"]
+        self.assertEqual(ascii_img, img)
+        self.assertEqual(json.loads(self.TOKEN_META)['name'], properties['name'])
+        self.assertIn('block', properties)
+        self.assertIn('time', properties)
+        properties_json = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'propertiesJson', token, False,
+                                                  expected_result_type=bytes)
+        self.assertEqual(json.loads(self.TOKEN_META), json.loads(properties_json))
         royalties = self.run_smart_contract(
             engine, self.CONTRACT_PATH_NEF, 'getRoyalties', token, expected_result_type=bytes)
         with self.assertRaises(TestExecutionException, msg='An unhandled exception was thrown. Unable to parse metadata'):
             properties = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties',
                                                  bytes('thisisanonexistingtoken', 'utf-8'), expected_result_type=bytes)
+        # the metadata is validated when minting
+        with self.assertRaises(TestExecutionException):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                    aux_address, b'{ "name": ', self.TOKEN_LOCKED, self.ROYALTIES, ascii_img,
+                                    signer_accounts=[aux_address],
+                                    expected_result_type=bytes)
 
         # check balances after
         # nep11_amount_after = self.run_smart_contract(engine, GAS_SCRIPT, 'balanceOf', nep11_address)
@@ -241,29 +387,237 @@ class NEP11Test(BoaTest):
         self.assertEqual(1, nep11_supply_after)
         self.print_notif(engine.notifications)
 
-    def test_nep11_transfer(self):
+    def test_nep11_mint_packed_image(self):
         engine = self.prepare_testengine()
-        engine.add_contract(self.CONTRACT_PATH_NEF.replace('.py', '.nef'))
+        engine.add_contract(self.CONTRACT_PATH_NEF)
         aux_path = self.get_contract_path(
             'test_native', 'auxiliary_contract.py')
         output, manifest = self.compile_and_save(
             self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
-        nep11_address = hash160(output)
-        print(to_hex_str(nep11_address))
         output, manifest = self.compile_and_save(aux_path)
         aux_address = hash160(output)
-        print(to_hex_str(aux_address))
 
         # add some gas for fees
         add_amount = 10 * 10 ** 8
         engine.add_gas(aux_address, add_amount)
 
         ascii_img = self.get_ascii_image()
-        # mint
+        packed_img = packing.pack(ascii_img)
+        self.assertLess(len(packed_img), len(ascii_img))
+
+        raw_token = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                            aux_address, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES, ascii_img,
+                                            signer_accounts=[aux_address],
+                                            expected_result_type=bytes)
+        packed_token = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                               aux_address, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES,
+                                               packed_img,
+                                               signer_accounts=[aux_address],
+                                               expected_result_type=bytes)
+
+        # the packed image is served as text, same as the raw one
+        raw_properties = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', raw_token)
+        packed_properties = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', packed_token)
+        self.assertEqual(ascii_img, raw_properties['ascii'])
+        self.assertEqual(ascii_img, packed_properties['ascii'])
+
+        # a packed image must have a valid header
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                    aux_address, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES,
+                                    bytes([packing.PACKED_IMAGE_MAGIC, 0, 0, 0x01]),
+                                    signer_accounts=[aux_address],
+                                    expected_result_type=bytes)
+
+        # and a nibble stream that unpacks: no run first or cut short, no code out of the palette, a character at least
+        header = bytes([packing.PACKED_IMAGE_MAGIC, 0, 4])
+        for stream in (b'\xf0\x0e', b'\x0f', b'\xb0', b'\xee'):
+            with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+                self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                        aux_address, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES,
+                                        header + stream,
+                                        signer_accounts=[aux_address],
+                                        expected_result_type=bytes)
+            with self.assertRaises(ValueError):
+                packing.unpack(header + stream)
+
+    def test_nep11_shared_image(self):
+        import hashlib
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+        aux_path = self.get_contract_path(
+            'test_native', 'auxiliary_contract.py')
+        output, manifest = self.compile_and_save(
+            self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
+        output, manifest = self.compile_and_save(aux_path)
+        aux_address = hash160(output)
+
+        # add some gas for fees
+        add_amount = 10 * 10 ** 8
+        engine.add_gas(aux_address, add_amount)
+
+        ascii_img = self.get_ascii_image()
+        image_hash = hashlib.sha256(ascii_img.encode()).digest()
+        image_key = b'\x0a' + image_hash
+        ref_key = b'\x0b' + image_hash
+
+        tokens = []
+        for _ in range(2):
+            token = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                            aux_address, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES, ascii_img,
+                                            signer_accounts=[aux_address],
+                                            expected_result_type=bytes)
+            tokens.append(token)
+
+        # one copy of the image, referenced by both tokens
+        self.assertEqual(ascii_img.encode(), engine.storage_get(image_key, self.CONTRACT_PATH_NEF))
+        self.assertEqual(2, int.from_bytes(engine.storage_get(ref_key, self.CONTRACT_PATH_NEF), 'little'))
+        for token in tokens:
+            self.assertEqual(image_hash, engine.storage_get(b'\x09' + token, self.CONTRACT_PATH_NEF))
+
+        # the image stays while a token still uses it
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', tokens[0],
+                                signer_accounts=[aux_address],
+                                expected_result_type=bool)
+        self.assertEqual(1, int.from_bytes(engine.storage_get(ref_key, self.CONTRACT_PATH_NEF), 'little'))
+        properties = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', tokens[1])
+        self.assertEqual(len(ascii_img), len(properties['ascii']))
+
+        # and is freed with the last one
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', tokens[1],
+                                signer_accounts=[aux_address],
+                                expected_result_type=bool)
+        self.assertIsNone(engine.storage_get(image_key, self.CONTRACT_PATH_NEF))
+        self.assertIsNone(engine.storage_get(ref_key, self.CONTRACT_PATH_NEF))
+        self.assertIsNone(engine.storage_get(b'\x09' + tokens[1], self.CONTRACT_PATH_NEF))
+
+    def test_nep11_image_chunks(self):
+        import hashlib
+        engine, aux_address, small_token = self.prepare_minted_testengine()
+        # the storage fee of the large image
+        engine.add_gas(aux_address, 20 * 10 ** 8)
+
+        # 9089 bytes, two full chunks and a partial one
+        large_img = convert.to_ascii(numpy.add.outer(numpy.arange(90), numpy.arange(100)) % 256, width=100,
+                                     aspect=1.0)
+        chunk_size = budget.IMAGE_CHUNK_SIZE
+        token = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                        aux_address, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES,
+                                        large_img.decode(),
+                                        signer_accounts=[aux_address],
+                                        expected_result_type=bytes)
+
+        info = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'imageInfo', token, expected_result_type=list)
+        self.assertEqual([len(large_img), 3], info)
+        chunks = [self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'imageChunk', token, index,
+                                          expected_result_type=bytes) for index in range(3)]
+        self.assertEqual([chunk_size, chunk_size, len(large_img) - 2 * chunk_size], [len(chunk) for chunk in chunks])
+        self.assertEqual(large_img, b''.join(chunks))
+        for index in (-1, 3):
+            with self.assertRaises(TestExecutionException):
+                self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'imageChunk', token, index,
+                                        expected_result_type=bytes)
+
+        # the properties have the number of chunks of a large image and its first chunk
+        properties = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', token)
+        self.assertEqual(large_img[:chunk_size].decode(), properties['ascii'])
+        self.assertEqual(3, properties['imageChunks'])
+
+        # a packed image is unpacked up to the end of its first chunk
+        noise = numpy.random.RandomState(1).randint(0, 256, (160, 160))
+        packed_img = packing.pack(convert.to_ascii(noise, width=160, aspect=1.0).decode())
+        packed_token = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
+                                               aux_address, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES,
+                                               packed_img,
+                                               signer_accounts=[aux_address],
+                                               expected_result_type=bytes)
+        properties = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', packed_token)
+        self.assertEqual(packing.unpack(packed_img[:chunk_size], truncated=True), properties['ascii'])
+        self.assertEqual(-(-len(packed_img) // chunk_size), properties['imageChunks'])
+
+        # a small image is a single chunk, still served in the properties
+        ascii_img = self.get_ascii_image()
+        info = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'imageInfo', small_token,
+                                       expected_result_type=list)
+        self.assertEqual([len(ascii_img), 1], info)
+        self.assertEqual(ascii_img.encode(), self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'imageChunk',
+                                                                     small_token, 0, expected_result_type=bytes))
+        properties = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', small_token)
+        self.assertEqual(ascii_img, properties['ascii'])
+        info = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'imageInfo', bytes(4),
+                                       expected_result_type=list)
+        self.assertEqual([0, 0], info)
+
+        # every chunk is freed with the token
+        image_hash = hashlib.sha256(large_img).digest()
+        keys = [b'\x0a' + image_hash, b'\x0f' + image_hash, b'\x0e' + image_hash + b'\x01',
+                b'\x0e' + image_hash + b'\x02']
+        self.assertEqual(chunks[1], engine.storage_get(keys[2], self.CONTRACT_PATH_NEF))
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', token,
+                                signer_accounts=[aux_address],
+                                expected_result_type=bool)
+        for key in keys:
+            self.assertIsNone(engine.storage_get(key, self.CONTRACT_PATH_NEF))
+
+    def test_nep11_mint_batch(self):
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+        aux_path = self.get_contract_path(
+            'test_native', 'auxiliary_contract.py')
+        output, manifest = self.compile_and_save(
+            self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
+        output, manifest = self.compile_and_save(aux_path)
+        aux_address = hash160(output)
+
+        # add some gas for fees
+        add_amount = 10 * 10 ** 8
+        engine.add_gas(aux_address, add_amount)
+
+        ascii_img = self.get_ascii_image()
+        amount = 3
+        tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                         aux_address, [self.TOKEN_META] * amount, [self.TOKEN_LOCKED] * amount,
+                                         [self.ROYALTIES] * amount, [ascii_img] * amount,
+                                         signer_accounts=[aux_address],
+                                         expected_result_type=list)
+        self.assertEqual(amount, len(tokens))
+        self.assertEqual(amount, len(engine.get_events('Transfer')))
+
+        nep11_supply_after = self.run_smart_contract(
+            engine, self.CONTRACT_PATH_NEF, 'totalSupply')
+        self.assertEqual(amount, nep11_supply_after)
+        nep11_balance_after = self.run_smart_contract(
+            engine, self.CONTRACT_PATH_NEF, 'balanceOf', aux_address)
+        self.assertEqual(amount, nep11_balance_after)
+        for token in tokens:
+            owner = self.run_smart_contract(
+                engine, self.CONTRACT_PATH_NEF, 'ownerOf', token)
+            self.assertEqual(aux_address, owner)
+
+        # the token ids continue after the batch
         token = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
                                         aux_address, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES, ascii_img,
                                         signer_accounts=[aux_address],
                                         expected_result_type=bytes)
+        self.assertNotIn(token, tokens)
+
+        # lists with different lengths are rejected
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                    aux_address, [self.TOKEN_META] * 2, [self.TOKEN_LOCKED],
+                                    [self.ROYALTIES] * 2, [ascii_img] * 2,
+                                    signer_accounts=[aux_address],
+                                    expected_result_type=list)
+        self.print_notif(engine.notifications)
+
+    def test_nep11_transfer(self):
+        engine, aux_address, token = self.prepare_minted_testengine()
+        output, manifest = self.compile_and_save(
+            self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
+        nep11_address = hash160(output)
+        print(to_hex_str(nep11_address))
+        print(to_hex_str(aux_address))
+
         properties = self.run_smart_contract(
             engine, self.CONTRACT_PATH_NEF, 'properties', token)
 
@@ -312,14 +666,13 @@ class NEP11Test(BoaTest):
 
         self.print_notif(engine.notifications)
 
-    def test_nep11_burn(self):
+    def test_nep11_transfer_batch(self):
         engine = self.prepare_testengine()
-        engine.add_contract(self.CONTRACT_PATH_NEF.replace('.py', '.nef'))
+        engine.add_contract(self.CONTRACT_PATH_NEF)
         aux_path = self.get_contract_path(
             'test_native', 'auxiliary_contract.py')
         output, manifest = self.compile_and_save(
             self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
-        nep11_address = hash160(output)
         output, manifest = self.compile_and_save(aux_path)
         aux_address = hash160(output)
 
@@ -328,11 +681,343 @@ class NEP11Test(BoaTest):
         engine.add_gas(aux_address, add_amount)
 
         ascii_img = self.get_ascii_image()
-        # mint
-        token = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mint',
-                                        aux_address, self.TOKEN_META, self.TOKEN_LOCKED, self.ROYALTIES, ascii_img,
-                                        signer_accounts=[aux_address],
-                                        expected_result_type=bytes)
+        amount = 3
+        tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                         aux_address, [self.TOKEN_META] * amount, [self.TOKEN_LOCKED] * amount,
+                                         [self.ROYALTIES] * amount, [ascii_img] * amount,
+                                         signer_accounts=[aux_address],
+                                         expected_result_type=list)
+
+        # the other account can't move tokens it doesn't own
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transferBatch',
+                                         self.OTHER_ACCOUNT_1, tokens, None,
+                                         signer_accounts=[self.OTHER_ACCOUNT_1],
+                                         expected_result_type=bool)
+        self.assertEqual(False, result)
+
+        # a token can't be listed twice
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transferBatch',
+                                    self.OTHER_ACCOUNT_1, [tokens[0], tokens[0]], None,
+                                    signer_accounts=[aux_address],
+                                    expected_result_type=bool)
+
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transferBatch',
+                                         self.OTHER_ACCOUNT_1, tokens, None,
+                                         signer_accounts=[aux_address],
+                                         expected_result_type=bool)
+        self.assertEqual(True, result)
+        transfer_events = engine.get_events('Transfer')
+        self.assertEqual(2 * amount, len(transfer_events))
+
+        for token in tokens:
+            owner = self.run_smart_contract(
+                engine, self.CONTRACT_PATH_NEF, 'ownerOf', token)
+            self.assertEqual(self.OTHER_ACCOUNT_1, owner)
+        nep11_balance_aux = self.run_smart_contract(
+            engine, self.CONTRACT_PATH_NEF, 'balanceOf', aux_address)
+        self.assertEqual(0, nep11_balance_aux)
+        nep11_balance_other = self.run_smart_contract(
+            engine, self.CONTRACT_PATH_NEF, 'balanceOf', self.OTHER_ACCOUNT_1)
+        self.assertEqual(amount, nep11_balance_other)
+        nep11_supply_after = self.run_smart_contract(
+            engine, self.CONTRACT_PATH_NEF, 'totalSupply')
+        self.assertEqual(amount, nep11_supply_after)
+        self.print_notif(engine.notifications)
+
+    def test_nep11_tokens_paged(self):
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+        aux_path = self.get_contract_path(
+            'test_native', 'auxiliary_contract.py')
+        output, manifest = self.compile_and_save(
+            self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
+        output, manifest = self.compile_and_save(aux_path)
+        aux_address = hash160(output)
+
+        # add some gas for fees
+        add_amount = 10 * 10 ** 8
+        engine.add_gas(aux_address, add_amount)
+
+        ascii_img = self.get_ascii_image()
+        amount = 5
+        tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                         aux_address, [self.TOKEN_META] * amount, [self.TOKEN_LOCKED] * amount,
+                                         [self.ROYALTIES] * amount, [ascii_img] * amount,
+                                         signer_accounts=[aux_address],
+                                         expected_result_type=list)
+
+        # invalid page sizes
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensPaged', 0, 0)
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfPaged', aux_address, 0, 101)
+
+        # full collection, 2 tokens per page
+        page = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensPaged', 0, 2)
+        self.assertEqual([tokens[:2], 2], page)
+        page = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensPaged', 2, 2)
+        self.assertEqual([tokens[2:4], 4], page)
+        page = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensPaged', 4, 2)
+        self.assertEqual([tokens[4:], 0], page)
+
+        # move the second token away, the last token of the owner takes its slot
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transfer',
+                                         self.OTHER_ACCOUNT_1, tokens[1], None,
+                                         signer_accounts=[aux_address],
+                                         expected_result_type=bool)
+        self.assertEqual(True, result)
+        page = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfPaged', aux_address, 0, 3)
+        self.assertEqual([[tokens[0], tokens[4], tokens[2]], 3], page)
+        page = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfPaged', aux_address, 3, 3)
+        self.assertEqual([[tokens[3]], 0], page)
+        page = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfPaged',
+                                       self.OTHER_ACCOUNT_1, 0, 10)
+        self.assertEqual([[tokens[1]], 0], page)
+
+        # a burned token is skipped, the page keeps the same cursor
+        burn = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', tokens[2],
+                                       signer_accounts=[aux_address],
+                                       expected_result_type=bool)
+        self.assertEqual(True, burn)
+        page = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensPaged', 2, 2)
+        self.assertEqual([[tokens[3]], 4], page)
+        page = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfPaged', aux_address, 0, 10)
+        self.assertEqual([[tokens[0], tokens[4], tokens[3]], 0], page)
+
+        # without the key of the last slot nothing is moved, the freed slot is left empty and skipped
+        contract_id = engine._get_contract_id(self.CONTRACT_PATH_NEF)
+        del engine._storage._dict[Storage.build_key(b'\x03' + aux_address + (2).to_bytes(1, 'little'), contract_id)]
+        burn = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', tokens[0],
+                                       signer_accounts=[aux_address],
+                                       expected_result_type=bool)
+        self.assertEqual(True, burn)
+        page = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfPaged', aux_address, 0, 10)
+        self.assertEqual([[tokens[4]], 0], page)
+        self.assertEqual(aux_address, self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'ownerOf', tokens[3]))
+        self.print_notif(engine.notifications)
+
+    def test_nep11_tokens_range(self):
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+        aux_path = self.get_contract_path(
+            'test_native', 'auxiliary_contract.py')
+        output, manifest = self.compile_and_save(
+            self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
+        output, manifest = self.compile_and_save(aux_path)
+        aux_address = hash160(output)
+
+        # add some gas for fees
+        add_amount = 10 * 10 ** 8
+        engine.add_gas(aux_address, add_amount)
+
+        ascii_img = self.get_ascii_image()
+        amount = 5
+        tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                         aux_address, [self.TOKEN_META] * amount, [self.TOKEN_LOCKED] * amount,
+                                         [self.ROYALTIES] * amount, [ascii_img] * amount,
+                                         signer_accounts=[aux_address],
+                                         expected_result_type=list)
+        # fixed-width big-endian ids
+        self.assertEqual([token_id.to_bytes(4, 'big') for token_id in range(1, amount + 1)], tokens)
+
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensRange', 3, 2)
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensRange', 1, 1025)
+
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensRange', 2, 4)
+        self.assertEqual(tokens[1:4], result)
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensRange', 4, 1000)
+        self.assertEqual(tokens[3:], result)
+
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transfer',
+                                         self.OTHER_ACCOUNT_1, tokens[2], None,
+                                         signer_accounts=[aux_address],
+                                         expected_result_type=bool)
+        self.assertEqual(True, result)
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfRange', aux_address, 1, 5)
+        self.assertEqual(tokens[:2] + tokens[3:], result)
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfRange',
+                                         self.OTHER_ACCOUNT_1, 1, 5)
+        self.assertEqual([tokens[2]], result)
+        self.print_notif(engine.notifications)
+
+    def test_nep11_storage_migration(self):
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+        contract_id = engine._get_contract_id(self.CONTRACT_PATH_NEF)
+        ascii_img = self.get_ascii_image()
+
+        def vm_integer(value: int) -> bytes:
+            # an integer put in the storage by the contract, little-endian with a sign bit, empty for 0
+            return value.to_bytes((value.bit_length() + 8) // 8, 'little', signed=True) if value else b''
+
+        def put_raw(key: bytes, value: bytes):
+            engine._storage._dict[Storage.build_key(key, contract_id)] = StorageItem(value)
+
+        # the storage as the first deployed contract wrote it: the account index entries hold the token id, the
+        # metadata is json and every token has its own copy of the image. Token 2 was burned, which left its image
+        # and view counter behind, the other ids are the token counter as a NeoVM integer, 128 and up on 2 bytes.
+        # The migrated tokens get the big-endian ids of the tokens minted now.
+        for key in [key for key in engine._storage._dict if key._ID == contract_id]:
+            del engine._storage._dict[key]
+        owners = [self.OWNER_SCRIPT_HASH, self.OTHER_ACCOUNT_1, self.OTHER_ACCOUNT_2]
+        token_ids = [token_id for token_id in range(1, 21) if token_id != 2] + [128, 300]
+        holders: Dict[bytes, bytes] = {}
+        for token_id in token_ids:
+            token = vm_integer(token_id)
+            owner = owners[token_id % len(owners)]
+            holders[token_id.to_bytes(4, 'big')] = owner
+            put_raw(b'TPF' + token, owner)
+            put_raw(b'ACC' + owner + token, token)
+            put_raw(b'MDP' + token, self.TOKEN_META)
+            put_raw(b'LCP' + token, self.TOKEN_LOCKED)
+            put_raw(b'RYP' + token, self.ROYALTIES)
+            put_raw(b'ASC' + token, ascii_img.encode())
+        for owner in owners:
+            put_raw(b'BLP' + owner, vm_integer(list(holders.values()).count(owner)))
+        put_raw(b'LVCP' + vm_integer(3), vm_integer(4))
+        put_raw(b'ASC' + vm_integer(2), ascii_img.encode())
+        put_raw(b'LVCP' + vm_integer(2), vm_integer(1))
+        engine.storage_put(b'deployed', 1, self.CONTRACT_PATH_NEF)
+        engine.storage_put(b'paused', 1, self.CONTRACT_PATH_NEF)
+        engine.storage_put(b'TOKEN_COUNT', 300, self.CONTRACT_PATH_NEF)
+        engine.storage_put(b'SPP', len(token_ids), self.CONTRACT_PATH_NEF)
+        engine.storage_put(b'AUTH_ADDRESSES', [self.OWNER_SCRIPT_HASH], self.CONTRACT_PATH_NEF)
+
+        # `update` runs `_deploy` with upgrade set, which moves the first keys
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, '_deploy', None, True,
+                                signer_accounts=[self.OWNER_SCRIPT_HASH])
+        transfers = [event.arguments for event in engine.get_events('Transfer')]
+        done = False
+        calls = 0
+        while not done:
+            done = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'migrateStorage', 10,
+                                           signer_accounts=[self.OWNER_SCRIPT_HASH],
+                                           expected_result_type=bool)
+            transfers += [event.arguments for event in engine.get_events('Transfer')]
+            calls += 1
+        self.assertGreater(calls, 1)
+
+        # every change of id is notified as the burn of the old id and the mint of the new one
+        self.assertEqual(2 * len(token_ids), len(transfers))
+        self.assertEqual(sorted([owner, None, 1, vm_integer(int.from_bytes(token, 'big'))]
+                                for token, owner in holders.items()),
+                         sorted(event for event in transfers if event[1] is None))
+        self.assertEqual(sorted([None, owner, 1, token] for token, owner in holders.items()),
+                         sorted(event for event in transfers if event[0] is None))
+
+        # only the single-byte prefixes and the state are left
+        migrated = {key._key: item.value for key, item in engine._storage._dict.items() if key._ID == contract_id}
+        self.assertEqual([], [key for key in migrated if key != b'STATE' and key[0] > 0x0f])
+        # the image and the view counter left by the burn of token 2 are dropped, not migrated
+        burned = (2).to_bytes(4, 'big')
+        self.assertEqual([], [key for key in migrated if key[0] in (0x07, 0x09) and key[1:] == burned])
+        stats = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'stats')
+        self.assertEqual([True, True, 300, len(token_ids)], stats)
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'updatePause', False,
+                                signer_accounts=[self.OWNER_SCRIPT_HASH],
+                                expected_result_type=bool)
+        # batches only run on a paused contract
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'migrateStorage', 10,
+                                    signer_accounts=[self.OWNER_SCRIPT_HASH])
+
+        def assert_holders():
+            for holder in owners:
+                tokens = sorted(token for token, owner in holders.items() if owner == holder)
+                balance = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'balanceOf', holder)
+                self.assertEqual(len(tokens), balance)
+                page = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfPaged', holder, 0, 100)
+                self.assertEqual([tokens, 0], [sorted(page[0]), page[1]])
+                for token in tokens:
+                    owner = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'ownerOf', token)
+                    self.assertEqual(holder, owner)
+
+        assert_holders()
+        token = (128).to_bytes(4, 'big')
+        properties = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', token)
+        self.assertEqual(ascii_img, properties['ascii'])
+        self.assertEqual('NEP11', properties['name'])
+        count = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getLockedContentViewCount',
+                                        (3).to_bytes(4, 'big'))
+        self.assertEqual(4, count)
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'ownerOf', vm_integer(128))
+
+        # the range reads find the migrated tokens in id order
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensRange', 1, 300)
+        self.assertEqual(sorted(holders), result)
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'tokensOfRange',
+                                         self.OTHER_ACCOUNT_1, 1, 300)
+        self.assertEqual(sorted(token for token, owner in holders.items() if owner == self.OTHER_ACCOUNT_1), result)
+
+        # the rebuilt slots hold through a transfer and a burn by the holders of migrated tokens
+        for token, receiver in (((4).to_bytes(4, 'big'), self.OTHER_ACCOUNT_2),
+                                ((6).to_bytes(4, 'big'), self.OTHER_ACCOUNT_1)):
+            result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transfer', receiver, token, None,
+                                             signer_accounts=[holders[token]],
+                                             expected_result_type=bool)
+            self.assertEqual(True, result)
+            holders[token] = receiver
+        token = (9).to_bytes(4, 'big')
+        burn = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', token,
+                                       signer_accounts=[holders.pop(token)],
+                                       expected_result_type=bool)
+        self.assertEqual(True, burn)
+        assert_holders()
+
+    def test_nep11_read_batches(self):
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+        aux_path = self.get_contract_path(
+            'test_native', 'auxiliary_contract.py')
+        output, manifest = self.compile_and_save(
+            self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
+        output, manifest = self.compile_and_save(aux_path)
+        aux_address = hash160(output)
+
+        # add some gas for fees
+        add_amount = 10 * 10 ** 8
+        engine.add_gas(aux_address, add_amount)
+
+        ascii_img = self.get_ascii_image()
+        amount = 3
+        tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                         aux_address, [self.TOKEN_META] * amount, [self.TOKEN_LOCKED] * amount,
+                                         [self.ROYALTIES] * amount, [ascii_img] * amount,
+                                         signer_accounts=[aux_address],
+                                         expected_result_type=list)
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transfer',
+                                self.OTHER_ACCOUNT_1, tokens[0], None,
+                                signer_accounts=[aux_address],
+                                expected_result_type=bool)
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', tokens[2],
+                                signer_accounts=[aux_address],
+                                expected_result_type=bool)
+
+        # a burned token reads as None instead of throwing
+        owners = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'ownerOfBatch', tokens)
+        self.assertEqual([self.OTHER_ACCOUNT_1, aux_address, None], owners)
+        balances = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'balanceOfBatch',
+                                           [aux_address, self.OTHER_ACCOUNT_1, self.OTHER_ACCOUNT_2])
+        self.assertEqual([1, 1, 0], balances)
+        batch = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'propertiesBatch', tokens)
+        single = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'properties', tokens[1])
+        self.assertEqual(3, len(batch))
+        self.assertEqual(single['name'], batch[1]['name'])
+        self.assertEqual(single['ascii'], batch[0]['ascii'])
+        self.assertIsNone(batch[2])
+
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'propertiesBatch', tokens * 34)
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'ownerOfBatch', tokens * 167)
+        self.print_notif(engine.notifications)
+
+    def test_nep11_burn(self):
+        engine, aux_address, token = self.prepare_minted_testengine()
 
         # burn
         burn = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', token,
@@ -348,6 +1033,123 @@ class NEP11Test(BoaTest):
         self.assertEqual(0, nep11_supply_after)
         self.print_notif(engine.notifications)
 
+    def test_nep11_burn_reclaims_storage(self):
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+        aux_path = self.get_contract_path(
+            'test_native', 'auxiliary_contract.py')
+        output, manifest = self.compile_and_save(
+            self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
+        output, manifest = self.compile_and_save(aux_path)
+        aux_address = hash160(output)
+
+        # add some gas for fees
+        add_amount = 1000 * 10 ** 8
+        engine.add_gas(aux_address, add_amount)
+
+        contract_id = engine._get_contract_id(self.CONTRACT_PATH_NEF)
+
+        def contract_storage() -> Dict[bytes, bytes]:
+            # the token counter keeps growing, it is compared through stats instead
+            return {key._key: item.value for key, item in engine._storage._dict.items()
+                    if key._ID == contract_id and key._key != b'STATE'}
+
+        baseline = contract_storage()
+        ascii_img = self.get_ascii_image()
+        amount = 1000
+        batch_size = 100
+        tokens = []
+        for batch in range(amount // batch_size):
+            # half of the tokens share the same image
+            images = [ascii_img] * (batch_size // 2)
+            images += [ascii_img.replace('.', ':', batch * batch_size + index + 1)
+                       for index in range(batch_size // 2)]
+            tokens += self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                              aux_address, [self.TOKEN_META] * batch_size,
+                                              [self.TOKEN_LOCKED] * batch_size,
+                                              [self.ROYALTIES] * batch_size, images,
+                                              signer_accounts=[aux_address],
+                                              expected_result_type=list)
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'transferBatch',
+                                self.OTHER_ACCOUNT_1, tokens[:100], None,
+                                signer_accounts=[aux_address],
+                                expected_result_type=bool)
+        # reading the locked content creates the view counter
+        for token in tokens[100:110]:
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getLockedContent', token,
+                                    signer_accounts=[aux_address],
+                                    expected_result_type=bytes)
+        self.assertGreater(len(contract_storage()), len(baseline) + 6 * amount)
+
+        for token in tokens:
+            owner = self.OTHER_ACCOUNT_1 if token in tokens[:100] else aux_address
+            result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', token,
+                                             signer_accounts=[owner],
+                                             expected_result_type=bool)
+            self.assertEqual(True, result)
+
+        self.assertEqual(baseline, contract_storage())
+        stats = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'stats')
+        self.assertEqual([True, False, amount, 0], stats)
+
+    def test_nep11_sweep_orphans(self):
+        engine = self.prepare_testengine()
+        engine.add_contract(self.CONTRACT_PATH_NEF)
+        aux_path = self.get_contract_path(
+            'test_native', 'auxiliary_contract.py')
+        output, manifest = self.compile_and_save(
+            self.CONTRACT_PATH_NEF.replace('.nef', '.py'))
+        output, manifest = self.compile_and_save(aux_path)
+        aux_address = hash160(output)
+
+        # add some gas for fees
+        add_amount = 10 * 10 ** 8
+        engine.add_gas(aux_address, add_amount)
+
+        ascii_img = self.get_ascii_image()
+        amount = 5
+        tokens = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'mintBatch',
+                                         aux_address, [self.TOKEN_META] * amount, [self.TOKEN_LOCKED] * amount,
+                                         [self.ROYALTIES] * amount, [ascii_img] * amount,
+                                         signer_accounts=[aux_address],
+                                         expected_result_type=list)
+        for token in tokens[1:3]:
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getLockedContent', token,
+                                    signer_accounts=[aux_address],
+                                    expected_result_type=bytes)
+        self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'burn', tokens[1],
+                                signer_accounts=[aux_address],
+                                expected_result_type=bool)
+
+        # leftovers of burns made before burn removed the view counter and the token data
+        contract_id = engine._get_contract_id(self.CONTRACT_PATH_NEF)
+        before = {key._key: item.value for key, item in engine._storage._dict.items() if key._ID == contract_id}
+        orphans = {b'\x07' + tokens[1]: b'\x01', b'\x0d' + tokens[1]: b'data', b'\x06' + tokens[1]: b'locked'}
+        for key, value in orphans.items():
+            engine._storage._dict[Storage.build_key(key, contract_id)] = StorageItem(value)
+
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'sweepOrphans', 0, 10,
+                                    signer_accounts=[aux_address])
+        with self.assertRaises(TestExecutionException, msg=self.ASSERT_RESULTED_FALSE_MSG):
+            self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'sweepOrphans', 0, 1025,
+                                    signer_accounts=[self.OWNER_SCRIPT_HASH])
+
+        # the first page stops before the orphans
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'sweepOrphans', 0, 1,
+                                         signer_accounts=[self.OWNER_SCRIPT_HASH])
+        self.assertEqual([0, 1], result)
+        result = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'sweepOrphans', 1, 10,
+                                         signer_accounts=[self.OWNER_SCRIPT_HASH])
+        self.assertEqual([len(orphans), 0], result)
+
+        after = {key._key: item.value for key, item in engine._storage._dict.items() if key._ID == contract_id}
+        self.assertEqual(before, after)
+        # the counter of a live token is kept
+        count = self.run_smart_contract(engine, self.CONTRACT_PATH_NEF, 'getLockedContentViewCount', tokens[2])
+        self.assertEqual(1, count)
+        self.print_notif(engine.notifications)
+
     def test_nep11_onNEP11Payment(self):
         engine = self.prepare_testengine()
         engine.add_contract(self.CONTRACT_PATH_NEF.replace('.py', '.nef'))
@@ -380,31 +1182,10 @@ class NEP11Test(BoaTest):
                                                  self.OTHER_ACCOUNT_1],
                                              expected_result_type=bool)
 
-    def get_ascii_image(self):
-        img = Image.open("/home/merl/Downloads/NEO_512_512.png")
-        
-        # resize the image
-        width, height = img.size
-        aspect_ratio = height / width
-        new_width = 80
-        new_height = aspect_ratio * new_width * 0.55
-        img = img.resize((new_width, int(new_height)))
-        
-        # convert image to greyscale format
-        new_img = img.convert('L')
-        
-        pixels = new_img.getdata()
-        
-        # replace each pixel with a character from array
-        chars = ["B", "S", "#", "&", "@", "$", "%", "*", "!", ":", "."]
-        new_pixels = [chars[pixel // 25] for pixel in pixels]
-        new_pixels = ''.join(new_pixels)
-        
-        # split string of chars into multiple strings of length equal to new width and create a list
-        new_pixels_count = len(new_pixels)
-        ascii_image = [new_pixels[index:index + new_width] for index in range(0, new_pixels_count, new_width)]
-        ascii_image = "\n".join(ascii_image)
-        # print(ascii_image)
-        with open("ascii_image.txt", "w") as f:
-            f.write(ascii_image)
-        return ascii_image
+    def get_ascii_image(self) -> str:
+        # the art of the NEO logo, or of the image at NEP11_SOURCE_IMAGE converted the same way
+        source = os.environ.get('NEP11_SOURCE_IMAGE')
+        if source:
+            return convert.image_to_ascii(source).decode()
+        with open(self.ASCII_IMAGE_PATH) as f:
+            return f.read()
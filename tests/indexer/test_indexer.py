@@ -0,0 +1,134 @@
+import base64
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2]))
+
+from indexer import Event, IndexStore, from_application_log, read_jsonl, write_jsonl
+from indexer.bench import synthetic_events
+
+CONTRACT = '0x6a7ab4ea6f1f0d1b5d4e6e0f4c1c2b3a49587f10'
+ALICE = bytes(range(20))
+BOB = bytes(range(1, 21))
+
+
+def token(number: int) -> bytes:
+    return number.to_bytes(4, 'big')
+
+
+def mint(block: int, owner: bytes, number: int) -> Event:
+    return Event(block, '0x01', 0, 'Transfer', (None, owner, 1, token(number)))
+
+
+def transfer(block: int, owner: bytes, to: bytes, number: int) -> Event:
+    return Event(block, '0x02', 0, 'Transfer', (owner, to, 1, token(number)))
+
+
+def burn(block: int, owner: bytes, number: int) -> Event:
+    return Event(block, '0x03', 0, 'Transfer', (owner, None, 1, token(number)))
+
+
+class IndexStoreTest(unittest.TestCase):
+
+    def test_tables(self):
+        store = IndexStore()
+        applied = store.apply([
+            mint(1, ALICE, 1), mint(1, ALICE, 2), mint(2, ALICE, 3),
+            transfer(3, ALICE, BOB, 2),
+            Event(3, '0x04', 1, 'UnlockIncremented', (token(1), 1)),
+            Event(4, '0x05', 0, 'Authorized', (ALICE, 0, True)),
+            Event(4, '0x05', 1, 'Debug', (['ignored'],)),
+            burn(5, ALICE, 3),
+        ])
+        self.assertEqual(7, applied)
+        self.assertEqual(5, store.checkpoint)
+        self.assertEqual(2, store.supply())
+        self.assertEqual([token(1)], store.tokens_of(ALICE))
+        self.assertEqual([token(2)], store.tokens_of(BOB))
+        self.assertEqual(BOB, store.owner_of(token(2)))
+        self.assertIsNone(store.owner_of(token(3)))
+        self.assertEqual(1, store.unlock_count(token(1)))
+        self.assertEqual([ALICE], store.authorized())
+
+        store.apply([Event(6, '0x06', 0, 'Authorized', (ALICE, 0, False))])
+        self.assertEqual([], store.authorized())
+
+    def test_resume_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'index.sqlite')
+            events = [mint(1, ALICE, 1), mint(2, ALICE, 2), transfer(3, ALICE, BOB, 1)]
+            store = IndexStore(path)
+            store.apply(events[:2])
+            store.close()
+
+            # the same source read again from the start, the applied blocks are skipped
+            store = IndexStore(path)
+            self.assertEqual(2, store.checkpoint)
+            self.assertEqual(1, store.apply(events))
+            self.assertEqual(2, store.supply())
+            self.assertEqual([token(2)], store.tokens_of(ALICE))
+            store.close()
+
+    def test_failed_apply_is_rolled_back(self):
+        store = IndexStore()
+        store.apply([mint(1, ALICE, 1)])
+        with self.assertRaises(ValueError):
+            store.apply([mint(3, ALICE, 2), mint(2, ALICE, 3)])
+        self.assertEqual(1, store.checkpoint)
+        self.assertEqual(1, store.supply())
+        self.assertEqual([token(1)], store.tokens_of(ALICE))
+
+    def test_checkpoint_moves_to_the_end_of_the_source(self):
+        store = IndexStore()
+        store.apply([mint(1, ALICE, 1)], until=10)
+        self.assertEqual(10, store.checkpoint)
+
+    def test_synthetic_log(self):
+        store = IndexStore()
+        events = list(synthetic_events(5000))
+        self.assertEqual(5000, store.apply(events, commit_every=7))
+        mints = sum(1 for event in events if event.name == 'Transfer' and event.args[0] is None)
+        burns = sum(1 for event in events if event.name == 'Transfer' and event.args[1] is None)
+        self.assertEqual(mints - burns, store.supply())
+        self.assertEqual(store.supply(), sum(store.balance_of(owner) for owner in
+                                             {event.args[1] for event in events if event.name == 'Transfer'}
+                                             if owner is not None))
+
+
+class EventsTest(unittest.TestCase):
+
+    def test_jsonl_round_trip(self):
+        events = [mint(1, ALICE, 1), Event(2, '0x04', 3, 'UnlockIncremented', (token(1), 2)),
+                  Event(2, '0x05', 0, 'Authorized', (BOB, 0, False))]
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'events.jsonl'
+            self.assertEqual(3, write_jsonl(events, path))
+            self.assertEqual(events, list(read_jsonl(path)))
+
+    def test_application_log(self):
+        def byte_string(value: bytes):
+            return {'type': 'ByteString', 'value': base64.b64encode(value).decode()}
+
+        def notification(contract: str, name: str, *args):
+            return {'contract': contract, 'eventname': name, 'state': {'type': 'Array', 'value': list(args)}}
+
+        transfer_state = ({'type': 'Any'}, byte_string(ALICE), {'type': 'Integer', 'value': '1'}, byte_string(token(1)))
+        log = {
+            'txid': '0xab',
+            'executions': [
+                {'vmstate': 'HALT', 'notifications': [
+                    notification(CONTRACT, 'Debug', {'type': 'Array', 'value': []}),
+                    notification(CONTRACT.upper().replace('0X', '0x'), 'Transfer', *transfer_state),
+                    notification('0xd2a4cff31913016155e38e474a2c06d08be276cf', 'Transfer', *transfer_state),
+                ]},
+                {'vmstate': 'FAULT', 'notifications': [notification(CONTRACT, 'Transfer', *transfer_state)]},
+            ],
+        }
+        events = from_application_log(7, log, CONTRACT)
+        self.assertEqual([Event(7, '0xab', 1, 'Transfer', (None, ALICE, 1, token(1)))], events)
+
+
+if __name__ == '__main__':
+    unittest.main()
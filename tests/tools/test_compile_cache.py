@@ -0,0 +1,118 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+
+import compile_cache
+from compile_cache import CompileCache
+
+
+class FakeCompiler:
+    """
+    Writes the artifacts next to the source like neo3-boa, the script is the source itself.
+    """
+
+    def __init__(self):
+        self.compiled = []
+
+    def __call__(self, path: str, debug: bool, log: bool):
+        self.compiled.append(path)
+        source = Path(path).read_bytes()
+        Path(path.replace('.py', '.nef')).write_bytes(b'NEF3' + source)
+        Path(path.replace('.py', '.manifest.json')).write_text(json.dumps({'name': Path(path).stem}))
+        if debug:
+            Path(path.replace('.py', '.nefdbgnfo')).write_bytes(b'debug')
+        return source, {'name': Path(path).stem}
+
+
+class CompileCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp.name)
+        self.source = self.root / 'contract.py'
+        self.source.write_text('x = 1\n')
+        self.compiler = FakeCompiler()
+
+    def tearDown(self):
+        self.temp.cleanup()
+
+    def cache(self, version: str = '0.11.0') -> CompileCache:
+        return CompileCache(self.root / 'cache', version)
+
+    def test_hit_restores_the_artifacts(self):
+        cache = self.cache()
+        compiled = cache.compile_and_save(str(self.source), self.compiler)
+        (self.root / 'contract.nef').unlink()
+
+        self.assertEqual(compiled, cache.compile_and_save(str(self.source), self.compiler))
+        self.assertEqual(1, len(self.compiler.compiled))
+        self.assertEqual(b'NEF3x = 1\n', (self.root / 'contract.nef').read_bytes())
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        self.assertIn('1 hits, 1 misses', cache.report())
+
+    def test_shared_across_runs_and_paths(self):
+        self.cache().compile_and_save(str(self.source), self.compiler)
+        # same source in another directory, e.g. an older revision checked out aside
+        copy = self.root / 'revision' / 'contract.py'
+        copy.parent.mkdir()
+        copy.write_text(self.source.read_text())
+
+        cache = self.cache()
+        cache.compile_and_save(str(copy), self.compiler)
+        self.assertEqual(1, len(self.compiler.compiled))
+        self.assertTrue((copy.parent / 'contract.manifest.json').exists())
+        self.assertGreaterEqual(cache.saved, 0)
+
+    def test_changed_source_or_flags_compile(self):
+        cache = self.cache()
+        cache.compile_and_save(str(self.source), self.compiler)
+        self.source.write_text('x = 2\n')
+        script, manifest = cache.compile_and_save(str(self.source), self.compiler)
+        self.assertEqual(b'x = 2\n', script)
+        cache.compile_and_save(str(self.source), self.compiler, debug=True)
+        self.assertEqual(3, len(self.compiler.compiled))
+
+        (self.root / 'contract.nefdbgnfo').unlink()
+        cache.compile_and_save(str(self.source), self.compiler, debug=True)
+        self.assertEqual(b'debug', (self.root / 'contract.nefdbgnfo').read_bytes())
+
+    def test_other_compiler_versions_are_dropped(self):
+        self.cache('0.10.0').compile_and_save(str(self.source), self.compiler)
+        cache = self.cache('0.11.0')
+        self.assertEqual([], cache.entries())
+        cache.compile_and_save(str(self.source), self.compiler)
+        self.assertEqual(2, len(self.compiler.compiled))
+
+    def test_broken_entries_are_recompiled(self):
+        cache = self.cache()
+        cache.compile_and_save(str(self.source), self.compiler)
+        entry, = cache.entries()
+        (entry / 'artifact.nef').unlink()
+        cache.compile_and_save(str(self.source), self.compiler)
+        self.assertEqual(2, len(self.compiler.compiled))
+
+    def test_least_recently_used_entries_are_pruned(self):
+        cache = self.cache()
+        for number in range(compile_cache.MAX_ENTRIES + 3):
+            self.source.write_text('x = {0}\n'.format(number))
+            cache.compile_and_save(str(self.source), self.compiler)
+            entry = cache.directory / 'contract-{0}'.format(cache.key(str(self.source), False))
+            # distinct access times even on coarse file systems
+            os.utime(entry / compile_cache.META_FILE, (number, number))
+        self.assertEqual(compile_cache.MAX_ENTRIES, len(cache.entries()))
+
+    def test_disabled(self):
+        os.environ[compile_cache.ENVIRONMENT_VARIABLE] = '0'
+        try:
+            self.assertIsNone(compile_cache.shared_cache())
+        finally:
+            del os.environ[compile_cache.ENVIRONMENT_VARIABLE]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+
+from engine_server import EngineServer, EngineServerError
+
+# the protocol of tools/engine-server, an invocation adds its method to the storage unless it is `fault`, and `burn`
+# deletes `mint`
+FAKE_SERVER = '''
+import json
+import sys
+
+storage = None
+
+
+def invoke(request):
+    global storage
+    if 'storage' in request:
+        storage = request['storage']
+    if request['method'] == 'exit':
+        sys.exit(1)
+    if request['method'] == 'fault':
+        return {'vmstate': 'FAULT', 'sent': 'storage' in request}
+    before = storage or []
+    storage = [key for key in before if request['method'] != 'burn' or key != 'mint'] + [request['method']]
+    changes = {'put': [key for key in storage if key not in before],
+               'delete': [key for key in before if key not in storage]}
+    return {'vmstate': 'HALT', 'storagechanges': changes, 'sent': 'storage' in request}
+
+
+for line in sys.stdin:
+    request = json.loads(line)
+    if 'batch' in request:
+        response = [invoke(invocation) for invocation in request['batch']]
+    else:
+        response = invoke(request)
+    print(json.dumps(response), flush=True)
+'''
+
+
+class FakeStorage:
+
+    def __init__(self, items):
+        self._dict = {item: object() for item in items}
+
+
+class EngineServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = EngineServer([sys.executable, '-c', FAKE_SERVER])
+
+    def tearDown(self):
+        self.server.close()
+
+    def invoke(self, method: str, storage: FakeStorage):
+        result = self.server.invoke({'method': method, 'storage': list(storage._dict)}, storage)
+        if result['vmstate'] == 'HALT':
+            # the changes are applied to the same storage, as persistent_engine applies them
+            for key in result['storagechanges']['delete']:
+                del storage._dict[key]
+            for key in result['storagechanges']['put']:
+                storage._dict[key] = object()
+            self.server.sync(storage)
+        return result, storage
+
+    def test_storage_is_sent_once(self):
+        result, storage = self.invoke('deploy', FakeStorage([]))
+        self.assertTrue(result['sent'])
+        result, storage = self.invoke('mint', storage)
+        self.assertFalse(result['sent'])
+        self.assertEqual({'put': ['mint'], 'delete': []}, result['storagechanges'])
+        self.assertEqual(['deploy', 'mint'], list(storage._dict))
+
+        # a local write, e.g. add_gas, makes the storage of the server stale
+        storage._dict['gas'] = object()
+        result, storage = self.invoke('transfer', storage)
+        self.assertTrue(result['sent'])
+        self.assertEqual(['deploy', 'mint', 'gas', 'transfer'], list(storage._dict))
+
+        result, storage = self.invoke('burn', storage)
+        self.assertFalse(result['sent'])
+        self.assertEqual({'put': ['burn'], 'delete': ['mint']}, result['storagechanges'])
+        self.assertEqual(['deploy', 'gas', 'transfer', 'burn'], list(storage._dict))
+
+        # another engine, e.g. restored from a snapshot
+        result, storage = self.invoke('burn', FakeStorage(['deploy', 'mint']))
+        self.assertTrue(result['sent'])
+        self.assertEqual(['deploy', 'burn'], list(storage._dict))
+
+    def test_batch(self):
+        result, storage = self.invoke('deploy', FakeStorage([]))
+        invocations = [{'method': method, 'storage': ['ignored']} for method in ('mint', 'fault', 'transfer')]
+        results = self.server.invoke_batch(invocations, storage)
+        self.assertEqual(['HALT', 'FAULT', 'HALT'], [result['vmstate'] for result in results])
+        self.assertEqual([False] * 3, [result['sent'] for result in results])
+        self.assertEqual(['transfer'], results[2]['storagechanges']['put'])
+        self.assertEqual([], self.server.invoke_batch([], storage))
+        self.assertEqual(2, self.server.requests)
+
+    def test_restart(self):
+        result, storage = self.invoke('deploy', FakeStorage([]))
+        with self.assertRaises(EngineServerError):
+            self.server.invoke({'method': 'exit'}, storage)
+        self.assertFalse(self.server.holds(storage))
+        # the new process gets the storage again
+        result, storage = self.invoke('mint', storage)
+        self.assertTrue(result['sent'])
+        self.assertEqual(['deploy', 'mint'], list(storage._dict))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+
+import engine_snapshots
+from engine_snapshots import EngineSnapshotMixin, SnapshotCache
+
+
+class FakeStorage:
+
+    def __init__(self):
+        self._dict = {}
+
+    def copy(self):
+        storage = FakeStorage()
+        storage._dict = self._dict.copy()
+        return storage
+
+
+class FakeEngine:
+    """
+    The state attributes of the TestEngine, a run appends a block and writes a storage entry.
+    """
+
+    def __init__(self):
+        self._storage = FakeStorage()
+        self._notifications = []
+        self._height = 0
+        self._blocks = []
+        self._accounts = []
+        self._contract_paths = []
+        self._current_tx = None
+        self._vm_state = 'NONE'
+        self._gas_consumed = 0
+        self._result_stack = []
+        self._error_message = None
+
+    def run(self, key: bytes, value: bytes):
+        self._storage._dict[key] = value
+        self._blocks.append([key])
+        self._notifications.append(key)
+        self._height += 1
+
+
+class EngineSnapshotsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.setups = 0
+
+    def deploy(self, engine: FakeEngine) -> bytes:
+        self.setups += 1
+        engine.run(b'deployed', b'\x01')
+        return b'values'
+
+    def test_restored_state_is_independent(self):
+        snapshots = SnapshotCache()
+        first, values = snapshots.engine('deployed', [], FakeEngine, self.deploy)
+        first.run(b'token', b'\x02')
+        first._blocks[0].append(b'tx')
+
+        second, values = snapshots.engine('deployed', [], FakeEngine, self.deploy)
+        self.assertEqual(1, self.setups)
+        self.assertEqual(b'values', values)
+        self.assertEqual({b'deployed': b'\x01'}, second._storage._dict)
+        self.assertEqual([[b'deployed']], second._blocks)
+        self.assertEqual(1, second._height)
+        self.assertEqual((1, 1), (snapshots.restores, snapshots.builds))
+        self.assertIn('1 restores, 1 setups', snapshots.report())
+
+    def test_setups_build_on_snapshots(self):
+        snapshots = SnapshotCache()
+
+        def deployed() -> FakeEngine:
+            return snapshots.engine('deployed', [], FakeEngine, self.deploy)[0]
+
+        def mint(engine: FakeEngine) -> bytes:
+            engine.run(b'token', b'\x02')
+            return b'token'
+
+        for _ in range(3):
+            engine, token = snapshots.engine('minted', [], deployed, mint)
+            self.assertEqual(b'token', token)
+            self.assertEqual({b'deployed': b'\x01', b'token': b'\x02'}, engine._storage._dict)
+        self.assertEqual(1, self.setups)
+        self.assertEqual(2, snapshots.builds)
+
+    def test_changed_contract_runs_the_setup(self):
+        with tempfile.TemporaryDirectory() as directory:
+            nef = os.path.join(directory, 'contract.nef')
+            Path(nef).write_bytes(b'NEF3 first')
+            snapshots = SnapshotCache()
+            snapshots.engine('deployed', [nef], FakeEngine, self.deploy)
+            snapshots.engine('deployed', [nef], FakeEngine, self.deploy)
+            Path(nef).write_bytes(b'NEF3 second')
+            snapshots.engine('deployed', [nef], FakeEngine, self.deploy)
+        self.assertEqual(2, self.setups)
+
+    def test_disabled(self):
+        os.environ[engine_snapshots.ENVIRONMENT_VARIABLE] = '0'
+        try:
+            self.assertIsNone(engine_snapshots.shared_snapshots())
+            for _ in range(2):
+                EngineSnapshotMixin().snapshot_engine('deployed', [], FakeEngine, self.deploy)
+        finally:
+            del os.environ[engine_snapshots.ENVIRONMENT_VARIABLE]
+        self.assertEqual(2, self.setups)
+
+
+if __name__ == '__main__':
+    unittest.main()
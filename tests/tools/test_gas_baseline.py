@@ -0,0 +1,49 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+
+import gas_baseline
+
+
+class GasBaselineTest(unittest.TestCase):
+
+    def test_regression_over_threshold(self):
+        baseline = {'mint[raw]': 1000000, 'burn': 500000}
+        figures = {'mint[raw]': 1030000, 'burn': 505000}
+        regressions = gas_baseline.compare(baseline, figures, 2.0)
+        self.assertEqual(['mint[raw]'], [regression.name for regression in regressions])
+        self.assertAlmostEqual(3.0, regressions[0].change)
+
+    def test_cheaper_is_not_a_regression(self):
+        self.assertEqual([], gas_baseline.compare({'burn': 500000}, {'burn': 100}, 0.0))
+
+    def test_new_and_removed_benchmarks(self):
+        baseline = {'removed': 10}
+        figures = {'new': 10}
+        self.assertEqual([], gas_baseline.compare(baseline, figures, 2.0))
+        report = gas_baseline.format_report(baseline, figures)
+        self.assertIn('new', report.splitlines()[1])
+        self.assertIn('removed', report.splitlines()[2])
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'baseline.json'
+            self.assertEqual({}, gas_baseline.load_baseline(path))
+            gas_baseline.save_baseline(path, {'b': 2, 'a': 1})
+            self.assertEqual({'a': 1, 'b': 2}, gas_baseline.load_baseline(path))
+            self.assertTrue(path.read_text().index('"a"') < path.read_text().index('"b"'))
+
+    def test_main_exit_code(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline, current = Path(directory) / 'baseline.json', Path(directory) / 'current.json'
+            gas_baseline.save_baseline(baseline, {'mint': 100})
+            gas_baseline.save_baseline(current, {'mint': 110})
+            self.assertEqual(1, gas_baseline.main([str(baseline), str(current), '5']))
+            self.assertEqual(0, gas_baseline.main([str(baseline), str(current), '10']))
+
+
+if __name__ == '__main__':
+    unittest.main()
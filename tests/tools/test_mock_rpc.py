@@ -0,0 +1,155 @@
+import base64
+import hashlib
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2]))
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+
+import mock_rpc
+import rpc_load
+import rpc_refresh_bench
+from indexer import read_node
+from rpc_refresh_bench import RpcClient, RpcError
+
+CONTRACT = mock_rpc.DEFAULT_CONTRACT
+ALICE = bytes(range(20))
+BOB = bytes(range(1, 21))
+
+
+class EncodingTest(unittest.TestCase):
+
+    def test_transaction_round_trip(self):
+        script = mock_rpc.emit_contract_call(CONTRACT, 'symbol', [])
+        raw = mock_rpc.build_transaction(script, ALICE, 7, 100, 2000, 300)
+        transaction = mock_rpc.parse_transaction(raw)
+        self.assertEqual(7, transaction.nonce)
+        self.assertEqual(2000, transaction.sysfee)
+        self.assertEqual(300, transaction.netfee)
+        self.assertEqual(100, transaction.valid_until_block)
+        self.assertEqual([{'account': mock_rpc.to_uint160(ALICE), 'scopes': 'CalledByEntry'}], transaction.signers)
+        self.assertEqual(script, transaction.script)
+        # the witness, 3 bytes, is not part of the hash
+        self.assertEqual('0x' + hashlib.sha256(raw[:-3]).digest()[::-1].hex(), transaction.hash)
+        self.assertEqual(base64.b64encode(script).decode(), transaction.to_json()['script'])
+
+    def test_contract_call_round_trip(self):
+        args = [ALICE, b'x' * 300, 0, -1, 16, 17, -200, 1 << 40, True, None, [b'a', [1, 2]], []]
+        script = mock_rpc.emit_contract_call(CONTRACT, 'method', args)
+        self.assertEqual([(CONTRACT, 'method', args[:8] + [1] + args[9:])], mock_rpc.decode_contract_calls(script))
+
+    def test_unsupported_instruction(self):
+        with self.assertRaises(ValueError):
+            mock_rpc.decode_contract_calls(b'\x40')
+
+
+class MockNodeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = mock_rpc.make_server(mock_rpc.MockNode(CONTRACT), port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = RpcClient('http://localhost:{0}'.format(self.server.server_address[1]))
+        self.driver = rpc_load.LoadDriver(self.client, CONTRACT)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def send(self, method: str, args, nonce: int) -> str:
+        script = mock_rpc.emit_contract_call(CONTRACT, method, args)
+        raw = mock_rpc.build_transaction(script, ALICE, nonce, 1000)
+        return self.client.call('sendrawtransaction', [base64.b64encode(raw).decode()])['hash']
+
+    def test_mint_flow(self):
+        self.assertEqual((1).to_bytes(4, 'big'), self.driver.mint(0))
+        self.assertEqual((2).to_bytes(4, 'big'), self.driver.mint(1))
+        self.assertEqual(3, self.client.call('getblockcount', []))
+
+        properties = self.client.invoke(CONTRACT, 'properties', [(1).to_bytes(4, 'big')])
+        self.assertEqual(b'load', properties[b'name'])
+        self.assertEqual(b'2', properties[b'block'])
+        self.assertEqual(2, self.client.invoke(CONTRACT, 'balanceOf', [ALICE]))
+        self.assertEqual(2, self.client.invoke(CONTRACT, 'totalSupply', []))
+
+    def test_image_chunks(self):
+        image = b'B' * 5000
+        self.send('mint', [ALICE, b'{"name": "large"}', b'', b'', image], 0)
+        self.driver.mint(1)
+        large, small = (1).to_bytes(4, 'big'), (2).to_bytes(4, 'big')
+
+        self.assertEqual([5000, 2], self.client.invoke(CONTRACT, 'imageInfo', [large]))
+        chunks = [self.client.invoke(CONTRACT, 'imageChunk', [large, index]) for index in range(2)]
+        self.assertEqual(image, b''.join(chunks))
+        with self.assertRaises(RpcError):
+            self.client.invoke(CONTRACT, 'imageChunk', [large, 2])
+        properties = self.client.invoke(CONTRACT, 'properties', [large])
+        self.assertEqual(2, properties[b'imageChunks'])
+        # the first chunk, for the readers of ascii
+        self.assertEqual(image[:mock_rpc.IMAGE_CHUNK_SIZE], properties[b'ascii'])
+
+        self.assertNotIn(b'imageChunks', self.client.invoke(CONTRACT, 'properties', [small]))
+        self.assertEqual([0, 0], self.client.invoke(CONTRACT, 'imageInfo', [(3).to_bytes(4, 'big')]))
+
+    def test_invalid_packed_image(self):
+        # a run with no character before it, the mint faults as in the contract
+        tx_hash = self.send('mint', [ALICE, b'{"name": "broken"}', b'', b'', b'\xa1\x00\x04\xf0\x0e'], 0)
+        execution = self.client.call('getapplicationlog', [tx_hash])['executions'][0]
+        self.assertEqual('FAULT', execution['vmstate'])
+        self.assertEqual(0, self.client.invoke(CONTRACT, 'totalSupply', []))
+
+    def test_invocations_are_not_persisted(self):
+        self.driver.mint(0)
+        token = (1).to_bytes(4, 'big')
+        signers = [{'account': mock_rpc.to_uint160(ALICE), 'scopes': 'CalledByEntry'}]
+        params = [rpc_refresh_bench.to_contract_parameter(value) for value in (BOB, token)] + [{'type': 'Any'}]
+        result = self.client.call('invokefunction', [CONTRACT, 'transfer', params, signers])
+        self.assertEqual('HALT', result['state'])
+        self.assertEqual(ALICE, self.client.invoke(CONTRACT, 'ownerOf', [token]))
+
+    def test_faulted_transaction(self):
+        tx_hash = self.send('transfer', [BOB, (1).to_bytes(4, 'big'), None], 0)
+        execution = self.client.call('getapplicationlog', [tx_hash])['executions'][0]
+        self.assertEqual('FAULT', execution['vmstate'])
+        self.assertEqual('FAULT', self.client.call('getrawtransaction', [tx_hash, True])['vmstate'])
+        with self.assertRaises(RpcError):
+            self.send('transfer', [BOB, (1).to_bytes(4, 'big'), None], 0)
+        with self.assertRaises(RpcError):
+            self.client.call('getrawtransaction', ['0x' + '00' * 32, True])
+        with self.assertRaises(RpcError):
+            self.client.invoke(CONTRACT, 'ownerOf', [(1).to_bytes(4, 'big')])
+
+    def test_network_fee_is_deterministic(self):
+        raw = mock_rpc.build_transaction(mock_rpc.emit_contract_call(CONTRACT, 'symbol', []), ALICE, 0, 10)
+        fee = self.client.call('calculatenetworkfee', [base64.b64encode(raw).decode()])
+        self.assertEqual(str(len(raw) * mock_rpc.FEE_PER_BYTE + mock_rpc.VERIFICATION_FEE), fee['networkfee'])
+
+    def test_tools_against_the_mock(self):
+        for number in range(5):
+            self.driver.mint(number)
+        self.send('transfer', [BOB, (2).to_bytes(4, 'big'), None], 10)
+        self.send('burn', [(3).to_bytes(4, 'big')], 11)
+
+        events = list(read_node(self.client.call, CONTRACT, 0))
+        self.assertEqual(7, len(events))
+        self.assertEqual((ALICE, BOB, 1, (2).to_bytes(4, 'big')), events[5].args)
+
+        token_ids = [rpc_refresh_bench.token_id(number) for number in range(1, 6)]
+        batched = rpc_refresh_bench.refresh_batched(self.client, CONTRACT, token_ids)
+        self.assertEqual([ALICE, BOB, None, ALICE, ALICE], batched['owners'])
+        # ownerOf throws on the burned token
+        unbatched = rpc_refresh_bench.refresh_unbatched(self.client, CONTRACT, token_ids[:2] + token_ids[3:])
+        self.assertEqual(unbatched['balances'], batched['balances'])
+
+    def test_load(self):
+        report = rpc_load.run_flows(self.driver.mint, 20, 5)
+        self.assertEqual(0, report['errors'])
+        self.assertEqual(20, self.client.invoke(CONTRACT, 'totalSupply', []))
+        report = rpc_load.run_flows(self.driver.query, 20, 5)
+        self.assertEqual(0, report['errors'])
+        self.assertIn('p99 ms', report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+
+import parallel_tests
+
+SUITE = '''
+import os
+import unittest
+
+
+class SuiteTest(unittest.TestCase):
+
+    def test_isolated(self):
+        # each worker has its own working directory, with the directories of the suite
+        self.assertFalse(os.path.exists('scratch.txt'))
+        with open('scratch.txt', 'w') as f:
+            f.write('x')
+        self.assertTrue(os.path.isfile('test_native/auxiliary_contract.py'))
+        os.remove('scratch.txt')
+
+    def test_failing(self):
+        print('some output')
+        self.assertEqual(1, 2)
+
+    @unittest.skip('not now')
+    def test_skipped(self):
+        pass
+'''
+
+
+class FakeNotification:
+
+    def __init__(self, name: str, arguments):
+        self.name = name
+        self.arguments = arguments
+
+
+class FakeEngine:
+
+    def __init__(self):
+        self._notifications = []
+        self._vm_state = 'HALT'
+        self._gas_consumed = 0
+
+    def run(self, contract_id, method: str, *arguments, reset_engine: bool = False):
+        if reset_engine:
+            self._notifications.clear()
+        self._gas_consumed = 100 * len(arguments)
+        self._notifications.append(FakeNotification(method, arguments))
+        return method
+
+
+class ParallelTestsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp.name)
+        (self.directory / 'test_suite.py').write_text(SUITE)
+        (self.directory / 'test_broken.py').write_text('import missing_module\n')
+        (self.directory / 'test_native').mkdir()
+        (self.directory / 'test_native' / 'auxiliary_contract.py').write_text('')
+        for number in range(4):
+            (self.directory / 'test_more_{0}.py'.format(number)).write_text(
+                SUITE.replace('SuiteTest', 'More{0}Test'.format(number)))
+        sys.path.insert(0, self.temp.name)
+
+    def tearDown(self):
+        sys.path.remove(self.temp.name)
+        # discovery imported the suite, the next test writes it in another directory
+        for name in [name for name in sys.modules if name.startswith(('test_suite', 'test_broken', 'test_more_'))]:
+            del sys.modules[name]
+        self.temp.cleanup()
+
+    def test_run(self):
+        test_ids = parallel_tests.discover(self.directory, [])
+        self.assertEqual(16, len(test_ids))
+        run = parallel_tests.run_parallel(test_ids, self.directory, 3, {'test_suite.SuiteTest.test_failing': 5.0})
+
+        reports = {test['id']: test for test in run['tests']}
+        self.assertEqual(test_ids, [test['id'] for test in run['tests']])
+        self.assertEqual('passed', reports['test_suite.SuiteTest.test_isolated']['status'])
+        self.assertEqual('skipped', reports['test_suite.SuiteTest.test_skipped']['status'])
+        failing = reports['test_suite.SuiteTest.test_failing']
+        self.assertEqual('failed', failing['status'])
+        self.assertIn('some output', failing['output'])
+        self.assertIn('AssertionError', failing['traceback'])
+        broken = reports[parallel_tests.FAILED_IMPORT + 'test_broken']
+        self.assertEqual('error', broken['status'])
+        self.assertIn('missing_module', broken['traceback'])
+
+        report = parallel_tests.format_report(run)
+        self.assertIn('Ran 16 tests', report)
+        self.assertIn('5 passed, 5 failed, 1 error, 5 skipped', report)
+        json.dumps(run)
+
+    def test_patterns(self):
+        self.assertEqual([parallel_tests.FAILED_IMPORT + 'test_broken', 'test_suite.SuiteTest.test_isolated'],
+                         parallel_tests.discover(self.directory, ['SuiteTest.test_isolated']))
+
+    def test_durations(self):
+        path = self.directory / 'durations.json'
+        self.assertEqual({}, parallel_tests.load_durations(path))
+        run = {'tests': [{'id': 'a', 'status': 'passed', 'seconds': 2.0},
+                         {'id': 'b', 'status': 'failed', 'seconds': 1.0}]}
+        parallel_tests.save_durations(path, run)
+        self.assertEqual({'a': 2.0}, parallel_tests.load_durations(path))
+
+    def test_recorded_invocations(self):
+        parallel_tests.record_invocations(FakeEngine)
+        parallel_tests._invocations.clear()
+        engine = FakeEngine()
+        engine.run('contract', 'mint', 1, 2)
+        engine.run('contract', 'burn', 1)
+        engine.run('contract', 'symbol', reset_engine=True)
+
+        invocations = parallel_tests._invocations
+        self.assertEqual(['mint', 'burn', 'symbol'], [invocation['method'] for invocation in invocations])
+        self.assertEqual([['burn', '(1,)']], invocations[1]['notifications'])
+        self.assertEqual([['symbol', '()']], invocations[2]['notifications'])
+
+        run = {'tests': [{'invocations': invocations}, {'invocations': invocations[:1]}]}
+        self.assertEqual({'calls': 2, 'gas': 400, 'max': 200}, parallel_tests.gas_by_method(run)['mint'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import base64
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+
+import rpc_refresh_bench
+from rpc_refresh_bench import RpcClient, RpcError
+
+
+class FakeNode:
+    """
+    Answers `invokefunction` like the contract would, for tokens owned in turn by a few accounts.
+    """
+
+    def __init__(self, tokens: int, holders: int = 3):
+        self.owners = {rpc_refresh_bench.token_id(number): bytes([number % holders]) * 20
+                       for number in range(1, tokens + 1)}
+        self.requests = []
+
+    def post(self, url: str, body: bytes) -> bytes:
+        request = json.loads(body)
+        self.requests.append(request)
+        contract, method, params = request['params']
+        args = [self.decode(param) for param in params]
+        if method == 'ownerOf' and args[0] not in self.owners:
+            result = {'state': 'FAULT', 'exception': 'unknown token', 'stack': []}
+        else:
+            result = {'state': 'HALT', 'stack': [self.encode(getattr(self, method)(*args))]}
+        return json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': result}).encode()
+
+    def decode(self, param):
+        if param['type'] == 'Array':
+            return [self.decode(item) for item in param['value']]
+        return base64.b64decode(param['value'])
+
+    def encode(self, value):
+        if value is None:
+            return {'type': 'Any'}
+        if isinstance(value, int):
+            return {'type': 'Integer', 'value': str(value)}
+        if isinstance(value, bytes):
+            return {'type': 'ByteString', 'value': base64.b64encode(value).decode()}
+        if isinstance(value, dict):
+            return {'type': 'Map', 'value': [{'key': self.encode(key), 'value': self.encode(item)}
+                                             for key, item in value.items()]}
+        return {'type': 'Array', 'value': [self.encode(item) for item in value]}
+
+    def ownerOf(self, token):
+        return self.owners[token]
+
+    def balanceOf(self, owner):
+        return list(self.owners.values()).count(owner)
+
+    def properties(self, token):
+        return {b'name': b'token ' + token}
+
+    def ownerOfBatch(self, tokens):
+        return [self.owners.get(token) for token in tokens]
+
+    def balanceOfBatch(self, owners):
+        return [self.balanceOf(owner) for owner in owners]
+
+    def propertiesBatch(self, tokens):
+        return [self.properties(token) if token in self.owners else None for token in tokens]
+
+
+class RpcRefreshBenchTest(unittest.TestCase):
+    CONTRACT = '0x' + '00' * 20
+
+    def test_batched_matches_unbatched(self):
+        node = FakeNode(1000)
+        client = RpcClient('http://node', node.post)
+        token_ids = [rpc_refresh_bench.token_id(number) for number in range(1, 1001)]
+
+        unbatched = rpc_refresh_bench.refresh_unbatched(client, self.CONTRACT, token_ids)
+        unbatched_calls = client.calls
+        client.calls = 0
+        batched = rpc_refresh_bench.refresh_batched(client, self.CONTRACT, token_ids)
+
+        self.assertEqual(unbatched, batched)
+        self.assertEqual(2 * 1000 + 3, unbatched_calls)
+        # 2 owner batches, 10 properties batches and a single balance batch
+        self.assertEqual(13, client.calls)
+
+    def test_batches_are_capped(self):
+        node = FakeNode(1000)
+        client = RpcClient('http://node', node.post)
+        token_ids = [rpc_refresh_bench.token_id(number) for number in range(1, 1001)]
+
+        rpc_refresh_bench.refresh_batched(client, self.CONTRACT, token_ids)
+        for request in node.requests:
+            method = request['params'][1]
+            size = len(request['params'][2][0]['value'])
+            if method == 'propertiesBatch':
+                self.assertLessEqual(size, rpc_refresh_bench.MAX_PROPERTIES_BATCH_SIZE)
+            else:
+                self.assertLessEqual(size, rpc_refresh_bench.MAX_BATCH_READ_SIZE)
+
+    def test_burned_tokens_have_no_owner(self):
+        node = FakeNode(10)
+        client = RpcClient('http://node', node.post)
+        token_ids = [rpc_refresh_bench.token_id(number) for number in range(1, 12)]
+
+        refreshed = rpc_refresh_bench.refresh_batched(client, self.CONTRACT, token_ids)
+        self.assertIsNone(refreshed['owners'][-1])
+        self.assertIsNone(refreshed['properties'][-1])
+        self.assertEqual(3, len(refreshed['balances']))
+
+    def test_fault_raises(self):
+        client = RpcClient('http://node', FakeNode(1).post)
+        with self.assertRaises(RpcError):
+            client.invoke(self.CONTRACT, 'ownerOf', [rpc_refresh_bench.token_id(2)])
+
+    def test_batch_sizes_match_contract(self):
+        source = (Path(__file__).parents[2] / 'contracts' / 'ascii-nft.py').read_text()
+        self.assertIn('MAX_BATCH_READ_SIZE = {0}\n'.format(rpc_refresh_bench.MAX_BATCH_READ_SIZE), source)
+        self.assertIn('MAX_PROPERTIES_BATCH_SIZE = {0}\n'.format(rpc_refresh_bench.MAX_PROPERTIES_BATCH_SIZE),
+                      source)
+
+
+if __name__ == '__main__':
+    unittest.main()
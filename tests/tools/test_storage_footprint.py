@@ -0,0 +1,80 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+
+import storage_footprint
+
+
+class StorageFootprintTest(unittest.TestCase):
+    CONTRACT_PATH_PY = Path(__file__).parents[2] / 'contracts' / 'ascii-nft.py'
+
+    def groups(self):
+        return storage_footprint.read_groups(self.CONTRACT_PATH_PY.read_text())
+
+    def storage(self, tokens: int):
+        owner = bytes(20)
+        storage = {b'STATE': bytes(12), b'\x0c' + owner: b'\x01', b'\x04' + owner: bytes([tokens])}
+        for number in range(1, tokens + 1):
+            token = number.to_bytes(4, 'big')
+            storage[b'\x01' + token] = owner
+            storage[b'\x02' + owner + token] = b''
+            storage[b'\x05' + token] = bytes(60)
+        return storage
+
+    def test_read_groups_from_contract(self):
+        groups = {group.name: group for group in self.groups()}
+        self.assertEqual(b'\x01', groups['TOKEN_PREFIX'].key)
+        self.assertTrue(groups['TOKEN_PREFIX'].is_prefix)
+        self.assertEqual(b'ASC', groups['LEGACY_ASCII_PREFIX'].key)
+        # single keys passed to the storage calls
+        self.assertFalse(groups['STATE'].is_prefix)
+        self.assertIn('AUTH_ADDRESSES', groups)
+        # bytes constants that aren't storage keys
+        self.assertNotIn('PACKED_IMAGE_MAGIC', groups)
+
+    def test_group_of(self):
+        groups = self.groups()
+        self.assertEqual('LEGACY_LOCKED_VIEW_COUNT_PREFIX', storage_footprint.group_of(b'LVCP\x00', groups))
+        self.assertEqual('LEGACY_LOCKED_PREFIX', storage_footprint.group_of(b'LCP\x00', groups))
+        self.assertEqual('STATE', storage_footprint.group_of(b'STATE', groups))
+        self.assertEqual(storage_footprint.UNKNOWN, storage_footprint.group_of(b'\xff', groups))
+
+    def test_footprint(self):
+        footprints = {entry.name: entry
+                      for entry in storage_footprint.footprint(self.storage(10), self.groups(), 1000, 100000)}
+        meta = footprints['META_PREFIX']
+        self.assertEqual(10, meta.keys)
+        self.assertEqual(10 * 65, meta.size)
+        self.assertEqual(65, meta.per_token)
+        self.assertEqual(65 * 1000 * 100000, meta.projected_fee)
+        self.assertEqual(25, footprints['ACCOUNT_PREFIX'].per_token)
+        # single keys don't grow with the collection
+        self.assertEqual(17 * 100000, footprints['STATE'].projected_fee)
+
+    def test_report_formats(self):
+        footprints = storage_footprint.footprint(self.storage(2), self.groups())
+        table = storage_footprint.format_table(footprints, 10000)
+        self.assertTrue(table.splitlines()[-1].startswith('total'))
+        report = json.loads(json.dumps(storage_footprint.to_json(footprints, 10000)))
+        self.assertEqual(10000, report['projected_tokens'])
+        self.assertEqual(len(footprints), len(report['groups']))
+
+    def test_dump_round_trip(self):
+        storage = self.storage(3)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'storage.json'
+            storage_footprint.dump_storage(storage, path)
+            self.assertEqual(storage, storage_footprint.load_dump(path))
+
+            output = Path(directory) / 'footprint.json'
+            self.assertEqual(0, storage_footprint.main(['--dump', str(path), '--json', str(output)]))
+            self.assertEqual(3, {group['name']: group for group in json.loads(output.read_text())['groups']}
+                             ['TOKEN_PREFIX']['keys'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2] / 'tools'))
+
+from strip_debug import strip_debug
+
+
+class StripDebugTest(unittest.TestCase):
+    CONTRACT_PATH_PY = Path(__file__).parents[2] / 'contracts' / 'ascii-nft.py'
+
+    def test_strip_debug_calls(self):
+        source = (
+            "def balance(owner):\n"
+            "    debug(['balanceOf: ', get(owner)])\n"
+            "    return get(owner)\n"
+        )
+        self.assertEqual("def balance(owner):\n    return get(owner)\n", strip_debug(source))
+
+    def test_strip_multiline_debug_call(self):
+        source = (
+            "def f():\n"
+            "    debug([\n"
+            "        'a',\n"
+            "    ])\n"
+            "    return 1\n"
+        )
+        self.assertEqual("def f():\n    return 1\n", strip_debug(source))
+
+    def test_emptied_block_gets_pass(self):
+        source = (
+            "def f(x):\n"
+            "    if x:\n"
+            "        debug(['x'])\n"
+            "    else:\n"
+            "        debug(['no x'])\n"
+            "    return x\n"
+        )
+        self.assertEqual("def f(x):\n    if x:\n        pass\n    else:\n        pass\n    return x\n",
+                         strip_debug(source))
+
+    def test_strip_debug_blocks(self):
+        source = (
+            "a = 1\n"
+            "# DEBUG_START\n"
+            "debug = CreateNewEvent([('params', list)], 'Debug')\n"
+            "# DEBUG_END\n"
+            "def f():\n"
+            "#DEBUG_START\n"
+            "    if a:\n"
+            "        return 2\n"
+            "#DEBUG_END\n"
+            "    return a\n"
+        )
+        self.assertEqual("a = 1\ndef f():\n    return a\n", strip_debug(source))
+
+    def test_keeps_other_calls_and_comments(self):
+        source = "def f():\n    # debug(['commented'])\n    debugger(1)\n    return 1\n"
+        self.assertEqual(source, strip_debug(source))
+
+    def test_unbalanced_markers(self):
+        with self.assertRaises(ValueError):
+            strip_debug("# DEBUG_START\na = 1\n")
+        with self.assertRaises(ValueError):
+            strip_debug("a = 1\n# DEBUG_END\n")
+
+    def test_contract_has_no_debug_left(self):
+        release = strip_debug(self.CONTRACT_PATH_PY.read_text())
+        compile(release, str(self.CONTRACT_PATH_PY), 'exec')
+        self.assertNotIn('debug(', release.replace("# debug(", ''))
+        self.assertNotIn('DEBUG_START', release)
+        self.assertNotIn("'Debug'", release)
+
+
+if __name__ == '__main__':
+    unittest.main()
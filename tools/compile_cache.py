@@ -0,0 +1,169 @@
+"""
+Cache of the contracts compiled by the test suites.
+
+Most tests compile contracts/ascii-nft.py and test_native/auxiliary_contract.py before deploying them, so a run
+used to compile the same sources dozens of times. Compiled artifacts (.nef, .manifest.json and .nefdbgnfo) are kept
+under `.compile_cache/`, keyed by the sha256 of the source, the compiler version and the debug flag, and copied back
+next to the source on a hit. The cache is shared by the test classes and by successive runs.
+
+A changed source or compiler gets a new key. Entries of another compiler version are dropped when the cache is
+opened and the least recently used entries beyond MAX_ENTRIES are dropped after each compilation.
+
+Set NEP11_COMPILE_CACHE to another directory to move the cache, or to `0` to compile every time.
+"""
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_DIRECTORY = Path(__file__).parents[1] / '.compile_cache'
+ENVIRONMENT_VARIABLE = 'NEP11_COMPILE_CACHE'
+MAX_ENTRIES = 32
+ARTIFACT_SUFFIXES = ('.nef', '.manifest.json', '.nefdbgnfo')
+META_FILE = 'meta.json'
+
+Compile = Callable[[str, bool, bool], Tuple[bytes, Dict[str, Any]]]
+
+
+class CompileCache:
+    """
+    Compiled artifacts by source content.
+
+    :param directory: where the entries are kept
+    :param compiler_version: part of the key, entries of other versions are dropped
+    """
+
+    def __init__(self, directory: Path, compiler_version: str):
+        self.directory = directory
+        self.compiler_version = compiler_version
+        self.hits = 0
+        self.misses = 0
+        # compile time avoided by the hits, and spent by the misses, in seconds
+        self.saved = 0.0
+        self.spent = 0.0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for entry in self.entries():
+            meta = self.read_meta(entry)
+            if meta is None or meta.get('compiler') != compiler_version:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def key(self, path: str, debug: bool) -> str:
+        digest = hashlib.sha256()
+        digest.update('{0}\0{1}\0'.format(self.compiler_version, debug).encode())
+        digest.update(Path(path).read_bytes())
+        return digest.hexdigest()
+
+    def compile_and_save(self, path: str, compile: Compile, debug: bool = False,
+                         log: bool = True) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Compile a contract, or copy its artifacts from the cache.
+
+        :param path: the contract source, the artifacts are written next to it as the compiler does
+        :param compile: compiles and saves the contract, returning its script and its manifest
+        :return: the script and the manifest of the contract
+        """
+        source = Path(path)
+        entry = self.directory / '{0}-{1}'.format(source.stem, self.key(path, debug))
+        meta = self.read_meta(entry)
+        if meta is not None:
+            for suffix in meta['artifacts']:
+                restore(entry / ('artifact' + suffix), Path(source.with_suffix('').as_posix() + suffix))
+            os.utime(entry / META_FILE)
+            self.hits += 1
+            self.saved += meta['seconds']
+            return bytes.fromhex(meta['script']), meta['manifest']
+
+        start = time.perf_counter()
+        script, manifest = compile(path, debug, log)
+        seconds = time.perf_counter() - start
+        self.misses += 1
+        self.spent += seconds
+        self.store(entry, source, script, manifest, seconds)
+        self.prune()
+        return script, manifest
+
+    def store(self, entry: Path, source: Path, script: bytes, manifest: Dict[str, Any], seconds: float):
+        # written aside then renamed, concurrent runs never read a partial entry
+        staging = Path(tempfile.mkdtemp(dir=self.directory, prefix='.staging-'))
+        artifacts = []
+        for suffix in ARTIFACT_SUFFIXES:
+            artifact = Path(source.with_suffix('').as_posix() + suffix)
+            if artifact.exists():
+                shutil.copyfile(artifact, staging / ('artifact' + suffix))
+                artifacts.append(suffix)
+        meta = {'compiler': self.compiler_version, 'source': str(source), 'seconds': seconds,
+                'artifacts': artifacts, 'script': script.hex(), 'manifest': manifest}
+        (staging / META_FILE).write_text(json.dumps(meta))
+        try:
+            staging.rename(entry)
+        except OSError:
+            # stored meanwhile by another run
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def prune(self):
+        entries = sorted(self.entries(), key=lambda entry: (entry / META_FILE).stat().st_mtime, reverse=True)
+        for entry in entries[MAX_ENTRIES:]:
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def entries(self):
+        return [entry for entry in self.directory.iterdir()
+                if entry.is_dir() and not entry.name.startswith('.') and (entry / META_FILE).exists()]
+
+    def read_meta(self, entry: Path) -> Optional[Dict[str, Any]]:
+        try:
+            meta = json.loads((entry / META_FILE).read_text())
+        except (OSError, ValueError):
+            return None
+        if not all((entry / ('artifact' + suffix)).exists() for suffix in meta.get('artifacts', ())):
+            return None
+        return meta
+
+    def report(self) -> str:
+        return 'compile cache: {0} hits, {1} misses, {2:.1f}s of compilation saved, {3:.1f}s spent compiling'.format(
+            self.hits, self.misses, self.saved, self.spent)
+
+
+def restore(artifact: Path, destination: Path):
+    # parallel test workers read the artifacts while others restore them, they must never see a partial file
+    if destination.exists() and destination.read_bytes() == artifact.read_bytes():
+        return
+    staging = destination.with_name('.{0}.{1}'.format(destination.name, os.getpid()))
+    shutil.copyfile(artifact, staging)
+    os.replace(staging, destination)
+
+
+_shared: Optional[CompileCache] = None
+
+
+def shared_cache() -> Optional[CompileCache]:
+    """
+    The cache of the test run, its report is printed when the run ends.
+
+    :return: the cache, or None if NEP11_COMPILE_CACHE is `0`
+    """
+    global _shared
+    setting = os.environ.get(ENVIRONMENT_VARIABLE, '')
+    if setting == '0':
+        return None
+    if _shared is None:
+        from boa3 import __version__
+        _shared = CompileCache(Path(setting) if setting else DEFAULT_DIRECTORY, __version__)
+        atexit.register(lambda: print('\n' + _shared.report()))
+    return _shared
+
+
+class CachedCompileMixin:
+    """
+    Routes BoaTest.compile_and_save through the shared cache, to list before BoaTest in the bases of a test class.
+    """
+
+    def compile_and_save(self, path: str, debug: bool = False, log: bool = True) -> Tuple[bytes, Dict[str, Any]]:
+        cache = shared_cache()
+        if cache is None:
+            return super().compile_and_save(path, debug, log)
+        return cache.compile_and_save(path, super().compile_and_save, debug, log)
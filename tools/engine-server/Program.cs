@@ -0,0 +1,140 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Reflection;
+using System.Text.Json.Nodes;
+
+namespace EngineServer;
+
+/// <summary>
+/// Keeps the TestEngine loaded between invocations: every line read on stdin is the JSON argument of one
+/// TestEngine run, or {"batch": [...]} for several runs in a row, and the results are written back as one line.
+/// A request without "storage" runs on the storage of the last successful run, so the Python side only sends the
+/// storage after changing it itself. A result does not carry the storage back either, only "storagechanges": the
+/// entries the run put, new or changed, and the keys it deleted.
+/// </summary>
+public class Program
+{
+    private static MethodInfo? engineMain;
+    // the JSON of the storage entries of the last successful run, by the JSON of their key
+    private static Dictionary<string, string>? storage;
+
+    public static int Main(string[] args)
+    {
+        engineMain = Assembly.Load("Neo.TestEngine").EntryPoint;
+        if (engineMain is null)
+        {
+            Console.Error.WriteLine("Neo.TestEngine has no entry point");
+            return 1;
+        }
+
+        TextWriter output = Console.Out;
+        string? line;
+        while ((line = Console.In.ReadLine()) != null)
+        {
+            JsonNode response;
+            try
+            {
+                JsonObject request = JsonNode.Parse(line)!.AsObject();
+                if (request["batch"] is JsonArray batch)
+                {
+                    var results = new JsonArray();
+                    foreach (JsonNode? invocation in batch)
+                    {
+                        results.Add(Invoke(JsonNode.Parse(invocation!.ToJsonString())!.AsObject()));
+                    }
+                    response = results;
+                }
+                else
+                {
+                    response = Invoke(request);
+                }
+            }
+            catch (Exception e)
+            {
+                response = new JsonObject { ["error"] = e.ToString() };
+            }
+            output.WriteLine(response.ToJsonString());
+            output.Flush();
+        }
+        return 0;
+    }
+
+    private static JsonNode Invoke(JsonObject request)
+    {
+        if (request["storage"] is JsonNode sent)
+        {
+            storage = Entries(sent);
+        }
+        else if (storage is not null)
+        {
+            request["storage"] = JsonNode.Parse("[" + string.Join(",", storage.Values) + "]");
+        }
+        Dictionary<string, string> before = storage ?? new Dictionary<string, string>();
+
+        // the TestEngine prints its result as the last line of its output
+        TextWriter output = Console.Out;
+        var captured = new StringWriter();
+        Console.SetOut(captured);
+        try
+        {
+            object?[]? arguments = engineMain!.GetParameters().Length == 0
+                ? null
+                : new object?[] { new[] { request.ToJsonString() } };
+            engineMain.Invoke(null, arguments);
+        }
+        finally
+        {
+            Console.SetOut(output);
+        }
+
+        string? last = captured.ToString().Split('\n', StringSplitOptions.RemoveEmptyEntries).LastOrDefault();
+        if (last is null)
+        {
+            return new JsonObject { ["error"] = "no output from the TestEngine" };
+        }
+        JsonObject result = JsonNode.Parse(last)!.AsObject();
+        if (result["storage"] is JsonNode after)
+        {
+            Dictionary<string, string> entries = Entries(after);
+            result.Remove("storage");
+            result["storagechanges"] = Changes(before, entries);
+            if (result["vmstate"]?.ToString() == "HALT")
+            {
+                storage = entries;
+            }
+        }
+        return result;
+    }
+
+    private static Dictionary<string, string> Entries(JsonNode storage)
+    {
+        var entries = new Dictionary<string, string>();
+        IEnumerable<JsonNode?> items = storage is JsonArray array ? array : new[] { storage };
+        foreach (JsonNode? entry in items)
+        {
+            entries[entry!["key"]!.ToJsonString()] = entry.ToJsonString();
+        }
+        return entries;
+    }
+
+    // the entries of the storage after a run that are new or changed, and the keys that are gone
+    private static JsonObject Changes(Dictionary<string, string> before, Dictionary<string, string> after)
+    {
+        var put = new JsonArray();
+        foreach ((string key, string entry) in after)
+        {
+            if (!before.TryGetValue(key, out string? previous) || previous != entry)
+            {
+                put.Add(JsonNode.Parse(entry));
+            }
+        }
+        var delete = new JsonArray();
+        foreach (string key in before.Keys.Where(key => !after.ContainsKey(key)))
+        {
+            delete.Add(JsonNode.Parse(key));
+        }
+        return new JsonObject { ["put"] = put, ["delete"] = delete };
+    }
+}
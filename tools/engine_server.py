@@ -0,0 +1,148 @@
+"""
+Client of the long-lived TestEngine process of tools/engine-server.
+
+The boa3_test TestEngine starts `dotnet Neo.TestEngine.dll` for every invocation, so each call pays the process
+startup, the loading of the engine and the contracts, and the serialization of the whole storage both ways. The
+engine server loads the TestEngine once and runs every JSON line it reads on stdin as one invocation, or a list of
+them. It keeps the storage of the last successful invocation, a request without storage runs on it, and a result only
+carries the changes of the invocation to the storage: `storagechanges`, with the entries to `put` and the keys to
+`delete`.
+
+`EngineServer` talks to one server process and tracks whether the storage of the Python side is the one the server
+kept. tests/contract/persistent_engine.py puts it behind the TestEngine interface.
+
+Set NEP11_ENGINE_SERVER to `0` to run the TestEngine process per invocation, or to the path of another server dll.
+"""
+import atexit
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SERVER = Path(__file__).parent / 'engine-server' / 'bin' / 'Release' / 'net6.0' / 'EngineServer.dll'
+ENVIRONMENT_VARIABLE = 'NEP11_ENGINE_SERVER'
+
+
+class EngineServerError(Exception):
+    pass
+
+
+class EngineServer:
+    """
+    A running engine server.
+
+    :param command: the command starting the server, `dotnet EngineServer.dll` by default
+    """
+
+    def __init__(self, command: Optional[List[str]] = None):
+        self.command = command or ['dotnet', str(DEFAULT_SERVER)]
+        self.process: Optional[subprocess.Popen] = None
+        self.requests = 0
+        # the storage of the Python side that the server holds, and its items when it was synced
+        self.synced_storage: Any = None
+        self.synced_items: Optional[Dict[Any, Any]] = None
+
+    def start(self):
+        if self.process is None or self.process.poll() is not None:
+            self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            text=True, bufsize=1)
+            self.forget()
+
+    def close(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+        self.process = None
+        self.forget()
+
+    def request(self, payload: Any) -> Any:
+        """
+        Send one line and read the response line.
+
+        :raise EngineServerError: if the server exited, it is started again by the next request
+        """
+        self.start()
+        self.requests += 1
+        try:
+            self.process.stdin.write(json.dumps(payload, separators=(',', ':')) + '\n')
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except OSError as e:
+            line = ''
+            error = e
+        else:
+            error = None
+        if not line:
+            self.close()
+            raise EngineServerError('the engine server exited') from error
+        return json.loads(line)
+
+    def invoke(self, arguments: Dict[str, Any], storage: Any) -> Dict[str, Any]:
+        """
+        Run one invocation, without its storage if the server already holds it.
+
+        :param arguments: the JSON arguments of the TestEngine, with the storage
+        :param storage: the storage of the Python side, to compare with the storage the server holds
+        """
+        return self.request(self.strip_storage(arguments, storage))
+
+    def invoke_batch(self, invocations: List[Dict[str, Any]], storage: Any) -> List[Dict[str, Any]]:
+        """
+        Run invocations in a row on the server, each one on the storage left by the previous successful one.
+        """
+        if not invocations:
+            return []
+        invocations = [self.strip_storage(invocations[0], storage)] + [
+            {name: value for name, value in invocation.items() if name != 'storage'} for invocation in invocations[1:]]
+        results = self.request({'batch': invocations})
+        if isinstance(results, dict):
+            # the whole batch failed
+            return [results] * len(invocations)
+        return results
+
+    def strip_storage(self, arguments: Dict[str, Any], storage: Any) -> Dict[str, Any]:
+        if self.holds(storage):
+            return {name: value for name, value in arguments.items() if name != 'storage'}
+        return arguments
+
+    def holds(self, storage: Any) -> bool:
+        """
+        :return: whether the server holds this storage, the same object with the same items as when it was synced
+        """
+        return (storage is not None and storage is self.synced_storage
+                and storage._dict.keys() == self.synced_items.keys()
+                and all(storage._dict[key] is item for key, item in self.synced_items.items()))
+
+    def sync(self, storage: Any):
+        """
+        Record that the server holds the storage, after a run that left both sides with it.
+        """
+        self.synced_storage = storage
+        self.synced_items = dict(storage._dict)
+
+    def forget(self):
+        self.synced_storage = None
+        self.synced_items = None
+
+
+_shared: Optional[EngineServer] = None
+
+
+def shared_server() -> Optional[EngineServer]:
+    """
+    The engine server of the test run, stopped when the run ends.
+
+    :return: the server, or None if NEP11_ENGINE_SERVER is `0` or the server is not built
+    """
+    global _shared
+    setting = os.environ.get(ENVIRONMENT_VARIABLE, '')
+    if setting == '0':
+        return None
+    if _shared is None:
+        path = Path(setting) if setting else DEFAULT_SERVER
+        if not path.is_file():
+            return None
+        _shared = EngineServer(['dotnet', str(path)])
+        atexit.register(_shared.close)
+    return _shared
@@ -0,0 +1,143 @@
+"""
+Snapshots of the TestEngine state, restored instead of deploying the contract again in every test.
+
+The contract tests used to create an engine, deploy the contract and often mint a token before the interesting part,
+so most of their time went into the same few setups. A setup now runs once per test run: its engine state (storage,
+blocks, notifications, contracts and signers) is captured under a name and every later test gets a new engine with
+that state copied in. Storage items are replaced, never changed in place, by the engine, so the storage copy is a
+dict copy, linear in the number of entries.
+
+Snapshots are keyed by the setup name and by the content of the nef files it uses, a recompiled contract gets its
+setup run again. Set NEP11_ENGINE_SNAPSHOTS to `0` to run every setup in every test.
+"""
+import atexit
+import copy
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+ENVIRONMENT_VARIABLE = 'NEP11_ENGINE_SNAPSHOTS'
+# the TestEngine attributes holding the state of the chain and of the last run
+STATE_ATTRIBUTES = ('_storage', '_notifications', '_height', '_blocks', '_accounts', '_contract_paths',
+                    '_current_tx', '_vm_state', '_gas_consumed', '_result_stack', '_error_message')
+
+
+class EngineSnapshot:
+    """
+    The state of an engine, with the values computed by its setup, e.g. the id of the minted token.
+
+    :param engine: the engine to capture, it can keep running afterwards
+    :param values: returned along with every engine restored from the snapshot
+    """
+
+    def __init__(self, engine: Any, values: Any = None):
+        self.state = {name: copy_state(name, getattr(engine, name)) for name in STATE_ATTRIBUTES}
+        self.values = values
+
+    def restore(self, engine: Any) -> Any:
+        """
+        Copy the captured state into an engine, replacing its own.
+
+        :return: the engine
+        """
+        for name, value in self.state.items():
+            setattr(engine, name, copy_state(name, value))
+        return engine
+
+
+def copy_state(name: str, value: Any) -> Any:
+    if name == '_storage':
+        # the items are immutable, only the mapping is copied
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+def nef_digest(paths: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.encode() + b'\0')
+        if Path(path).is_file():
+            digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+class SnapshotCache:
+    """
+    Engine snapshots by setup, with the setup time they saved.
+    """
+
+    def __init__(self):
+        self.snapshots: Dict[Tuple[str, str], EngineSnapshot] = {}
+        self.seconds: Dict[Tuple[str, str], float] = {}
+        self.builds = 0
+        self.restores = 0
+        # setup time avoided by the restores, and spent by the builds, in seconds
+        self.saved = 0.0
+        self.spent = 0.0
+
+    def engine(self, name: str, nef_paths: Iterable[str], create: Callable[[], Any],
+               setup: Callable[[Any], Any]) -> Tuple[Any, Any]:
+        """
+        An engine in the state left by a setup.
+
+        :param name: the name of the setup
+        :param nef_paths: the contracts used by the setup, part of the key
+        :param create: creates an empty engine
+        :param setup: prepares an empty engine, returning the values to keep along with the state
+        :return: the engine and the values of the setup
+        """
+        key = (name, nef_digest(nef_paths))
+        snapshot = self.snapshots.get(key)
+        if snapshot is not None:
+            start = time.perf_counter()
+            engine = snapshot.restore(create())
+            self.restores += 1
+            self.saved += max(self.seconds[key] - (time.perf_counter() - start), 0)
+            return engine, copy.deepcopy(snapshot.values)
+
+        start = time.perf_counter()
+        engine = create()
+        values = setup(engine)
+        self.seconds[key] = time.perf_counter() - start
+        self.builds += 1
+        self.spent += self.seconds[key]
+        self.snapshots[key] = EngineSnapshot(engine, values)
+        return engine, values
+
+    def report(self) -> str:
+        return 'engine snapshots: {0} restores, {1} setups, {2:.1f}s of setup saved, {3:.1f}s spent in setups'.format(
+            self.restores, self.builds, self.saved, self.spent)
+
+
+_shared: Optional[SnapshotCache] = None
+
+
+def shared_snapshots() -> Optional[SnapshotCache]:
+    """
+    The snapshots of the test run, their report is printed when the run ends.
+
+    :return: the snapshots, or None if NEP11_ENGINE_SNAPSHOTS is `0`
+    """
+    global _shared
+    if os.environ.get(ENVIRONMENT_VARIABLE, '') == '0':
+        return None
+    if _shared is None:
+        _shared = SnapshotCache()
+        atexit.register(lambda: print('\n' + _shared.report()))
+    return _shared
+
+
+class EngineSnapshotMixin:
+    """
+    Adds `snapshot_engine` to a test class, to build its engines from the shared snapshots.
+    """
+
+    def snapshot_engine(self, name: str, nef_paths: Iterable[str], create: Callable[[], Any],
+                        setup: Callable[[Any], Any]) -> Tuple[Any, Any]:
+        snapshots = shared_snapshots()
+        if snapshots is None:
+            engine = create()
+            return engine, setup(engine)
+        return snapshots.engine(name, list(nef_paths), create, setup)
@@ -0,0 +1,99 @@
+"""
+GAS baselines of the contract benchmark suite.
+
+A baseline is a JSON object mapping each benchmark, named `method[case]`, to the GAS it consumed in datoshi (1e-8
+GAS). The suite in tests/contract/bench_gas_regression.py measures the current figures and compares them with the
+committed baseline, a benchmark regresses when its GAS grew by more than the threshold, in percent.
+
+Usage: python tools/gas_baseline.py <baseline.json> <current.json> [threshold]
+"""
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+DEFAULT_THRESHOLD = 2.0
+
+
+class Regression(NamedTuple):
+    name: str
+    baseline: int
+    current: int
+
+    @property
+    def change(self) -> float:
+        if self.baseline == 0:
+            return float('inf') if self.current > 0 else 0.0
+        return 100 * (self.current - self.baseline) / self.baseline
+
+
+def load_baseline(path: Path) -> Dict[str, int]:
+    """
+    :return: the figures of the baseline, empty if there is no baseline yet
+    """
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_baseline(path: Path, figures: Dict[str, int]):
+    path.write_text(json.dumps(figures, indent=2, sort_keys=True) + '\n')
+
+
+def compare(baseline: Dict[str, int], figures: Dict[str, int], threshold: float) -> List[Regression]:
+    """
+    Find the benchmarks that got more expensive than the baseline allows.
+
+    Benchmarks missing from either side are not regressions, they show up in the report instead.
+
+    :param baseline: the committed figures
+    :param figures: the current figures
+    :param threshold: the allowed growth, in percent
+    :return: the regressions, by benchmark name
+    """
+    regressions = []
+    for name in sorted(figures.keys() & baseline.keys()):
+        regression = Regression(name, baseline[name], figures[name])
+        if regression.change > threshold:
+            regressions.append(regression)
+    return regressions
+
+
+def format_report(baseline: Dict[str, int], figures: Dict[str, int]) -> str:
+    lines = ['{0:<40}{1:>16}{2:>16}{3:>10}'.format('benchmark', 'baseline', 'current', 'change')]
+    for name in sorted(figures.keys() | baseline.keys()):
+        before, after = baseline.get(name), figures.get(name)
+        if before is None:
+            change = 'new'
+        elif after is None:
+            change = 'removed'
+        elif before == 0:
+            change = '-'
+        else:
+            change = '{0:+.2f}%'.format(100 * (after - before) / before)
+        lines.append('{0:<40}{1:>16}{2:>16}{3:>10}'.format(name, format_gas(before), format_gas(after), change))
+    return '\n'.join(lines)
+
+
+def format_gas(datoshi) -> str:
+    return '' if datoshi is None else '{0:.8f}'.format(datoshi / 10 ** 8)
+
+
+def main(args: List[str]) -> int:
+    if not 2 <= len(args) <= 3:
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        return 2
+
+    baseline = load_baseline(Path(args[0]))
+    figures = load_baseline(Path(args[1]))
+    threshold = float(args[2]) if len(args) > 2 else DEFAULT_THRESHOLD
+    print(format_report(baseline, figures))
+
+    regressions = compare(baseline, figures, threshold)
+    for regression in regressions:
+        print('{0} regressed by {1:.2f}%'.format(regression.name, regression.change), file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,867 @@
+"""
+Stand-in for a neo-express node, to load test the client and the RPC tooling without a chain.
+
+It answers the RPC methods used by client/Program.cs and the tools: `invokefunction`, `invokescript`,
+`calculatenetworkfee`, `sendrawtransaction`, `getrawtransaction`, `gettransactionheight`, `getapplicationlog`,
+`getblockcount`, `getblockhash`, `getblock` (verbose only) and `getversion`.
+
+The contract is an in-memory model of contracts/ascii-nft.py: mint, mintBatch, transfer, burn, the owner, balance
+and properties reads and their batch versions, and the image chunks. Every response is deterministic: transactions
+are not verified, each accepted transaction is persisted right away in a block of its own, the block times advance
+by `MILLISECONDS_PER_BLOCK` from a fixed genesis time and the GAS figures come from a fixed table, or from a GAS
+baseline of the benchmark suite with `--gas-baseline`.
+
+Usage: python tools/mock_rpc.py [--port 50012] [--contract HASH] [--latency SECONDS] [--gas-baseline FILE]
+"""
+import argparse
+import base64
+import hashlib
+import json
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+from art import packing
+
+DEFAULT_PORT = 50012
+# the contract hash client/Program.cs calls by default
+DEFAULT_CONTRACT = '0xbb6e85b760664e6df28532417b3dbf1d33c02418'
+
+# client/config.json
+NETWORK = 891484520
+ADDRESS_VERSION = 0x35
+MILLISECONDS_PER_BLOCK = 15000
+MAX_VALID_UNTIL_BLOCK_INCREMENT = 5760
+GENESIS_TIME = 1468595301000
+
+FEE_PER_BYTE = 1000
+# GAS of verifying a single signature witness, in datoshi
+VERIFICATION_FEE = 1000000
+DEFAULT_GAS = 1000000
+GAS_TABLE = {
+    'mint': 20000000,
+    'mintBatch': 200000000,
+    'transfer': 5000000,
+    'transferBatch': 50000000,
+    'burn': 5000000,
+    'properties': 3000000,
+    'propertiesBatch': 30000000,
+}
+
+# must match the limits of contracts/ascii-nft.py
+MAX_BATCH_READ_SIZE = 500
+MAX_PROPERTIES_BATCH_SIZE = 100
+TOKEN_ID_SIZE = 4
+IMAGE_CHUNK_SIZE = 4096
+
+SYSCALL_CONTRACT_CALL = hashlib.sha256(b'System.Contract.Call').digest()[:4]
+CALL_FLAGS_ALL = 15
+
+WITNESS_SCOPES = ((0x01, 'CalledByEntry'), (0x10, 'CustomContracts'), (0x20, 'CustomGroups'),
+                  (0x40, 'WitnessRules'), (0x80, 'Global'))
+
+# json-rpc error codes of the neo nodes
+INVALID_PARAMS = -32602
+METHOD_NOT_FOUND = -32601
+UNKNOWN_ITEM = -100
+ALREADY_EXISTS = -501
+EXPIRED = -504
+
+
+class RpcFault(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class ContractFault(Exception):
+    pass
+
+
+# -------------------------------------------
+# Encoding
+# -------------------------------------------
+
+def to_uint160(value: bytes) -> str:
+    return '0x' + value[::-1].hex()
+
+
+def from_uint160(value: str) -> bytes:
+    value = value[2:] if value.startswith('0x') else value
+    return bytes.fromhex(value)[::-1]
+
+
+def to_address(script_hash: bytes) -> str:
+    data = bytes([ADDRESS_VERSION]) + script_hash
+    data += hashlib.sha256(hashlib.sha256(data).digest()).digest()[:4]
+    alphabet = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+    number = int.from_bytes(data, 'big')
+    encoded = ''
+    while number > 0:
+        number, digit = divmod(number, 58)
+        encoded = alphabet[digit] + encoded
+    return '1' * (len(data) - len(data.lstrip(b'\x00'))) + encoded
+
+
+def to_stack_item(value: Any) -> Dict[str, Any]:
+    if value is None:
+        return {'type': 'Any'}
+    if isinstance(value, bool):
+        return {'type': 'Boolean', 'value': value}
+    if isinstance(value, int):
+        return {'type': 'Integer', 'value': str(value)}
+    if isinstance(value, str):
+        value = value.encode()
+    if isinstance(value, bytes):
+        return {'type': 'ByteString', 'value': base64.b64encode(value).decode()}
+    if isinstance(value, dict):
+        return {'type': 'Map', 'value': [{'key': to_stack_item(key), 'value': to_stack_item(item)}
+                                         for key, item in value.items()]}
+    return {'type': 'Array', 'value': [to_stack_item(item) for item in value]}
+
+
+def from_contract_parameter(param: Dict[str, Any]) -> Any:
+    kind = param['type']
+    value = param.get('value')
+    if kind == 'Any' or value is None:
+        return None
+    if kind == 'ByteArray':
+        return base64.b64decode(value)
+    if kind == 'String':
+        return value.encode()
+    if kind == 'Integer':
+        return int(value)
+    if kind == 'Boolean':
+        return value if isinstance(value, bool) else value.lower() == 'true'
+    if kind == 'Hash160':
+        return from_uint160(value)
+    if kind in ('Hash256', 'PublicKey', 'Signature'):
+        return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    if kind == 'Array':
+        return [from_contract_parameter(item) for item in value]
+    raise RpcFault(INVALID_PARAMS, 'unsupported parameter type {0}'.format(kind))
+
+
+# -------------------------------------------
+# Transactions and scripts
+# -------------------------------------------
+
+class Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+
+    def read(self, size: int) -> bytes:
+        if self.position + size > len(self.data):
+            raise ValueError('unexpected end of data')
+        chunk = self.data[self.position:self.position + size]
+        self.position += size
+        return chunk
+
+    def read_int(self, size: int, signed: bool = False) -> int:
+        return int.from_bytes(self.read(size), 'little', signed=signed)
+
+    def read_var_int(self) -> int:
+        prefix = self.read_int(1)
+        if prefix == 0xfd:
+            return self.read_int(2)
+        if prefix == 0xfe:
+            return self.read_int(4)
+        if prefix == 0xff:
+            return self.read_int(8)
+        return prefix
+
+    def read_var_bytes(self) -> bytes:
+        return self.read(self.read_var_int())
+
+
+def var_int(value: int) -> bytes:
+    if value < 0xfd:
+        return bytes([value])
+    if value <= 0xffff:
+        return b'\xfd' + value.to_bytes(2, 'little')
+    return b'\xfe' + value.to_bytes(4, 'little')
+
+
+def var_bytes(value: bytes) -> bytes:
+    return var_int(len(value)) + value
+
+
+class Transaction(NamedTuple):
+    hash: str
+    raw: bytes
+    version: int
+    nonce: int
+    sysfee: int
+    netfee: int
+    valid_until_block: int
+    signers: List[Dict[str, Any]]
+    attributes: List[Dict[str, Any]]
+    script: bytes
+    witnesses: List[Tuple[bytes, bytes]]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'hash': self.hash,
+            'size': len(self.raw),
+            'version': self.version,
+            'nonce': self.nonce,
+            'sender': to_address(from_uint160(self.signers[0]['account'])) if self.signers else None,
+            'sysfee': str(self.sysfee),
+            'netfee': str(self.netfee),
+            'validuntilblock': self.valid_until_block,
+            'signers': self.signers,
+            'attributes': self.attributes,
+            'script': base64.b64encode(self.script).decode(),
+            'witnesses': [{'invocation': base64.b64encode(invocation).decode(),
+                           'verification': base64.b64encode(verification).decode()}
+                          for invocation, verification in self.witnesses],
+        }
+
+
+def parse_transaction(raw: bytes) -> Transaction:
+    """
+    Decode a serialized Neo N3 transaction.
+
+    Witness rules and the attributes added after Neo 3.2 are not supported.
+
+    :raise ValueError: raised if the transaction is malformed or uses an unsupported feature.
+    """
+    reader = Reader(raw)
+    version = reader.read_int(1)
+    nonce = reader.read_int(4)
+    sysfee = reader.read_int(8, signed=True)
+    netfee = reader.read_int(8, signed=True)
+    valid_until_block = reader.read_int(4)
+
+    signers = []
+    for _ in range(reader.read_var_int()):
+        signer: Dict[str, Any] = {'account': to_uint160(reader.read(20))}
+        scopes = reader.read_int(1)
+        names = [name for flag, name in WITNESS_SCOPES if scopes & flag]
+        signer['scopes'] = ', '.join(names) if names else 'None'
+        if scopes & 0x10:
+            signer['allowedcontracts'] = [to_uint160(reader.read(20)) for _ in range(reader.read_var_int())]
+        if scopes & 0x20:
+            signer['allowedgroups'] = [reader.read(33).hex() for _ in range(reader.read_var_int())]
+        if scopes & 0x40:
+            raise ValueError('witness rules are not supported')
+        signers.append(signer)
+
+    attributes = []
+    for _ in range(reader.read_var_int()):
+        kind = reader.read_int(1)
+        if kind == 0x01:
+            attributes.append({'type': 'HighPriority'})
+        elif kind == 0x11:
+            attributes.append({'type': 'OracleResponse', 'id': reader.read_int(8), 'code': reader.read_int(1),
+                               'result': base64.b64encode(reader.read_var_bytes()).decode()})
+        else:
+            raise ValueError('unsupported attribute 0x{0:02x}'.format(kind))
+
+    script = reader.read_var_bytes()
+    # the hash only covers the unsigned part
+    tx_hash = '0x' + hashlib.sha256(raw[:reader.position]).digest()[::-1].hex()
+    witnesses = [(reader.read_var_bytes(), reader.read_var_bytes()) for _ in range(reader.read_var_int())]
+    if reader.position != len(raw):
+        raise ValueError('trailing data after the transaction')
+    return Transaction(tx_hash, raw, version, nonce, sysfee, netfee, valid_until_block, signers, attributes, script,
+                       witnesses)
+
+
+def build_transaction(script: bytes, signer: bytes, nonce: int, valid_until_block: int, sysfee: int = 0,
+                      netfee: int = 0) -> bytes:
+    """
+    Serialize a transaction with a single CalledByEntry signer and an empty witness, enough for the mock node.
+    """
+    data = b'\x00' + struct.pack('<Iqq', nonce, sysfee, netfee) + valid_until_block.to_bytes(4, 'little')
+    data += var_int(1) + signer + b'\x01' + var_int(0) + var_bytes(script)
+    return data + var_int(1) + var_bytes(b'') + var_bytes(b'')
+
+
+def emit_push(value: Any) -> bytes:
+    if value is None:
+        return b'\x0b'
+    if isinstance(value, bool):
+        return b'\x11' if value else b'\x10'
+    if isinstance(value, int):
+        if -1 <= value <= 16:
+            return bytes([0x10 + value])
+        for opcode, size in enumerate((1, 2, 4, 8, 16, 32)):
+            if -(1 << (8 * size - 1)) <= value < (1 << (8 * size - 1)):
+                return bytes([opcode]) + value.to_bytes(size, 'little', signed=True)
+        raise ValueError('integer out of range')
+    if isinstance(value, str):
+        value = value.encode()
+    if isinstance(value, bytes):
+        if len(value) < 0x100:
+            return b'\x0c' + bytes([len(value)]) + value
+        if len(value) < 0x10000:
+            return b'\x0d' + len(value).to_bytes(2, 'little') + value
+        return b'\x0e' + len(value).to_bytes(4, 'little') + value
+    if isinstance(value, list):
+        if len(value) == 0:
+            return b'\xc2'
+        return b''.join(emit_push(item) for item in reversed(value)) + emit_push(len(value)) + b'\xc0'
+    raise ValueError('unsupported value {0!r}'.format(value))
+
+
+def emit_contract_call(contract: str, method: str, args: List[Any]) -> bytes:
+    """
+    Build the script of a contract call, as ScriptBuilder.EmitDynamicCall does.
+    """
+    return (emit_push(args) + emit_push(CALL_FLAGS_ALL) + emit_push(method) + emit_push(from_uint160(contract))
+            + b'\x41' + SYSCALL_CONTRACT_CALL)
+
+
+def decode_contract_calls(script: bytes) -> List[Tuple[str, str, List[Any]]]:
+    """
+    Find the contract calls of a script made of pushes, PACK, DROP and System.Contract.Call syscalls.
+
+    :return: the contract, method and arguments of each call, in script order
+    :raise ValueError: raised if the script uses any other instruction.
+    """
+    reader = Reader(script)
+    stack: List[Any] = []
+    calls = []
+    while reader.position < len(script):
+        opcode = reader.read_int(1)
+        if opcode <= 0x05:
+            stack.append(reader.read_int(1 << opcode, signed=True))
+        elif opcode == 0x08:
+            stack.append(True)
+        elif opcode == 0x09:
+            stack.append(False)
+        elif opcode == 0x0b:
+            stack.append(None)
+        elif 0x0c <= opcode <= 0x0e:
+            stack.append(reader.read(reader.read_int(1 << (opcode - 0x0c))))
+        elif 0x0f <= opcode <= 0x20:
+            stack.append(opcode - 0x10)
+        elif opcode == 0x45:
+            stack.pop()
+        elif opcode == 0xc0:
+            count = stack.pop()
+            stack.append([stack.pop() for _ in range(count)])
+        elif opcode == 0xc2:
+            stack.append([])
+        elif opcode == 0x41:
+            if reader.read(4) != SYSCALL_CONTRACT_CALL:
+                raise ValueError('unsupported syscall')
+            contract, method, flags, args = stack.pop(), stack.pop(), stack.pop(), stack.pop()
+            calls.append((to_uint160(contract), method.decode(), args))
+            # the result of the call, unknown until it runs
+            stack.append(None)
+        else:
+            raise ValueError('unsupported instruction 0x{0:02x}'.format(opcode))
+    return calls
+
+
+# -------------------------------------------
+# Contract model
+# -------------------------------------------
+
+class Token(NamedTuple):
+    owner: bytes
+    meta: Dict[bytes, Any]
+    locked: bytes
+    royalties: bytes
+    image: Optional[bytes]
+    unlocks: int = 0
+
+
+class Execution(NamedTuple):
+    state: str
+    exception: Optional[str]
+    gas: int
+    stack: List[Any]
+    notifications: List[Tuple[str, List[Any]]]
+
+
+class NftModel:
+    """
+    The storage and the methods of the NFT contract, enough to answer the client like the contract would.
+
+    :param gas_table: the GAS of each method, in datoshi, DEFAULT_GAS for the others
+    """
+
+    def __init__(self, gas_table: Optional[Dict[str, int]] = None):
+        self.tokens: Dict[bytes, Token] = {}
+        self.balances: Dict[bytes, int] = {}
+        self.token_count = 0
+        self.gas_table = GAS_TABLE if gas_table is None else gas_table
+        # the previous value of every token changed by the running script
+        self.journal: List[Tuple[bytes, Optional[Token]]] = []
+
+    def execute(self, calls: List[Tuple[str, str, List[Any]]], contract: str, witnesses: List[bytes],
+                block: int, now: int, persist: bool) -> Execution:
+        """
+        Run the calls of a script, the changes are only kept if `persist` is set and no call faults.
+        """
+        self.journal = []
+        token_count = self.token_count
+        notifications: List[Tuple[str, List[Any]]] = []
+        stack: List[Any] = []
+        gas = 0
+        try:
+            for called, method, args in calls:
+                gas += self.gas_table.get(method, DEFAULT_GAS)
+                if called != contract:
+                    raise ContractFault('called contract {0} not found'.format(called))
+                handler = getattr(self, 'method_' + method, None)
+                if handler is None:
+                    raise ContractFault("method '{0}' not found".format(method))
+                stack = [handler(*args, witnesses=witnesses, block=block, now=now, notify=notifications.append)]
+        except (ContractFault, TypeError) as error:
+            self.rollback(token_count)
+            return Execution('FAULT', str(error), gas, [], [])
+        if not persist:
+            self.rollback(token_count)
+        return Execution('HALT', None, gas, stack, notifications)
+
+    def rollback(self, token_count: int):
+        for token_id, previous in reversed(self.journal):
+            self.set_token(token_id, previous, journal=False)
+        self.journal = []
+        self.token_count = token_count
+
+    def set_token(self, token_id: bytes, token: Optional[Token], journal: bool = True):
+        previous = self.tokens.get(token_id)
+        if journal:
+            self.journal.append((token_id, previous))
+        if previous is not None:
+            self.balances[previous.owner] -= 1
+            del self.tokens[token_id]
+        if token is not None:
+            self.balances[token.owner] = self.balances.get(token.owner, 0) + 1
+            self.tokens[token_id] = token
+
+    def owned(self, token_id: bytes, witnesses: List[bytes]) -> Token:
+        token = self.tokens.get(token_id)
+        if token is None:
+            raise ContractFault('unknown token')
+        if token.owner not in witnesses:
+            raise ContractFault('Invalid witness')
+        return token
+
+    def mint_token(self, account: bytes, meta: bytes, locked: bytes, royalties: bytes, image: Optional[bytes],
+                   notify: Callable) -> bytes:
+        if len(meta) == 0:
+            raise ContractFault('`meta` can not be empty')
+        try:
+            meta_object = json.loads(meta)
+        except ValueError:
+            raise ContractFault('invalid json')
+        if not isinstance(meta_object, dict):
+            raise ContractFault('`meta` must be a json object')
+        if image is not None and packing.is_packed(image):
+            try:
+                packing.unpack(image)
+            except ValueError:
+                raise ContractFault('Invalid packed image')
+        self.token_count += 1
+        token_id = self.token_count.to_bytes(TOKEN_ID_SIZE, 'big')
+        meta_items = {key.encode(): value.encode() if isinstance(value, str) else value
+                      for key, value in meta_object.items()}
+        self.set_token(token_id, Token(account, meta_items, locked, royalties, image))
+        notify(('Transfer', [None, account, 1, token_id]))
+        return token_id
+
+    def token_properties(self, token_id: bytes, block: int, now: int) -> Dict[bytes, Any]:
+        token = self.tokens[token_id]
+        image = token.image if token.image is not None else b''
+        properties = dict(token.meta)
+        head = image[:IMAGE_CHUNK_SIZE]
+        if len(image) > len(head):
+            # truncated to the first chunk, the whole image is read with imageChunk
+            properties[b'imageChunks'] = -(-len(image) // IMAGE_CHUNK_SIZE)
+        if packing.is_packed(head):
+            properties[b'ascii'] = packing.unpack(head, truncated=len(image) > len(head)).encode()
+        else:
+            properties[b'ascii'] = head
+        properties[b'block'] = str(block).encode()
+        properties[b'time'] = str(now).encode()
+        return properties
+
+    # the public methods of the contract, with the arguments of the call
+
+    def method_symbol(self, **context) -> bytes:
+        return b'ASCII'
+
+    def method_decimals(self, **context) -> int:
+        return 0
+
+    def method_totalSupply(self, **context) -> int:
+        return len(self.tokens)
+
+    def method_balanceOf(self, owner: bytes, **context) -> int:
+        return self.balances.get(owner, 0)
+
+    def method_balanceOfBatch(self, owners: List[bytes], **context) -> List[int]:
+        if len(owners) > MAX_BATCH_READ_SIZE:
+            raise ContractFault('Too many `owners`')
+        return [self.method_balanceOf(owner) for owner in owners]
+
+    def method_ownerOf(self, token_id: bytes, **context) -> bytes:
+        if token_id not in self.tokens:
+            raise ContractFault('unknown token')
+        return self.tokens[token_id].owner
+
+    def method_ownerOfBatch(self, token_ids: List[bytes], **context) -> List[Optional[bytes]]:
+        if len(token_ids) > MAX_BATCH_READ_SIZE:
+            raise ContractFault('Too many `tokenIds`')
+        return [self.tokens[token_id].owner if token_id in self.tokens else None for token_id in token_ids]
+
+    def method_properties(self, token_id: bytes, block: int, now: int, **context) -> Dict[bytes, Any]:
+        if token_id not in self.tokens:
+            raise ContractFault('No metadata available for token')
+        return self.token_properties(token_id, block, now)
+
+    def method_propertiesBatch(self, token_ids: List[bytes], block: int, now: int, **context) -> List[Any]:
+        if len(token_ids) > MAX_PROPERTIES_BATCH_SIZE:
+            raise ContractFault('Too many `tokenIds`')
+        return [self.token_properties(token_id, block, now) if token_id in self.tokens else None
+                for token_id in token_ids]
+
+    def method_imageInfo(self, token_id: bytes, **context) -> List[int]:
+        token = self.tokens.get(token_id)
+        size = len(token.image) if token is not None and token.image is not None else 0
+        return [size, -(-size // IMAGE_CHUNK_SIZE)]
+
+    def method_imageChunk(self, token_id: bytes, index: int, **context) -> bytes:
+        size, chunks = self.method_imageInfo(token_id)
+        if not 0 <= index < chunks:
+            raise ContractFault('Invalid chunk index')
+        return self.tokens[token_id].image[index * IMAGE_CHUNK_SIZE:(index + 1) * IMAGE_CHUNK_SIZE]
+
+    def method_mint(self, account: bytes, meta: bytes, locked: bytes, royalties: bytes, image: Optional[bytes],
+                    witnesses: List[bytes], notify: Callable, **context) -> bytes:
+        if account not in witnesses:
+            raise ContractFault('Invalid witness')
+        return self.mint_token(account, meta, locked, royalties, image, notify)
+
+    def method_mintBatch(self, account: bytes, metas: List[bytes], locked: List[bytes], royalties: List[bytes],
+                         images: List[Optional[bytes]], witnesses: List[bytes], notify: Callable,
+                         **context) -> List[bytes]:
+        if account not in witnesses:
+            raise ContractFault('Invalid witness')
+        if not len(metas) == len(locked) == len(royalties) == len(images):
+            raise ContractFault('lists lengths differ')
+        return [self.mint_token(account, *token, notify=notify) for token in zip(metas, locked, royalties, images)]
+
+    def method_transfer(self, to: bytes, token_id: bytes, data: Any, witnesses: List[bytes], notify: Callable,
+                        **context) -> bool:
+        token = self.owned(token_id, witnesses)
+        self.set_token(token_id, token._replace(owner=to))
+        notify(('Transfer', [token.owner, to, 1, token_id]))
+        return True
+
+    def method_burn(self, token_id: bytes, witnesses: List[bytes], notify: Callable, **context) -> bool:
+        token = self.owned(token_id, witnesses)
+        self.set_token(token_id, None)
+        notify(('Transfer', [token.owner, None, 1, token_id]))
+        return True
+
+    def method_getLockedContent(self, token_id: bytes, witnesses: List[bytes], notify: Callable,
+                                **context) -> bytes:
+        token = self.owned(token_id, witnesses)
+        self.set_token(token_id, token._replace(unlocks=token.unlocks + 1))
+        notify(('UnlockIncremented', [token_id, token.unlocks + 1]))
+        return token.locked
+
+
+# -------------------------------------------
+# Node
+# -------------------------------------------
+
+class Block(NamedTuple):
+    index: int
+    hash: str
+    time: int
+    transactions: List[Transaction]
+
+
+class MockNode:
+    """
+    The chain of the mock node and its RPC methods, thread safe.
+
+    :param contract: the script hash of the modelled contract, 0x prefixed
+    :param model: the contract model, a fresh NftModel by default
+    """
+
+    def __init__(self, contract: str = DEFAULT_CONTRACT, model: Optional[NftModel] = None):
+        self.contract = contract.lower()
+        self.model = model if model is not None else NftModel()
+        self.blocks: List[Block] = []
+        self.transactions: Dict[str, Tuple[Transaction, int]] = {}
+        self.logs: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.add_block([])
+
+    def add_block(self, transactions: List[Transaction]) -> Block:
+        index = len(self.blocks)
+        previous = self.blocks[-1].hash if self.blocks else '0x' + '00' * 32
+        block_hash = '0x' + hashlib.sha256(previous.encode() + index.to_bytes(4, 'little')).hexdigest()
+        block = Block(index, block_hash, GENESIS_TIME + index * MILLISECONDS_PER_BLOCK, transactions)
+        self.blocks.append(block)
+        for transaction in transactions:
+            self.transactions[transaction.hash] = (transaction, index)
+        return block
+
+    def handle(self, method: str, params: List[Any]) -> Any:
+        handler = getattr(self, 'rpc_' + method, None)
+        if handler is None:
+            raise RpcFault(METHOD_NOT_FOUND, 'Method not found')
+        with self.lock:
+            try:
+                return handler(*params)
+            except (TypeError, ValueError, IndexError, KeyError) as error:
+                raise RpcFault(INVALID_PARAMS, 'Invalid params: {0}'.format(error))
+
+    def run(self, script: bytes, witnesses: List[bytes], persist: bool) -> Execution:
+        try:
+            calls = decode_contract_calls(script)
+        except (ValueError, IndexError) as error:
+            return Execution('FAULT', str(error), 0, [], [])
+        # the script runs in the next block, the ledger height is still the last block
+        index = len(self.blocks)
+        return self.model.execute(calls, self.contract, witnesses, index - 1,
+                                  GENESIS_TIME + index * MILLISECONDS_PER_BLOCK, persist)
+
+    def invoke_result(self, script: bytes, execution: Execution) -> Dict[str, Any]:
+        return {
+            'script': base64.b64encode(script).decode(),
+            'state': execution.state,
+            'gasconsumed': str(execution.gas),
+            'exception': execution.exception,
+            'stack': [to_stack_item(item) for item in execution.stack],
+            'notifications': self.notifications(execution),
+        }
+
+    def notifications(self, execution: Execution) -> List[Dict[str, Any]]:
+        return [{'contract': self.contract, 'eventname': name, 'state': to_stack_item(args)}
+                for name, args in execution.notifications]
+
+    def lookup(self, tx_hash: str) -> Tuple[Transaction, int]:
+        if tx_hash.lower() not in self.transactions:
+            raise RpcFault(UNKNOWN_ITEM, 'Unknown transaction')
+        return self.transactions[tx_hash.lower()]
+
+    def block_at(self, index_or_hash: Any) -> Block:
+        if isinstance(index_or_hash, int):
+            if not 0 <= index_or_hash < len(self.blocks):
+                raise RpcFault(UNKNOWN_ITEM, 'Unknown block')
+            return self.blocks[index_or_hash]
+        for block in self.blocks:
+            if block.hash == index_or_hash.lower():
+                return block
+        raise RpcFault(UNKNOWN_ITEM, 'Unknown block')
+
+    # the RPC methods, with the parameters of the request
+
+    def rpc_getversion(self) -> Dict[str, Any]:
+        return {
+            'tcpport': 0,
+            'wsport': 0,
+            'nonce': 0,
+            'useragent': '/mock_rpc/',
+            'protocol': {
+                'network': NETWORK,
+                'addressversion': ADDRESS_VERSION,
+                'msperblock': MILLISECONDS_PER_BLOCK,
+                'maxvaliduntilblockincrement': MAX_VALID_UNTIL_BLOCK_INCREMENT,
+                'maxtraceableblocks': 2102400,
+                'maxtransactionsperblock': 512,
+                'memorypoolmaxtransactions': 50000,
+                'initialgasdistribution': 5200000000000000,
+                'validatorscount': 1,
+            },
+        }
+
+    def rpc_getblockcount(self) -> int:
+        return len(self.blocks)
+
+    def rpc_getblockhash(self, index: int) -> str:
+        return self.block_at(index).hash
+
+    def rpc_getblock(self, index_or_hash: Any, verbose: Any = False) -> Dict[str, Any]:
+        if not verbose:
+            raise RpcFault(INVALID_PARAMS, 'only verbose blocks are supported')
+        block = self.block_at(index_or_hash)
+        result = {
+            'hash': block.hash,
+            'size': sum(len(transaction.raw) for transaction in block.transactions),
+            'version': 0,
+            'previousblockhash': self.blocks[block.index - 1].hash if block.index > 0 else '0x' + '00' * 32,
+            'merkleroot': '0x' + '00' * 32,
+            'time': block.time,
+            'nonce': '0000000000000000',
+            'index': block.index,
+            'primary': 0,
+            'nextconsensus': to_address(bytes(20)),
+            'witnesses': [],
+            'tx': [transaction.to_json() for transaction in block.transactions],
+            'confirmations': len(self.blocks) - block.index,
+        }
+        if block.index + 1 < len(self.blocks):
+            result['nextblockhash'] = self.blocks[block.index + 1].hash
+        return result
+
+    def rpc_getrawtransaction(self, tx_hash: str, verbose: Any = False) -> Any:
+        transaction, index = self.lookup(tx_hash)
+        if not verbose:
+            return base64.b64encode(transaction.raw).decode()
+        result = transaction.to_json()
+        result['blockhash'] = self.blocks[index].hash
+        result['confirmations'] = len(self.blocks) - index
+        result['blocktime'] = self.blocks[index].time
+        result['vmstate'] = self.logs[transaction.hash]['executions'][0]['vmstate']
+        return result
+
+    def rpc_gettransactionheight(self, tx_hash: str) -> int:
+        return self.lookup(tx_hash)[1]
+
+    def rpc_getapplicationlog(self, tx_hash: str, trigger: Optional[str] = None) -> Dict[str, Any]:
+        self.lookup(tx_hash)
+        return self.logs[tx_hash.lower()]
+
+    def rpc_invokefunction(self, contract: str, method: str, params: Optional[List[Any]] = None,
+                           signers: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        args = [from_contract_parameter(param) for param in params or []]
+        script = emit_contract_call(contract, method, args)
+        return self.invoke_result(script, self.run(script, self.witnesses(signers), False))
+
+    def rpc_invokescript(self, script: str, signers: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        raw = base64.b64decode(script)
+        return self.invoke_result(raw, self.run(raw, self.witnesses(signers), False))
+
+    def rpc_calculatenetworkfee(self, tx: str) -> Dict[str, str]:
+        transaction = parse_transaction(base64.b64decode(tx))
+        fee = len(transaction.raw) * FEE_PER_BYTE + len(transaction.signers) * VERIFICATION_FEE
+        return {'networkfee': str(fee)}
+
+    def rpc_sendrawtransaction(self, tx: str) -> Dict[str, str]:
+        transaction = parse_transaction(base64.b64decode(tx))
+        if transaction.hash in self.transactions:
+            raise RpcFault(ALREADY_EXISTS, 'AlreadyExists')
+        if transaction.valid_until_block < len(self.blocks):
+            raise RpcFault(EXPIRED, 'Expired')
+        witnesses = [from_uint160(signer['account']) for signer in transaction.signers]
+        execution = self.run(transaction.script, witnesses, True)
+        self.logs[transaction.hash] = {
+            'txid': transaction.hash,
+            'executions': [{
+                'trigger': 'Application',
+                'vmstate': execution.state,
+                'exception': execution.exception,
+                'gasconsumed': str(execution.gas),
+                'stack': [to_stack_item(item) for item in execution.stack],
+                'notifications': self.notifications(execution),
+            }],
+        }
+        self.add_block([transaction])
+        return {'hash': transaction.hash}
+
+    def witnesses(self, signers: Optional[List[Dict[str, Any]]]) -> List[bytes]:
+        return [from_uint160(signer['account']) for signer in signers or []]
+
+
+# -------------------------------------------
+# Server
+# -------------------------------------------
+
+class RpcHandler(BaseHTTPRequestHandler):
+    node: MockNode
+    latency: float = 0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.latency > 0:
+            time.sleep(self.latency)
+        try:
+            request = json.loads(body)
+        except ValueError:
+            self.reply({'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': 'Parse error'}})
+            return
+        if isinstance(request, list):
+            self.reply([self.answer(item) for item in request])
+        else:
+            self.reply(self.answer(request))
+
+    def answer(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        response: Dict[str, Any] = {'jsonrpc': '2.0', 'id': request.get('id')}
+        try:
+            response['result'] = self.node.handle(request.get('method', ''), request.get('params', []))
+        except RpcFault as fault:
+            response['error'] = {'code': fault.code, 'message': str(fault)}
+        return response
+
+    def reply(self, response: Any):
+        data = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any):
+        pass
+
+
+class MockServer(ThreadingHTTPServer):
+    # the default backlog of 5 refuses connections under load
+    request_queue_size = 1024
+
+
+def make_server(node: MockNode, port: int = DEFAULT_PORT, latency: float = 0,
+                host: str = 'localhost') -> MockServer:
+    """
+    Create the HTTP server of a mock node, port 0 picks a free port.
+
+    :param latency: the seconds added to every request, to simulate a remote node
+    """
+    handler = type('NodeRpcHandler', (RpcHandler,), {'node': node, 'latency': latency})
+    server = MockServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def load_gas_table(path: Path) -> Dict[str, int]:
+    """
+    Read the GAS of each method from a baseline of tests/contract/bench_gas_regression.py, the highest case of a
+    method is kept.
+    """
+    table = dict(GAS_TABLE)
+    for name, gas in json.loads(path.read_text()).items():
+        method = name.split('[')[0]
+        table[method] = max(gas, table.get(method, 0)) if '[' in name else gas
+    return table
+
+
+def main(args: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--contract', default=DEFAULT_CONTRACT, help='script hash of the modelled contract')
+    parser.add_argument('--latency', type=float, default=0, help='seconds added to every request')
+    parser.add_argument('--gas-baseline', type=Path, help='GAS figures of the methods, see tools/gas_baseline.py')
+    options = parser.parse_args(args)
+
+    gas_table = load_gas_table(options.gas_baseline) if options.gas_baseline is not None else None
+    server = make_server(MockNode(options.contract, NftModel(gas_table)), options.port, options.latency)
+    print('mock node of {0} on http://localhost:{1}'.format(options.contract, server.server_address[1]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
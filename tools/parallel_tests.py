@@ -0,0 +1,238 @@
+"""
+Runs the contract tests on a pool of processes, each test on the first free worker.
+
+`python -m unittest discover` runs tests/contract one test at a time while most of a test is spent waiting for the
+dotnet TestEngine. The tests are discovered once, then sent one by one to the workers, the longest first when a
+previous run recorded their durations. Every worker runs in its own working directory, where the TestEngine writes
+its argument files and the tests their scratch files, with links to the directories of the suite (test_native) so
+the auxiliary contracts resolve as from tests/contract. The compiled contracts are shared through the compile cache,
+which replaces the artifacts atomically.
+
+The results are aggregated with the TestEngine invocations of each test: the invoked method, the GAS it consumed and
+its notifications. The report ends with the GAS by method and the speedup over the summed test durations.
+
+Usage: python tools/parallel_tests.py [--workers N] [--json report.json] [--durations FILE] [pattern ...]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import traceback
+import unittest
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_DIRECTORY = Path(__file__).parents[1] / 'tests' / 'contract'
+DEFAULT_DURATIONS = Path(__file__).parents[1] / '.test_durations.json'
+# the id unittest gives to a module it could not import, followed by the module name
+FAILED_IMPORT = 'unittest.loader._FailedTest.'
+
+# the invocations of the test running in this worker
+_invocations: List[Dict[str, Any]] = []
+
+
+def discover(directory: Path, patterns: List[str]) -> List[str]:
+    """
+    :return: the ids of the tests of the directory, restricted to the ids containing one of the patterns if any,
+        along with the modules that failed to import
+    """
+    suite = unittest.defaultTestLoader.discover(str(directory), top_level_dir=str(directory))
+    ids = [test.id() for test in iterate(suite)]
+    if patterns:
+        ids = [test_id for test_id in ids
+               if test_id.startswith(FAILED_IMPORT) or any(pattern in test_id for pattern in patterns)]
+    return ids
+
+
+def iterate(suite: unittest.TestSuite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iterate(test)
+        else:
+            yield test
+
+
+def record_invocations(engine_class: type):
+    """
+    Wrap the `run` method of the engine class to keep each invocation of the current test.
+    """
+    run = engine_class.run
+
+    def recorded(engine, contract_id, method: str, *arguments, **kwargs):
+        # a reset engine drops the notifications of the previous runs
+        first = 0 if kwargs.get('reset_engine') else len(engine._notifications)
+        try:
+            return run(engine, contract_id, method, *arguments, **kwargs)
+        finally:
+            _invocations.append({
+                'method': method,
+                'state': getattr(engine._vm_state, 'name', str(engine._vm_state)),
+                'gas': getattr(engine, '_gas_consumed', 0),
+                'notifications': [[str(notification.name), repr(notification.arguments)]
+                                  for notification in engine._notifications[first:]],
+            })
+
+    engine_class.run = recorded
+
+
+def start_worker(root: str, directory: str):
+    """
+    Move the worker into its own working directory and record the TestEngine invocations.
+    """
+    workspace = tempfile.mkdtemp(prefix='worker-', dir=root)
+    for entry in Path(directory).iterdir():
+        if entry.is_dir() and not entry.name.startswith(('.', '__')):
+            os.symlink(entry, Path(workspace) / entry.name)
+    os.chdir(workspace)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    try:
+        from boa3_test.tests.test_classes.testengine import TestEngine
+    except ImportError:
+        # plain unittest suites run without the TestEngine
+        return
+    record_invocations(TestEngine)
+
+
+def run_test(test_id: str) -> Dict[str, Any]:
+    """
+    Run one test in the worker.
+
+    :return: the status of the test, its duration, its invocations and, unless it passed, its output and traceback
+    """
+    _invocations.clear()
+    result = unittest.TestResult()
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        # loading the module again gives its import error as the test result
+        name = test_id[len(FAILED_IMPORT):] if test_id.startswith(FAILED_IMPORT) else test_id
+        suite = unittest.defaultTestLoader.loadTestsFromName(name)
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            suite.run(result)
+    except Exception:
+        result.errors.append((None, traceback.format_exc()))
+    seconds = time.perf_counter() - start
+
+    report = {'id': test_id, 'status': 'passed', 'seconds': seconds, 'worker': os.getpid(),
+              'invocations': list(_invocations)}
+    for status, failures in (('skipped', result.skipped), ('failed', result.failures), ('error', result.errors)):
+        if failures:
+            report['status'] = status
+            report['traceback'] = '\n'.join(str(reason) for _, reason in failures)
+    if result.testsRun == 0 and report['status'] == 'passed':
+        report['status'] = 'error'
+        report['traceback'] = 'no test named {0}'.format(test_id)
+    if report['status'] in ('failed', 'error'):
+        report['output'] = output.getvalue()
+    return report
+
+
+def run_parallel(test_ids: List[str], directory: Path, workers: int,
+                 durations: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Run the tests on `workers` processes.
+
+    :param durations: the seconds of each test in a previous run, the longest tests start first
+    :return: the report of each test, by id in the order of `test_ids`, the wall time and the number of workers
+    """
+    durations = durations or {}
+    order = sorted(test_ids, key=lambda test_id: -durations.get(test_id, float('inf')))
+    reports = {}
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='nep11-tests-') as root:
+        with ProcessPoolExecutor(max_workers=workers, initializer=start_worker,
+                                 initargs=(root, str(directory))) as pool:
+            futures = {pool.submit(run_test, test_id): test_id for test_id in order}
+            for future in as_completed(futures):
+                try:
+                    report = future.result()
+                except Exception:
+                    # the worker died, e.g. killed by the OOM killer
+                    report = {'id': futures[future], 'status': 'error', 'seconds': 0.0, 'invocations': [],
+                              'traceback': traceback.format_exc()}
+                reports[report['id']] = report
+    return {'tests': [reports[test_id] for test_id in test_ids], 'seconds': time.perf_counter() - start,
+            'workers': workers}
+
+
+def gas_by_method(run: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """
+    :return: the number of invocations, the total and the highest GAS of each invoked method, in datoshi
+    """
+    methods: Dict[str, Dict[str, int]] = {}
+    for test in run['tests']:
+        for invocation in test['invocations']:
+            figures = methods.setdefault(invocation['method'], {'calls': 0, 'gas': 0, 'max': 0})
+            figures['calls'] += 1
+            figures['gas'] += invocation['gas']
+            figures['max'] = max(figures['max'], invocation['gas'])
+    return methods
+
+
+def format_report(run: Dict[str, Any]) -> str:
+    lines = []
+    for test in run['tests']:
+        if test['status'] in ('failed', 'error'):
+            lines += ['=' * 70, '{0}: {1}'.format(test['status'].upper(), test['id']), '-' * 70,
+                      test.get('output', '').rstrip(), test['traceback'].rstrip(), '']
+
+    lines.append('{0:<30}{1:>8}{2:>18}{3:>18}'.format('method', 'calls', 'GAS', 'max GAS'))
+    for method, figures in sorted(gas_by_method(run).items()):
+        lines.append('{0:<30}{1:>8}{2:>18.8f}{3:>18.8f}'.format(method, figures['calls'], figures['gas'] / 10 ** 8,
+                                                                figures['max'] / 10 ** 8))
+
+    statuses = [test['status'] for test in run['tests']]
+    summed = sum(test['seconds'] for test in run['tests'])
+    lines.append('')
+    lines.append('Ran {0} tests in {1:.1f}s on {2} workers, {3:.1f}s of tests, {4:.1f}x'.format(
+        len(statuses), run['seconds'], run['workers'], summed, summed / run['seconds'] if run['seconds'] else 0))
+    counts = ', '.join('{0} {1}'.format(statuses.count(status), status)
+                       for status in ('passed', 'failed', 'error', 'skipped') if status in statuses)
+    lines.append(counts or 'no tests')
+    return '\n'.join(lines)
+
+
+def load_durations(path: Path) -> Dict[str, float]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(path: Path, run: Dict[str, Any]):
+    durations = load_durations(path)
+    durations.update({test['id']: test['seconds'] for test in run['tests'] if test['status'] == 'passed'})
+    path.write_text(json.dumps(durations, indent=2, sort_keys=True) + '\n')
+
+
+def main(args: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('patterns', nargs='*', help='only run the tests whose id contains one of the patterns')
+    parser.add_argument('--directory', type=Path, default=DEFAULT_DIRECTORY)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--json', type=Path, help='write the full report, with the notifications, to this file')
+    parser.add_argument('--durations', type=Path, default=DEFAULT_DURATIONS,
+                        help='the test durations of the previous runs, to start the longest tests first')
+    options = parser.parse_args(args)
+
+    directory = options.directory.resolve()
+    sys.path.insert(0, str(directory))
+    test_ids = discover(directory, options.patterns)
+    durations = load_durations(options.durations)
+    run = run_parallel(test_ids, directory, max(1, options.workers), durations)
+
+    print(format_report(run))
+    save_durations(options.durations, run)
+    if options.json is not None:
+        options.json.write_text(json.dumps(run, indent=2))
+    return 0 if all(test['status'] in ('passed', 'skipped') for test in run['tests']) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
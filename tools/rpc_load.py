@@ -0,0 +1,160 @@
+"""
+Drives concurrent client flows against a Neo RPC node and reports the throughput and the latency percentiles.
+
+The `query` flow reads the properties of a token, like the client after a mint. The `mint` flow is the client mint:
+`invokescript` for the system fee, `calculatenetworkfee`, `sendrawtransaction`, `getrawtransaction` until the
+transaction is in a block, then `getapplicationlog`. Transactions are built unsigned, so the mint flow only runs
+against tools/mock_rpc.py; `--serve` starts one in process, on a free port, and mints the tokens read by the query
+flow. Against another node, tokens 1 to QUERY_TOKENS must exist.
+
+Usage: python tools/rpc_load.py [--rpc URL | --serve] [--contract HASH] [--flows N] [--concurrency N]
+    [--scenario query|mint]
+"""
+import argparse
+import base64
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import mock_rpc
+from rpc_refresh_bench import DEFAULT_RPC, RpcClient, RpcError
+
+ACCOUNT = bytes(range(20))
+TOKEN_META = b'{"name": "load", "description": "Load test", "image": "ipfs://example_ipfs_hash", "tokenURI": ""}'
+# tokens minted before the query flows
+QUERY_TOKENS = 100
+# getrawtransaction polls before a mint flow gives up
+MAX_POLLS = 100
+
+
+class LoadDriver:
+    """
+    Runs numbered flows against a node, the flow number makes every transaction unique.
+
+    :param client: the RPC client of the node
+    :param contract: the script hash of the NFT contract, 0x prefixed
+    """
+
+    def __init__(self, client: RpcClient, contract: str):
+        self.client = client
+        self.contract = contract
+        self.signers = [{'account': mock_rpc.to_uint160(ACCOUNT), 'scopes': 'CalledByEntry'}]
+
+    def mint(self, number: int) -> bytes:
+        script = mock_rpc.emit_contract_call(self.contract, 'mint',
+                                             [ACCOUNT, TOKEN_META, b'locked', b'', None])
+        encoded = base64.b64encode(script).decode()
+        invoke = self.client.call('invokescript', [encoded, self.signers])
+        if invoke['state'] != 'HALT':
+            raise RpcError('mint: {0}'.format(invoke.get('exception')))
+        valid_until = self.client.call('getblockcount', []) + mock_rpc.MAX_VALID_UNTIL_BLOCK_INCREMENT - 1
+        unsigned = mock_rpc.build_transaction(script, ACCOUNT, number, valid_until, int(invoke['gasconsumed']))
+        fee = self.client.call('calculatenetworkfee', [base64.b64encode(unsigned).decode()])
+        tx = mock_rpc.build_transaction(script, ACCOUNT, number, valid_until, int(invoke['gasconsumed']),
+                                        int(fee['networkfee']))
+        tx_hash = self.client.call('sendrawtransaction', [base64.b64encode(tx).decode()])['hash']
+
+        for _ in range(MAX_POLLS):
+            try:
+                if self.client.call('getrawtransaction', [tx_hash, True]).get('confirmations'):
+                    break
+            except RpcError:
+                pass
+            time.sleep(0.01)
+        else:
+            raise RpcError('{0} not in a block'.format(tx_hash))
+
+        log = self.client.call('getapplicationlog', [tx_hash])
+        execution = log['executions'][0]
+        if execution['vmstate'] != 'HALT':
+            raise RpcError('mint: {0}'.format(execution.get('exception')))
+        return base64.b64decode(execution['stack'][0]['value'])
+
+    def query(self, number: int):
+        token_id = (number % QUERY_TOKENS + 1).to_bytes(mock_rpc.TOKEN_ID_SIZE, 'big')
+        self.client.invoke(self.contract, 'properties', [token_id])
+
+
+def run_flows(flow: Callable[[int], object], flows: int, concurrency: int, first: int = 0) -> Dict[str, float]:
+    """
+    Run `flows` flows on `concurrency` threads.
+
+    :return: the number of flows and errors, the elapsed seconds, the flows per second and the latency percentiles
+        in milliseconds
+    """
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def timed(number: int):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            flow(number)
+        except (RpcError, OSError):
+            with lock:
+                errors += 1
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(first, first + flows)))
+    elapsed = time.perf_counter() - start
+
+    report = {'flows': flows, 'errors': errors, 'seconds': elapsed, 'flows/s': len(latencies) / elapsed}
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100)
+        report.update({'p50 ms': percentiles[49], 'p95 ms': percentiles[94], 'p99 ms': percentiles[98]})
+    return report
+
+
+def format_report(report: Dict[str, float]) -> str:
+    return '\n'.join('{0:<10}{1:>14.2f}'.format(name, value) if isinstance(value, float)
+                     else '{0:<10}{1:>14}'.format(name, value) for name, value in report.items())
+
+
+def main(args: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--rpc', default=DEFAULT_RPC, help='RPC url of the node')
+    target.add_argument('--serve', action='store_true', help='start a mock node in process and load it')
+    parser.add_argument('--contract', default=mock_rpc.DEFAULT_CONTRACT)
+    parser.add_argument('--flows', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--scenario', choices=('query', 'mint'), default='query')
+    options = parser.parse_args(args)
+
+    server: Optional[mock_rpc.MockServer] = None
+    url = options.rpc
+    if options.serve:
+        server = mock_rpc.make_server(mock_rpc.MockNode(options.contract), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = 'http://localhost:{0}'.format(server.server_address[1])
+
+    driver = LoadDriver(RpcClient(url), options.contract)
+    try:
+        if options.scenario == 'query':
+            if server is not None:
+                # the tokens read by the flows, a real node must already have them
+                run_flows(driver.mint, QUERY_TOKENS, 1, first=options.flows)
+            report = run_flows(driver.query, options.flows, options.concurrency)
+        else:
+            report = run_flows(driver.mint, options.flows, options.concurrency)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print('{0} flows, {1} threads, {2}'.format(options.scenario, options.concurrency, url))
+    print(format_report(report))
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,184 @@
+"""
+Measures the wall-clock time of refreshing tokens over RPC, one invocation per read versus the batch read methods.
+
+Refreshing a token reads its owner and its properties, then the balance of every owner found. The unbatched run
+calls ownerOf, properties and balanceOf once per entry, the batched run calls ownerOfBatch, propertiesBatch and
+balanceOfBatch with the largest batches the contract accepts. Both runs use `invokefunction`, nothing is sent to
+the chain.
+
+Start neo-express first (`neoxp run` in chain/) and deploy the contract, tokens 1 to `tokens` must be minted and
+not burned.
+
+Usage: python tools/rpc_refresh_bench.py <contract hash> [tokens] [rpc url]
+"""
+import base64
+import json
+import sys
+import time
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_RPC = 'http://localhost:50012'
+DEFAULT_TOKENS = 1000
+
+# must match MAX_BATCH_READ_SIZE and MAX_PROPERTIES_BATCH_SIZE in contracts/ascii-nft.py
+MAX_BATCH_READ_SIZE = 500
+MAX_PROPERTIES_BATCH_SIZE = 100
+
+TOKEN_ID_SIZE = 4
+
+
+class RpcError(Exception):
+    pass
+
+
+class RpcClient:
+    """
+    Minimal JSON-RPC client of a Neo node.
+
+    :param url: the RPC endpoint of the node
+    :param post: sends a request body to the url and returns the response body, urllib by default
+    """
+
+    def __init__(self, url: str, post: Optional[Callable[[str, bytes], bytes]] = None):
+        self.url = url
+        self.post = post if post is not None else http_post
+        self.calls = 0
+
+    def call(self, method: str, params: List[Any]) -> Any:
+        """
+        Send a JSON-RPC request.
+
+        :return: the result of the request
+        :raise RpcError: raised if the node returns an error.
+        """
+        request = {'jsonrpc': '2.0', 'id': self.calls, 'method': method, 'params': params}
+        self.calls += 1
+        response = json.loads(self.post(self.url, json.dumps(request).encode()))
+        if 'error' in response:
+            raise RpcError('{0}: {1}'.format(method, response['error'].get('message')))
+        return response['result']
+
+    def invoke(self, contract: str, method: str, params: List[Any]) -> Any:
+        """
+        Run a read-only invocation and decode its result.
+
+        :param contract: the contract script hash, 0x prefixed
+        :param method: the contract method
+        :param params: the python arguments, see to_contract_parameter
+        :return: the decoded first item of the result stack
+        :raise RpcError: raised if the node returns an error or if the VM faults.
+        """
+        result = self.call('invokefunction', [contract, method, [to_contract_parameter(param) for param in params]])
+        if result['state'] != 'HALT':
+            raise RpcError('{0}: {1}'.format(method, result.get('exception')))
+        return from_stack_item(result['stack'][0])
+
+
+def http_post(url: str, body: bytes) -> bytes:
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        return response.read()
+
+
+def to_contract_parameter(value: Any) -> Dict[str, Any]:
+    """
+    Encode a python value as an RPC contract parameter.
+
+    Addresses are passed as their 20 raw bytes, the contract doesn't tell them apart from byte strings.
+    """
+    if isinstance(value, bool):
+        return {'type': 'Boolean', 'value': value}
+    if isinstance(value, int):
+        return {'type': 'Integer', 'value': str(value)}
+    if isinstance(value, bytes):
+        return {'type': 'ByteArray', 'value': base64.b64encode(value).decode()}
+    if isinstance(value, str):
+        return {'type': 'String', 'value': value}
+    if isinstance(value, list):
+        return {'type': 'Array', 'value': [to_contract_parameter(item) for item in value]}
+    raise TypeError('unsupported parameter {0!r}'.format(value))
+
+
+def from_stack_item(item: Dict[str, Any]) -> Any:
+    """
+    Decode a stack item of an RPC result.
+
+    :return: bytes for byte strings and buffers, lists for arrays, dicts for maps and None for null
+    """
+    kind = item['type']
+    if kind == 'Any':
+        return None
+    if kind == 'Integer':
+        return int(item['value'])
+    if kind == 'Boolean':
+        return item['value']
+    if kind in ('ByteString', 'Buffer'):
+        return base64.b64decode(item['value'])
+    if kind in ('Array', 'Struct'):
+        return [from_stack_item(value) for value in item['value']]
+    if kind == 'Map':
+        return {from_stack_item(entry['key']): from_stack_item(entry['value']) for entry in item['value']}
+    raise RpcError('unsupported stack item {0}'.format(kind))
+
+
+def token_id(number: int) -> bytes:
+    return number.to_bytes(TOKEN_ID_SIZE, 'big')
+
+
+def chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def refresh_unbatched(client: RpcClient, contract: str, token_ids: List[bytes]) -> Dict[str, Any]:
+    owners = [client.invoke(contract, 'ownerOf', [token]) for token in token_ids]
+    properties = [client.invoke(contract, 'properties', [token]) for token in token_ids]
+    balances = [client.invoke(contract, 'balanceOf', [owner]) for owner in distinct(owners)]
+    return {'owners': owners, 'properties': properties, 'balances': balances}
+
+
+def refresh_batched(client: RpcClient, contract: str, token_ids: List[bytes]) -> Dict[str, Any]:
+    owners = []
+    for chunk in chunks(token_ids, MAX_BATCH_READ_SIZE):
+        owners += client.invoke(contract, 'ownerOfBatch', [chunk])
+    properties = []
+    for chunk in chunks(token_ids, MAX_PROPERTIES_BATCH_SIZE):
+        properties += client.invoke(contract, 'propertiesBatch', [chunk])
+    balances = []
+    for chunk in chunks(distinct(owners), MAX_BATCH_READ_SIZE):
+        balances += client.invoke(contract, 'balanceOfBatch', [chunk])
+    return {'owners': owners, 'properties': properties, 'balances': balances}
+
+
+def distinct(owners: List[Optional[bytes]]) -> List[bytes]:
+    # burned tokens have no owner
+    return list(dict.fromkeys(owner for owner in owners if owner is not None))
+
+
+def main(args: List[str]) -> int:
+    if not 1 <= len(args) <= 3:
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        return 2
+
+    contract = args[0]
+    count = int(args[1]) if len(args) > 1 else DEFAULT_TOKENS
+    client = RpcClient(args[2] if len(args) > 2 else DEFAULT_RPC)
+    token_ids = [token_id(number) for number in range(1, count + 1)]
+
+    results = {}
+    print('{0:>12}{1:>12}{2:>12}'.format('mode', 'calls', 'seconds'))
+    for name, refresh in (('unbatched', refresh_unbatched), ('batched', refresh_batched)):
+        client.calls = 0
+        start = time.perf_counter()
+        results[name] = refresh(client, contract, token_ids)
+        elapsed = time.perf_counter() - start
+        print('{0:>12}{1:>12}{2:>12.2f}'.format(name, client.calls, elapsed))
+
+    if results['unbatched']['owners'] != results['batched']['owners']:
+        print('batched and unbatched owners differ', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
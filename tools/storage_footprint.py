@@ -0,0 +1,180 @@
+"""
+Reports the storage occupied by the contract, grouped by the prefixes defined in contracts/ascii-nft.py.
+
+The prefixes are read from the contract source: every module constant named `*_PREFIX` starts a group, and every
+other bytes constant passed to `get`, `put` or `delete` is a single key. Each group gets its number of keys, its
+bytes (keys and values, as charged by the storage fee), its bytes per token and the fee projected for a collection
+of `--project` tokens. The tokens are counted from the owner records, under TOKEN_PREFIX.
+
+The storage is read from a local node with the `findstorage` RPC method (neo-express on Neo 3.6 or later), or from
+a JSON dump mapping hex keys to hex values, as written by `dump_storage` from a TestEngine session.
+
+Usage: python tools/storage_footprint.py (--rpc URL --contract HASH | --dump FILE) [--project N] [--json FILE]
+"""
+import argparse
+import ast
+import base64
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+from rpc_refresh_bench import RpcClient
+
+CONTRACT_PATH = Path(__file__).parents[1] / 'contracts' / 'ascii-nft.py'
+TOKEN_PREFIX = 'TOKEN_PREFIX'
+STORAGE_CALLS = ('get', 'put', 'delete')
+
+# Policy contract default, in datoshi per byte
+DEFAULT_STORAGE_PRICE = 100000
+DEFAULT_PROJECTION = 10000
+UNKNOWN = 'unknown'
+
+
+class Group(NamedTuple):
+    name: str
+    key: bytes
+    is_prefix: bool
+
+
+class Footprint(NamedTuple):
+    name: str
+    keys: int
+    size: int
+    per_token: float
+    projected_fee: int
+
+
+def read_groups(source: str) -> List[Group]:
+    """
+    Find the storage prefixes and keys of a contract.
+
+    :param source: the contract source code
+    :return: the groups, longest keys first so that the first match of a storage key is its group
+    """
+    tree = ast.parse(source)
+    constants: Dict[str, bytes] = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)
+                and isinstance(node.value, ast.Constant) and isinstance(node.value.value, bytes)):
+            constants[node.targets[0].id] = node.value.value
+
+    used_as_key = set()
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in STORAGE_CALLS
+                and len(node.args) > 0 and isinstance(node.args[0], ast.Name)):
+            used_as_key.add(node.args[0].id)
+
+    groups = [Group(name, value, True) for name, value in constants.items() if name.endswith('_PREFIX')]
+    groups += [Group(name, value, False) for name, value in constants.items()
+               if name in used_as_key and not name.endswith('_PREFIX')]
+    return sorted(groups, key=lambda group: len(group.key), reverse=True)
+
+
+def group_of(key: bytes, groups: List[Group]) -> str:
+    for group in groups:
+        if key == group.key or (group.is_prefix and key.startswith(group.key)):
+            return group.name
+    return UNKNOWN
+
+
+def footprint(storage: Dict[bytes, bytes], groups: List[Group], project: int = DEFAULT_PROJECTION,
+              storage_price: int = DEFAULT_STORAGE_PRICE) -> List[Footprint]:
+    """
+    Sum the storage of the contract by group.
+
+    Prefix groups grow with the collection and are projected to `project` tokens, single keys are not.
+
+    :param storage: the keys and values of the contract
+    :param groups: the groups, as returned by read_groups
+    :param project: the number of tokens of the projection
+    :param storage_price: the storage price, in datoshi per byte
+    :return: the footprint of each group holding keys, largest first
+    """
+    keys: Dict[str, int] = {}
+    sizes: Dict[str, int] = {}
+    for key, value in storage.items():
+        name = group_of(key, groups)
+        keys[name] = keys.get(name, 0) + 1
+        sizes[name] = sizes.get(name, 0) + len(key) + len(value)
+
+    tokens = keys.get(TOKEN_PREFIX, 0)
+    single_keys = {group.name for group in groups if not group.is_prefix}
+    result = []
+    for name in sorted(sizes, key=lambda group: sizes[group], reverse=True):
+        per_token = sizes[name] / tokens if tokens > 0 else 0.0
+        projected = sizes[name] if name in single_keys else per_token * project
+        result.append(Footprint(name, keys[name], sizes[name], per_token, round(projected * storage_price)))
+    return result
+
+
+def format_table(footprints: List[Footprint], project: int) -> str:
+    lines = ['{0:<28}{1:>10}{2:>12}{3:>14}{4:>20}'.format(
+        'group', 'keys', 'bytes', 'bytes/token', 'GAS for {0}'.format(project))]
+    for entry in footprints:
+        lines.append('{0:<28}{1:>10}{2:>12}{3:>14.1f}{4:>20.8f}'.format(
+            entry.name, entry.keys, entry.size, entry.per_token, entry.projected_fee / 10 ** 8))
+    lines.append('{0:<28}{1:>10}{2:>12}{3:>14.1f}{4:>20.8f}'.format(
+        'total', sum(entry.keys for entry in footprints), sum(entry.size for entry in footprints),
+        sum(entry.per_token for entry in footprints), sum(entry.projected_fee for entry in footprints) / 10 ** 8))
+    return '\n'.join(lines)
+
+
+def to_json(footprints: List[Footprint], project: int) -> Dict:
+    return {
+        'projected_tokens': project,
+        'groups': [entry._asdict() for entry in footprints],
+    }
+
+
+def dump_storage(storage: Dict[bytes, bytes], path: Path):
+    path.write_text(json.dumps({key.hex(): value.hex() for key, value in storage.items()}, indent=1))
+
+
+def load_dump(path: Path) -> Dict[bytes, bytes]:
+    return {bytes.fromhex(key): bytes.fromhex(value) for key, value in json.loads(path.read_text()).items()}
+
+
+def find_storage(client: RpcClient, contract: str) -> Dict[bytes, bytes]:
+    """
+    Read every key of a contract from a node, following the pages of `findstorage`.
+    """
+    storage = {}
+    start = 0
+    while True:
+        page = client.call('findstorage', [contract, '', start])
+        for entry in page['results']:
+            storage[base64.b64decode(entry['key'])] = base64.b64decode(entry['value'])
+        if not page['truncated']:
+            return storage
+        start = page['next']
+
+
+def main(args: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--rpc', help='RPC url of the node, e.g. http://localhost:50012')
+    source.add_argument('--dump', type=Path, help='JSON dump of the storage, hex keys to hex values')
+    parser.add_argument('--contract', help='script hash of the contract, with --rpc')
+    parser.add_argument('--project', type=int, default=DEFAULT_PROJECTION, help='tokens of the fee projection')
+    parser.add_argument('--storage-price', type=int, default=DEFAULT_STORAGE_PRICE, help='datoshi per byte')
+    parser.add_argument('--json', type=Path, help='also write the report as JSON to this file')
+    options = parser.parse_args(args)
+
+    if options.rpc is not None:
+        if options.contract is None:
+            parser.error('--contract is required with --rpc')
+        storage = find_storage(RpcClient(options.rpc), options.contract)
+    else:
+        storage = load_dump(options.dump)
+
+    groups = read_groups(CONTRACT_PATH.read_text())
+    footprints = footprint(storage, groups, options.project, options.storage_price)
+    print(format_table(footprints, options.project))
+    if options.json is not None:
+        options.json.write_text(json.dumps(to_json(footprints, options.project), indent=2) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,111 @@
+"""
+Produces the release flavour of a neo3-boa contract source.
+
+Everything between ``# DEBUG_START`` and ``# DEBUG_END`` markers is dropped, as is every ``debug(...)``
+statement. Blocks left empty by the removal get a ``pass`` so the result still compiles.
+
+Usage: python tools/strip_debug.py contracts/ascii-nft.py contracts/release/ascii-nft.py
+"""
+import ast
+import re
+import sys
+from pathlib import Path
+from typing import List, Set
+
+DEBUG_START = re.compile(r'^\s*#\s*DEBUG_START\b')
+DEBUG_END = re.compile(r'^\s*#\s*DEBUG_END\b')
+DEBUG_EVENT = 'debug'
+
+
+def strip_debug_blocks(lines: List[str]) -> List[str]:
+    """
+    Remove the lines between the debug markers, markers included.
+
+    :param lines: the source lines
+    :return: the lines outside of any debug block
+    :raise ValueError: raised if the markers are not balanced.
+    """
+    result = []
+    inside = False
+    for number, line in enumerate(lines, 1):
+        if DEBUG_START.match(line):
+            if inside:
+                raise ValueError('nested DEBUG_START at line {0}'.format(number))
+            inside = True
+        elif DEBUG_END.match(line):
+            if not inside:
+                raise ValueError('DEBUG_END without DEBUG_START at line {0}'.format(number))
+            inside = False
+        elif not inside:
+            result.append(line)
+
+    if inside:
+        raise ValueError('DEBUG_START is never closed')
+    return result
+
+
+def is_debug_call(node: ast.stmt) -> bool:
+    return (isinstance(node, ast.Expr)
+            and isinstance(node.value, ast.Call)
+            and isinstance(node.value.func, ast.Name)
+            and node.value.func.id == DEBUG_EVENT)
+
+
+def strip_debug_calls(lines: List[str]) -> List[str]:
+    """
+    Remove every ``debug(...)`` statement, including the ones spanning several lines.
+
+    :param lines: the source lines
+    :return: the lines without debug notifications
+    """
+    tree = ast.parse(''.join(lines))
+    removed: Set[int] = set()
+    # first line of an emptied block -> indentation of the `pass` replacing it
+    placeholders = {}
+
+    for node in ast.walk(tree):
+        for field in ('body', 'orelse', 'finalbody'):
+            body = getattr(node, field, None)
+            if not isinstance(body, list) or len(body) == 0 or not isinstance(body[0], ast.stmt):
+                continue
+
+            debug_calls = [stmt for stmt in body if is_debug_call(stmt)]
+            for stmt in debug_calls:
+                removed.update(range(stmt.lineno, stmt.end_lineno + 1))
+            if len(debug_calls) == len(body):
+                placeholders[body[0].lineno] = body[0].col_offset
+
+    result = []
+    for number, line in enumerate(lines, 1):
+        if number in placeholders:
+            result.append(' ' * placeholders[number] + 'pass\n')
+        elif number not in removed:
+            result.append(line)
+    return result
+
+
+def strip_debug(source: str) -> str:
+    """
+    Build the release version of a contract source.
+
+    :param source: the contract source code
+    :return: the source code without debug blocks and debug notifications
+    """
+    lines = source.splitlines(keepends=True)
+    return ''.join(strip_debug_calls(strip_debug_blocks(lines)))
+
+
+def main(args: List[str]) -> int:
+    if len(args) != 2:
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        return 2
+
+    source_path, output_path = Path(args[0]), Path(args[1])
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(strip_debug(source_path.read_text()))
+    print('Wrote release source to {0}'.format(output_path))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))